@@ -2,28 +2,72 @@
 ShadowFS - Virtual filesystem overlay for GitHub repositories.
 """
 
-from .github_fs import GitHubFS
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .github_fs import GitHubFS, RateLimitError
 from .repository import Repository
 from .file_node import FileNode, DirectoryNode
 from .cache import Cache
-from .checkpoint import Checkpoint, CheckpointManager, FileSnapshot
-from .session import Session, AutoCheckpoint, LLMCall, create_restore_point
-from .gui import CheckpointGUI, show_checkpoints, interactive_restore
-from .models import (
-    ModelConfig,
-    ModelProvider,
-    ModelSelector,
-    get_model_selector,
-    get_model,
-    set_model,
-    show_models,
-    select_model,
-    BUILTIN_MODELS,
-)
+
+if TYPE_CHECKING:
+    from .checkpoint import Checkpoint, CheckpointManager, FileSnapshot
+    from .session import Session, AutoCheckpoint, LLMCall, create_restore_point
+    from .gui import CheckpointGUI, show_checkpoints, interactive_restore
+    from .models import (
+        ModelConfig,
+        ModelProvider,
+        ModelSelector,
+        get_model_selector,
+        get_model,
+        set_model,
+        show_models,
+        select_model,
+        BUILTIN_MODELS,
+    )
+
+# Submodules imported on first attribute access (PEP 562), so the CLI and
+# plain filesystem use don't pay for the checkpoint, session, GUI and model code.
+_LAZY_IMPORTS = {
+    "Checkpoint": ".checkpoint",
+    "CheckpointManager": ".checkpoint",
+    "FileSnapshot": ".checkpoint",
+    "Session": ".session",
+    "AutoCheckpoint": ".session",
+    "LLMCall": ".session",
+    "create_restore_point": ".session",
+    "CheckpointGUI": ".gui",
+    "show_checkpoints": ".gui",
+    "interactive_restore": ".gui",
+    "ModelConfig": ".models",
+    "ModelProvider": ".models",
+    "ModelSelector": ".models",
+    "get_model_selector": ".models",
+    "get_model": ".models",
+    "set_model": ".models",
+    "show_models": ".models",
+    "select_model": ".models",
+    "BUILTIN_MODELS": ".models",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __version__ = "0.1.0"
 __all__ = [
     "GitHubFS",
+    "RateLimitError",
     "Repository",
     "FileNode",
     "DirectoryNode",
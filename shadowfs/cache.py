@@ -1,29 +1,56 @@
 """
-Cache - Simple in-memory cache with TTL support.
+Cache - Simple in-memory cache with TTL support, plus an on-disk
+cache for HTTP responses that outlives the process.
 """
 
+import os
+import re
+import json
 import time
+import hashlib
+import heapq
 import fnmatch
-from typing import Any, Dict, Optional
-from dataclasses import dataclass
-from threading import Lock
+import functools
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
+from threading import Lock, Thread, current_thread, local
 
 
-@dataclass
-class CacheEntry:
-    """Single cache entry with value and expiration."""
-    value: Any
-    expires_at: float
+_WILDCARDS = frozenset("*?[")
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_pattern(pattern: str) -> Callable[[str], Any]:
+    """Compile a wildcard pattern into a match function (cached)."""
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+# Cache entries are stored as bare (value, expires_at) tuples
+CacheEntry = Tuple[Any, float]
+
+# Tuple keys are indexed by this many leading items (e.g. repo and branch)
+_GROUP_SIZE = 2
 
 
 class Cache:
     """
     Simple in-memory cache with TTL support.
     
-    Thread-safe implementation for caching API responses.
+    Keys may be strings or tuples; a cache should use one kind consistently.
+    Thread-safe implementation for caching API responses. Keys are spread
+    across a number of shards, each with its own lock, so writers touching
+    different keys don't contend. Within a shard entries are kept in
+    least-recently-used order so eviction is O(1).
     """
     
-    def __init__(self, enabled: bool = True, ttl: int = 300, max_size: int = 1000):
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl: int = 300,
+        max_size: int = 1000,
+        shards: int = 16,
+    ):
         """
         Initialize cache.
         
@@ -31,16 +58,116 @@ class Cache:
             enabled: Whether caching is enabled.
             ttl: Time-to-live in seconds.
             max_size: Maximum number of entries.
+            shards: Number of lock stripes (rounded up to a power of two).
         """
         self.enabled = enabled
         self.ttl = ttl
         self.max_size = max_size
-        self._cache: Dict[str, CacheEntry] = {}
-        self._lock = Lock()
-        self._hits = 0
-        self._misses = 0
+        
+        shard_count = 1
+        while shard_count < shards:
+            shard_count <<= 1
+        self._shard_mask = shard_count - 1
+        self._shards: List["OrderedDict[Hashable, CacheEntry]"] = [
+            OrderedDict() for _ in range(shard_count)
+        ]
+        self._locks = [Lock() for _ in range(shard_count)]
+        # Per-shard min-heaps of (expires_at, key); stale items are skipped lazily
+        self._expiry_heaps: List[List[Tuple[float, Hashable]]] = [[] for _ in range(shard_count)]
+        # Per-shard index of tuple keys by their leading items, so a tuple
+        # prefix of _GROUP_SIZE items is invalidated without a scan
+        self._groups: List[Dict[Tuple[Hashable, ...], Set[Hashable]]] = [
+            {} for _ in range(shard_count)
+        ]
+        # Per-thread [hits, misses] counters, each only written by its own
+        # thread so get() can count without a lock; summed by stats. Counts
+        # of threads that have exited are folded into _retired_counters.
+        self._local = local()
+        self._counters: List[Tuple["weakref.ref[Thread]", List[int]]] = []
+        self._retired_counters = [0, 0]
+        self._counters_lock = Lock()
+        # Invalidated keys -> wall-clock time until which persisted copies of
+        # them are stale, so persist()/load() don't bring them back. Only
+        # recorded once the cache is tied to a file by persist() or load().
+        self._tombstones: Dict[Hashable, float] = {}
+        # Min-heap of (until, key) so expired tombstones are pruned oldest first
+        self._tombstone_heap: List[Tuple[float, Hashable]] = []
+        self._tombstone_lock = Lock()
+        self._persisted = False
+        # Longest TTL handed out; a tombstone must outlive any entry
+        self._longest_ttl: float = ttl
+    
+    def _index(self, key: Hashable) -> int:
+        """Get the shard index for a key."""
+        return hash(key) & self._shard_mask
+    
+    def _bury(self, keys: Iterable[Hashable]) -> None:
+        """Record keys as invalidated for the longest entry lifetime."""
+        if not self._persisted:
+            return
+        now = time.time()
+        until = now + self._longest_ttl
+        with self._tombstone_lock:
+            for key in keys:
+                self._add_tombstone(key, until)
+            self._prune_tombstones(now)
+    
+    def _add_tombstone(self, key: Hashable, until: float) -> None:
+        """Record a tombstone unless a longer one exists (tombstone lock held)."""
+        if self._tombstones.get(key, 0) < until:
+            self._tombstones[key] = until
+            heapq.heappush(self._tombstone_heap, (until, key))
+    
+    def _prune_tombstones(self, now: float) -> None:
+        """Drop expired tombstones from the head of the heap (tombstone lock held)."""
+        heap = self._tombstone_heap
+        while heap and heap[0][0] <= now:
+            until, key = heapq.heappop(heap)
+            # Skip heap items superseded by a later tombstone for the key
+            if self._tombstones.get(key) == until:
+                del self._tombstones[key]
+    
+    def _buried(self, key: Hashable, now: float) -> bool:
+        """Check whether a key was invalidated and may still be cached elsewhere."""
+        until = self._tombstones.get(key)
+        return until is not None and until > now
+    
+    def _thread_counters(self) -> List[int]:
+        """Get the calling thread's [hits, misses] counters."""
+        counters: Optional[List[int]] = getattr(self._local, "counters", None)
+        if counters is None:
+            counters = self._local.counters = [0, 0]
+            with self._counters_lock:
+                self._retire_counters()
+                self._counters.append((weakref.ref(current_thread()), counters))
+        return counters
+    
+    def _retire_counters(self) -> None:
+        """Fold the counters of exited threads into the totals (counters lock held)."""
+        live = []
+        retired = self._retired_counters
+        for ref, counters in self._counters:
+            thread = ref()
+            if thread is not None and thread.is_alive():
+                live.append((ref, counters))
+            else:
+                # An exited thread no longer writes its counters
+                retired[0] += counters[0]
+                retired[1] += counters[1]
+        self._counters = live
     
-    def get(self, key: str) -> Optional[Any]:
+    def _ungroup(self, index: int, key: Hashable) -> None:
+        """Drop a removed key from its shard's group index (lock held)."""
+        if isinstance(key, tuple):
+            groups = self._groups[index]
+            group = key[:_GROUP_SIZE]
+            keys = groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del groups[group]
+    
+    def get(self, key: Hashable) -> Optional[Any]:
         """
         Get value from cache.
         
@@ -53,22 +180,38 @@ class Cache:
         if not self.enabled:
             return None
         
-        with self._lock:
-            entry = self._cache.get(key)
-            
-            if entry is None:
-                self._misses += 1
-                return None
-            
-            if time.time() > entry.expires_at:
-                del self._cache[key]
-                self._misses += 1
-                return None
-            
-            self._hits += 1
-            return entry.value
+        index = hash(key) & self._shard_mask
+        shard = self._shards[index]
+        
+        # Reads are lock-free: single dict operations are atomic under the GIL,
+        # and hits and misses go to per-thread counters, so the lock is only
+        # taken to delete an expired entry.
+        counters = self._thread_counters()
+        entry = shard.get(key)
+        
+        if entry is None:
+            counters[1] += 1
+            return None
+        
+        value, expires_at = entry
+        if time.monotonic() > expires_at:
+            with self._locks[index]:
+                # Another thread may have refreshed the key in the meantime
+                if shard.get(key) is entry:
+                    del shard[key]
+                    self._ungroup(index, key)
+            counters[1] += 1
+            return None
+        
+        try:
+            shard.move_to_end(key)
+        except KeyError:
+            pass  # Evicted concurrently; the value read above is still valid
+        
+        counters[0] += 1
+        return value
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
         """
         Set value in cache.
         
@@ -80,15 +223,31 @@ class Cache:
         if not self.enabled:
             return
         
-        with self._lock:
-            # Evict if at max size
-            if len(self._cache) >= self.max_size:
-                self._evict_oldest()
+        index = self._index(key)
+        shard = self._shards[index]
+        
+        with self._locks[index]:
+            if key in shard:
+                shard.move_to_end(key)
+            else:
+                # Evict if at max size
+                while self.size >= self.max_size and self._evict_oldest(index):
+                    pass
+                if isinstance(key, tuple):
+                    self._groups[index].setdefault(key[:_GROUP_SIZE], set()).add(key)
+            
+            ttl = ttl or self.ttl
+            if ttl > self._longest_ttl:
+                self._longest_ttl = ttl
+            expires_at = time.monotonic() + ttl
+            shard[key] = (value, expires_at)
             
-            expires_at = time.time() + (ttl or self.ttl)
-            self._cache[key] = CacheEntry(value=value, expires_at=expires_at)
+            heap = self._expiry_heaps[index]
+            heapq.heappush(heap, (expires_at, key))
+            if len(heap) > 2 * len(shard) + 64:
+                self._compact_heap(index)
     
-    def invalidate(self, key: str) -> bool:
+    def invalidate(self, key: Hashable) -> bool:
         """
         Invalidate a specific cache entry.
         
@@ -98,30 +257,90 @@ class Cache:
         Returns:
             True if entry was removed, False if not found.
         """
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+        self._bury((key,))
+        index = self._index(key)
+        with self._locks[index]:
+            if self._shards[index].pop(key, None) is None:
+                return False
+            self._ungroup(index, key)
+            return True
+    
+    def invalidate_many(self, keys: Iterable[Hashable]) -> int:
+        """
+        Invalidate several cache entries at once.
+        
+        Keys are grouped by shard so each shard lock is taken only once.
+        
+        Args:
+            keys: Cache keys to invalidate.
+            
+        Returns:
+            Number of entries removed.
+        """
+        keys = list(keys)
+        self._bury(keys)
+        by_shard: Dict[int, List[Hashable]] = {}
+        for key in keys:
+            by_shard.setdefault(self._index(key), []).append(key)
+        
+        count = 0
+        for index, shard_keys in by_shard.items():
+            shard = self._shards[index]
+            with self._locks[index]:
+                for key in shard_keys:
+                    if shard.pop(key, None) is not None:
+                        self._ungroup(index, key)
+                        count += 1
+        return count
     
-    def invalidate_prefix(self, prefix: str) -> int:
+    def invalidate_prefix(self, prefix: Union[str, Tuple[Hashable, ...]]) -> int:
         """
         Invalidate all entries matching a prefix pattern.
         
+        A literal prefix (optionally ending in ``*``) is matched with
+        ``str.startswith``; anything else is treated as a wildcard pattern.
+        A tuple prefix matches tuple keys whose leading items are equal to it;
+        one of exactly ``_GROUP_SIZE`` items is looked up in the group index,
+        so only the matching keys are touched.
+        
         Args:
-            prefix: Pattern to match (supports wildcards).
+            prefix: Prefix or pattern to match (supports wildcards), or a
+                tuple of leading key items.
             
         Returns:
             Number of entries invalidated.
         """
-        with self._lock:
-            keys_to_remove = [
-                key for key in self._cache.keys()
-                if fnmatch.fnmatch(key, prefix)
-            ]
-            for key in keys_to_remove:
-                del self._cache[key]
-            return len(keys_to_remove)
+        if isinstance(prefix, tuple) and len(prefix) == _GROUP_SIZE:
+            removed = []
+            for shard, lock, groups in zip(self._shards, self._locks, self._groups):
+                with lock:
+                    for key in groups.pop(prefix, ()):
+                        if shard.pop(key, None) is not None:
+                            removed.append(key)
+            self._bury(removed)
+            return len(removed)
+        
+        if isinstance(prefix, tuple):
+            size = len(prefix)
+            match = lambda key: isinstance(key, tuple) and key[:size] == prefix
+        else:
+            stem = prefix[:-1] if prefix.endswith("*") else prefix
+            if _WILDCARDS.isdisjoint(stem):
+                match = lambda key: isinstance(key, str) and key.startswith(stem)
+            else:
+                pattern_match = _compile_pattern(prefix)
+                match = lambda key: isinstance(key, str) and pattern_match(key)
+        
+        removed = []
+        for index, (shard, lock) in enumerate(zip(self._shards, self._locks)):
+            with lock:
+                keys_to_remove = list(filter(match, list(shard)))
+                for key in keys_to_remove:
+                    del shard[key]
+                    self._ungroup(index, key)
+                removed.extend(keys_to_remove)
+        self._bury(removed)
+        return len(removed)
     
     def clear(self) -> int:
         """
@@ -130,64 +349,338 @@ class Cache:
         Returns:
             Number of entries cleared.
         """
-        with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            return count
+        count = 0
+        for shard, lock, heap, groups in zip(
+            self._shards, self._locks, self._expiry_heaps, self._groups
+        ):
+            with lock:
+                count += len(shard)
+                self._bury(shard)
+                shard.clear()
+                heap.clear()
+                groups.clear()
+        return count
     
-    def _evict_oldest(self) -> None:
-        """Evict the oldest entry."""
-        if not self._cache:
-            return
+    def _evict_oldest(self, index: int) -> bool:
+        """
+        Evict the least recently used entry, preferring the given shard.
+        
+        The caller must hold the lock for shard ``index``. Other shards are
+        only touched when that shard is empty, and are skipped if their lock
+        is busy so two writers can never wait on each other.
+        
+        Returns:
+            True if an entry was evicted.
+        """
+        shard = self._shards[index]
+        if shard:
+            key, _ = shard.popitem(last=False)
+            self._ungroup(index, key)
+            return True
         
-        oldest_key = min(
-            self._cache.keys(),
-            key=lambda k: self._cache[k].expires_at
-        )
-        del self._cache[oldest_key]
+        for offset in range(1, len(self._shards)):
+            other = (index + offset) & self._shard_mask
+            lock = self._locks[other]
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                if self._shards[other]:
+                    key, _ = self._shards[other].popitem(last=False)
+                    self._ungroup(other, key)
+                    return True
+            finally:
+                lock.release()
+        return False
+    
+    def _compact_heap(self, index: int) -> None:
+        """Rebuild a shard's expiry heap from its live entries."""
+        heap = [(entry[1], key) for key, entry in self._shards[index].items()]
+        heapq.heapify(heap)
+        self._expiry_heaps[index] = heap
     
     def cleanup_expired(self) -> int:
         """
         Remove all expired entries.
         
+        Only the expired head of each shard's expiry heap is visited, so the
+        cost is proportional to the number of expired entries.
+        
         Returns:
             Number of entries removed.
         """
-        with self._lock:
-            now = time.time()
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if now > entry.expires_at
-            ]
-            for key in expired_keys:
-                del self._cache[key]
-            return len(expired_keys)
+        now = time.monotonic()
+        count = 0
+        for index, lock in enumerate(self._locks):
+            with lock:
+                shard = self._shards[index]
+                heap = self._expiry_heaps[index]
+                while heap and heap[0][0] < now:
+                    expires_at, key = heapq.heappop(heap)
+                    entry = shard.get(key)
+                    # Skip heap items left behind by overwrites or removals
+                    if entry is not None and entry[1] == expires_at:
+                        del shard[key]
+                        self._ungroup(index, key)
+                        count += 1
+        return count
+    
+    def persist(self, path: str, limit: Optional[int] = None) -> int:
+        """
+        Write the live entries to a file so a later process can reload them.
+        
+        Entries are written one JSON ``[key, value, expires_at]`` line each,
+        least recently used first within a shard, with ``expires_at`` in
+        wall-clock seconds so time spent between processes counts against
+        the TTL. Invalidated keys are written as ``[key, until]`` tombstones
+        and their entries are left out, so a process merging the file drops
+        its own stale copies; invalidations are only tracked once a cache
+        has been persisted or loaded. Entries that are not JSON-serializable are
+        skipped. The file is readable by its owner only and is replaced
+        atomically; write errors are ignored.
+        
+        Args:
+            path: File to write.
+            limit: Keep only about this many entries, taking the most
+                recently used of each shard. All entries if None.
+            
+        Returns:
+            Number of entries written.
+        """
+        self._persisted = True
+        per_shard = None if limit is None else -(-limit // len(self._shards))
+        now = time.monotonic()
+        wall_now = time.time()
+        with self._tombstone_lock:
+            self._prune_tombstones(wall_now)
+            tombstones = list(self._tombstones.items())
+        lines = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                items = list(shard.items())
+            if per_shard is not None:
+                items = items[-per_shard:] if per_shard else []
+            for key, (value, expires_at) in items:
+                if expires_at <= now or self._buried(key, wall_now):
+                    continue
+                try:
+                    lines.append(json.dumps(
+                        [key, value, expires_at - now + wall_now], separators=(",", ":")
+                    ))
+                except (TypeError, ValueError):
+                    continue
+        count = len(lines)
+        for key, until in tombstones:
+            try:
+                lines.append(json.dumps([key, until], separators=(",", ":")))
+            except (TypeError, ValueError):
+                continue
+        
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in lines)
+            os.replace(tmp_path, path)
+        except OSError:
+            return 0
+        return count
+    
+    def load(self, path: str, replace: bool = True) -> int:
+        """
+        Load entries written by :meth:`persist`.
+        
+        Entries expire at the wall-clock time they were persisted with.
+        Tombstones drop the key from this cache and are kept, so they are
+        written out again by the next persist(); entries for invalidated
+        keys are skipped. JSON turns tuples into lists, so list keys are
+        restored as tuples. A missing or unreadable file loads nothing.
+        
+        Args:
+            path: File to read.
+            replace: Overwrite entries already cached. If False, only keys
+                missing from the cache are loaded, so newer values win.
+            
+        Returns:
+            Number of entries loaded.
+        """
+        self._persisted = True
+        count = 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        key, expires_at = record[0], record[-1]
+                        now = time.time()
+                        ttl_left = float(expires_at) - now
+                    except (TypeError, ValueError, IndexError, KeyError):
+                        continue
+                    if ttl_left <= 0:
+                        continue
+                    if isinstance(key, list):
+                        key = tuple(key)
+                    try:
+                        hash(key)
+                    except TypeError:
+                        continue
+                    if len(record) == 2:
+                        with self._tombstone_lock:
+                            self._add_tombstone(key, expires_at)
+                        index = self._index(key)
+                        with self._locks[index]:
+                            if self._shards[index].pop(key, None) is not None:
+                                self._ungroup(index, key)
+                        continue
+                    if self._buried(key, now) or (not replace and key in self):
+                        continue
+                    self.set(key, record[1], ttl=ttl_left)
+                    count += 1
+        except OSError:
+            pass
+        return count
     
     @property
     def size(self) -> int:
         """Current number of entries."""
-        return len(self._cache)
+        return sum(len(shard) for shard in self._shards)
     
     @property
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        total = self._hits + self._misses
-        hit_rate = self._hits / total if total > 0 else 0
+        with self._counters_lock:
+            self._retire_counters()
+            hits, misses = self._retired_counters
+            for _, counters in self._counters:
+                hits += counters[0]
+                misses += counters[1]
+        total = hits + misses
+        hit_rate = hits / total if total > 0 else 0
         
         return {
             "enabled": self.enabled,
             "size": self.size,
             "max_size": self.max_size,
             "ttl": self.ttl,
-            "hits": self._hits,
-            "misses": self._misses,
+            "hits": hits,
+            "misses": misses,
             "hit_rate": hit_rate,
         }
     
-    def __contains__(self, key: str) -> bool:
-        """Check if key is in cache (and not expired)."""
-        return self.get(key) is not None
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if key is in cache (and not expired) without touching stats or LRU order."""
+        if not self.enabled:
+            return False
+        entry = self._shards[hash(key) & self._shard_mask].get(key)
+        return entry is not None and time.monotonic() <= entry[1]
     
     def __len__(self) -> int:
         """Return number of entries."""
         return self.size
+
+
+class DiskCache:
+    """
+    On-disk cache of HTTP response bodies, shared between processes.
+    
+    Each entry is a small JSON file holding the body along with the
+    response's ``ETag`` and ``Last-Modified`` validators, so a stale entry
+    can be revalidated with a conditional request instead of refetched.
+    Entries are readable by their owner only.
+    """
+    
+    def __init__(self, directory: str, ttl: int = 300):
+        """
+        Initialize disk cache.
+        
+        Args:
+            directory: Directory to store entries in (created on first write).
+            ttl: Seconds an entry is used without revalidation.
+        """
+        self.directory = directory
+        self.ttl = ttl
+    
+    def _path(self, key: str) -> str:
+        """Get the file path for a key."""
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest())
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached entry, fresh or not.
+        
+        Args:
+            key: Cache key.
+            
+        Returns:
+            Dict with ``body``, ``etag``, ``last_modified`` and ``stored_at``,
+            or None if there is no readable entry.
+        """
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and "body" in entry else None
+    
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Check whether an entry is younger than the TTL."""
+        return time.time() - float(entry.get("stored_at", 0)) < self.ttl
+    
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Build ``If-None-Match`` / ``If-Modified-Since`` headers for an entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def set(
+        self,
+        key: str,
+        body: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Store an entry (best-effort; write errors are ignored).
+        
+        Args:
+            key: Cache key.
+            body: JSON-serializable response body.
+            etag: Response ``ETag`` header.
+            last_modified: Response ``Last-Modified`` header.
+        """
+        entry = {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+    
+    def invalidate(self, key: str) -> bool:
+        """
+        Remove an entry (best-effort).
+        
+        Returns:
+            True if an entry was removed.
+        """
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            return False
+        return True
+    
+    def touch(self, key: str, entry: Dict[str, Any]) -> None:
+        """Mark an entry as fresh again after a successful revalidation."""
+        self.set(key, entry["body"], entry.get("etag"), entry.get("last_modified"))
@@ -2,40 +2,125 @@
 Checkpoint - Snapshot and restore system for file changes.
 """
 
+import os
+import gzip
 import json
+import zlib
+import base64
 import hashlib
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from dataclasses import dataclass, field
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional speedup (pip install shadowfs[fast])
+    orjson = None  # type: ignore[assignment]
+
+
+# Blobs at least this long are stored compressed when serialized
+_COMPRESS_MIN_SIZE = 1024
+
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+# First line of the line-delimited (NDJSON) checkpoint file format
+_NDJSON_HEADER = b'{"format":"shadowfs-ndjson","version":1}\n'
+
+
+if orjson is not None:
+    _dumps: Callable[[Any], bytes] = orjson.dumps
+    _loads: Callable[[Any], Any] = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return _JSON_ENCODER.encode(obj).encode("utf-8")
+    
+    _loads = json.loads
+
+
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    """Encode one NDJSON record (newlines inside strings are escaped by JSON)."""
+    return _dumps(record) + b"\n"
+
+
+def _compress_blob(content: str) -> str:
+    """Compress blob content into a JSON-safe string."""
+    return base64.b64encode(zlib.compress(content.encode("utf-8"), 3)).decode("ascii")
+
+
+def _decompress_blob(data: str) -> str:
+    """Inverse of _compress_blob."""
+    return zlib.decompress(base64.b64decode(data)).decode("utf-8")
+
+
+# Content longer than this is hashed in slices of this many characters
+_HASH_CHUNK = 1 << 20
+
+
+def _content_sha(content: str) -> str:
+    """
+    Hash file content for a snapshot.
+    
+    Large content is encoded and hashed a slice at a time, so the transient
+    UTF-8 copy stays bounded instead of doubling the file's memory.
+    """
+    if len(content) <= _HASH_CHUNK:
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=20).hexdigest()
+    h = hashlib.blake2b(digest_size=20)
+    for start in range(0, len(content), _HASH_CHUNK):
+        h.update(content[start:start + _HASH_CHUNK].encode("utf-8"))
+    return h.hexdigest()
+
 
 @dataclass
 class FileSnapshot:
     """Snapshot of a single file."""
     path: str
     content: str
-    sha: Optional[str] = None
+    # Content hash; filled in by __post_init__ when left empty
+    sha: str = ""
     size: int = 0
     
-    def __post_init__(self):
+    def __post_init__(self) -> None:
         if not self.sha:
-            self.sha = hashlib.sha256(self.content.encode()).hexdigest()[:40]
+            self.sha = _content_sha(self.content)
         if not self.size:
             self.size = len(self.content)
     
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "path": self.path,
+            "content": self.content,
+            "sha": self.sha,
+            "size": self.size,
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> "FileSnapshot":
+        if data.get("sha") and "size" in data:
+            # Serialized snapshots already carry their hash and size
+            return cls._from_trusted(data["path"], data["content"], data["sha"], data["size"])
         return cls(**data)
+    
+    @classmethod
+    def _from_trusted(cls, path: str, content: str, sha: str, size: int) -> "FileSnapshot":
+        """Build a snapshot without running __post_init__."""
+        snapshot = object.__new__(cls)
+        snapshot.path = path
+        snapshot.content = content
+        snapshot.sha = sha
+        snapshot.size = size
+        return snapshot
 
 
 @dataclass
 class Checkpoint:
     """
     A checkpoint representing a snapshot of multiple files at a point in time.
+    
+    Checkpoints are treated as immutable once created; ``add_file`` is the
+    only supported mutation.
     """
     id: str
     name: str
@@ -43,6 +128,18 @@ class Checkpoint:
     created_at: str
     files: Dict[str, FileSnapshot] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # to_dict() results, keyed by the id of the blob store passed (None if
+    # none) and kept with that store so an id can't be reused; cleared by
+    # add_file and whenever a field is assigned
+    _dict_cache: Dict[Optional[int], Tuple[Optional[Dict[str, str]], dict]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        cache = self.__dict__.get("_dict_cache")
+        if cache and name != "_dict_cache":
+            cache.clear()
     
     @classmethod
     def create(
@@ -65,9 +162,9 @@ class Checkpoint:
             New Checkpoint instance.
         """
         timestamp = datetime.utcnow().isoformat() + "Z"
-        checkpoint_id = hashlib.sha256(
-            f"{name}:{timestamp}".encode()
-        ).hexdigest()[:12]
+        checkpoint_id = hashlib.blake2b(
+            f"{name}:{timestamp}".encode(), digest_size=6
+        ).hexdigest()
         
         file_snapshots = {}
         if files:
@@ -86,6 +183,7 @@ class Checkpoint:
     def add_file(self, path: str, content: str) -> None:
         """Add or update a file in the checkpoint."""
         self.files[path] = FileSnapshot(path=path, content=content)
+        self._dict_cache.clear()
     
     def get_file(self, path: str) -> Optional[FileSnapshot]:
         """Get a file snapshot by path."""
@@ -95,24 +193,54 @@ class Checkpoint:
         """List all file paths in the checkpoint."""
         return list(self.files.keys())
     
-    def to_dict(self) -> dict:
-        """Convert to dictionary."""
-        return {
+    def to_dict(self, blobs: Optional[Dict[str, str]] = None) -> dict:
+        """
+        Convert to dictionary.
+        
+        The result is built once per blob store and cached until the
+        checkpoint changes, so callers must not mutate it.
+        
+        Args:
+            blobs: Shared blob store (sha -> content). Snapshots whose content
+                is stored there are written without their content.
+        """
+        key = None if blobs is None else id(blobs)
+        cached = self._dict_cache.get(key)
+        if cached is not None and cached[0] is blobs:
+            return cached[1]
+        
+        files = {}
+        for path, snap in self.files.items():
+            snap_data = snap.to_dict()
+            if blobs is not None and blobs.get(snap.sha) is snap.content:
+                del snap_data["content"]
+            files[path] = snap_data
+        
+        result = {
             "id": self.id,
             "name": self.name,
             "description": self.description,
             "created_at": self.created_at,
-            "files": {path: snap.to_dict() for path, snap in self.files.items()},
+            "files": files,
             "metadata": self.metadata,
         }
+        self._dict_cache[key] = (blobs, result)
+        return result
     
     @classmethod
-    def from_dict(cls, data: dict) -> "Checkpoint":
-        """Create from dictionary."""
-        files = {
-            path: FileSnapshot.from_dict(snap_data)
-            for path, snap_data in data.get("files", {}).items()
-        }
+    def from_dict(cls, data: dict, blobs: Optional[Dict[str, str]] = None) -> "Checkpoint":
+        """
+        Create from dictionary.
+        
+        Args:
+            data: Checkpoint data.
+            blobs: Shared blob store used to fill in snapshots without content.
+        """
+        files = {}
+        for path, snap_data in data.get("files", {}).items():
+            if blobs is not None and "content" not in snap_data:
+                snap_data = dict(snap_data, content=blobs[snap_data["sha"]])
+            files[path] = FileSnapshot.from_dict(snap_data)
         return cls(
             id=data["id"],
             name=data["name"],
@@ -136,6 +264,9 @@ class CheckpointManager:
     - Restore to a previous checkpoint
     - Compare checkpoints
     - Delete old checkpoints
+    
+    File contents are content-addressed: identical contents across
+    checkpoints share a single string held in a blob store keyed by SHA.
     """
     
     def __init__(self, max_checkpoints: int = 50):
@@ -146,9 +277,13 @@ class CheckpointManager:
             max_checkpoints: Maximum number of checkpoints to keep.
         """
         self.max_checkpoints = max_checkpoints
-        self._checkpoints: Dict[str, Checkpoint] = {}
-        self._checkpoint_order: List[str] = []  # Oldest to newest
+        self._checkpoints: "OrderedDict[str, Checkpoint]" = OrderedDict()  # Oldest to newest
         self._current_state: Dict[str, str] = {}  # path -> content
+        self._blobs: Dict[str, str] = {}  # sha -> content
+        self._blob_refs: Dict[str, int] = {}  # sha -> snapshot count
+        self._current_shas: Dict[str, Tuple[str, str]] = {}  # path -> (content, sha)
+        self._path_index: Dict[str, Dict[str, None]] = {}  # path -> checkpoint ids, oldest first
+        self._name_index: Dict[str, Dict[str, None]] = {}  # name -> checkpoint ids, oldest first
     
     def create_checkpoint(
         self,
@@ -180,8 +315,7 @@ class CheckpointManager:
         )
         
         # Add to storage
-        self._checkpoints[checkpoint.id] = checkpoint
-        self._checkpoint_order.append(checkpoint.id)
+        self._add(checkpoint)
         
         # Enforce max checkpoints
         self._enforce_max_checkpoints()
@@ -194,19 +328,29 @@ class CheckpointManager:
     
     def get_checkpoint_by_name(self, name: str) -> Optional[Checkpoint]:
         """Get the most recent checkpoint with a given name."""
-        for cp_id in reversed(self._checkpoint_order):
-            cp = self._checkpoints.get(cp_id)
-            if cp and cp.name == name:
-                return cp
-        return None
+        ids = self._name_index.get(name)
+        if not ids:
+            return None
+        return self._checkpoints[next(reversed(ids))]
+    
+    def resolve(self, identifier: str) -> Optional[Checkpoint]:
+        """
+        Find a checkpoint by ID, or else by name (most recent wins).
+        
+        Args:
+            identifier: Checkpoint ID or name.
+            
+        Returns:
+            Matching Checkpoint or None.
+        """
+        checkpoint = self._checkpoints.get(identifier)
+        if checkpoint is None:
+            checkpoint = self.get_checkpoint_by_name(identifier)
+        return checkpoint
     
     def list_checkpoints(self) -> List[Checkpoint]:
         """List all checkpoints (newest first)."""
-        return [
-            self._checkpoints[cp_id]
-            for cp_id in reversed(self._checkpoint_order)
-            if cp_id in self._checkpoints
-        ]
+        return list(reversed(self._checkpoints.values()))
     
     def restore_checkpoint(
         self,
@@ -235,6 +379,7 @@ class CheckpointManager:
             if snapshot:
                 restored[path] = snapshot.content
                 self._current_state[path] = snapshot.content
+                self._current_shas[path] = (snapshot.content, snapshot.sha)
         
         return restored
     
@@ -256,6 +401,7 @@ class CheckpointManager:
         snapshot = checkpoint.get_file(path)
         if snapshot:
             self._current_state[path] = snapshot.content
+            self._current_shas[path] = (snapshot.content, snapshot.sha)
             return snapshot.content
         
         return None
@@ -279,12 +425,16 @@ class CheckpointManager:
         if not checkpoint:
             raise ValueError(f"Checkpoint not found: {checkpoint_id}")
         
+        use_shas = current_files is None
         current = current_files if current_files is not None else self._current_state
-        diff = {}
+        diff: Dict[str, Dict[str, Any]] = {}
         
         # Check for modified and deleted files
         for path, snapshot in checkpoint.files.items():
             if path in current:
+                # Matching hashes of the internal state skip the content compare
+                if use_shas and self._current_sha(path) == snapshot.sha:
+                    continue
                 if current[path] != snapshot.content:
                     diff[path] = {
                         "status": "modified",
@@ -311,11 +461,11 @@ class CheckpointManager:
     
     def delete_checkpoint(self, checkpoint_id: str) -> bool:
         """Delete a checkpoint."""
-        if checkpoint_id in self._checkpoints:
-            del self._checkpoints[checkpoint_id]
-            self._checkpoint_order.remove(checkpoint_id)
-            return True
-        return False
+        checkpoint = self._checkpoints.pop(checkpoint_id, None)
+        if checkpoint is None:
+            return False
+        self._discard(checkpoint)
+        return True
     
     def update_current_state(self, path: str, content: str) -> None:
         """Update the current state for a file."""
@@ -324,6 +474,18 @@ class CheckpointManager:
     def remove_from_current_state(self, path: str) -> None:
         """Remove a file from current state."""
         self._current_state.pop(path, None)
+        self._current_shas.pop(path, None)
+    
+    def _current_sha(self, path: str) -> str:
+        """Get the SHA of a file in the current state, hashing it at most once."""
+        content = self._current_state[path]
+        cached = self._current_shas.get(path)
+        if cached is not None and cached[0] is content:
+            return cached[1]
+        
+        sha = _content_sha(content)
+        self._current_shas[path] = (content, sha)
+        return sha
     
     def get_file_history(self, path: str) -> List[Dict[str, Any]]:
         """
@@ -337,63 +499,212 @@ class CheckpointManager:
         """
         history = []
         
-        for cp_id in self._checkpoint_order:
-            checkpoint = self._checkpoints.get(cp_id)
-            if checkpoint:
-                snapshot = checkpoint.get_file(path)
-                if snapshot:
-                    history.append({
-                        "checkpoint_id": checkpoint.id,
-                        "checkpoint_name": checkpoint.name,
-                        "created_at": checkpoint.created_at,
-                        "content": snapshot.content,
-                        "sha": snapshot.sha,
-                        "size": snapshot.size,
-                    })
+        for cp_id in self._path_index.get(path, ()):
+            checkpoint = self._checkpoints[cp_id]
+            snapshot = checkpoint.get_file(path)
+            if snapshot:
+                history.append({
+                    "checkpoint_id": checkpoint.id,
+                    "checkpoint_name": checkpoint.name,
+                    "created_at": checkpoint.created_at,
+                    "content": snapshot.content,
+                    "sha": snapshot.sha,
+                    "size": snapshot.size,
+                })
         
         return history
     
     def _enforce_max_checkpoints(self) -> None:
         """Remove oldest checkpoints if over limit."""
-        while len(self._checkpoint_order) > self.max_checkpoints:
-            oldest_id = self._checkpoint_order.pop(0)
-            self._checkpoints.pop(oldest_id, None)
+        while len(self._checkpoints) > self.max_checkpoints:
+            _, oldest = self._checkpoints.popitem(last=False)
+            self._discard(oldest)
+    
+    def _add(self, checkpoint: Checkpoint) -> None:
+        """Store a checkpoint and index its files."""
+        self._retain_blobs(checkpoint)
+        self._checkpoints[checkpoint.id] = checkpoint
+        self._name_index.setdefault(checkpoint.name, {})[checkpoint.id] = None
+        for path in checkpoint.files:
+            self._path_index.setdefault(path, {})[checkpoint.id] = None
+    
+    def _discard(self, checkpoint: Checkpoint) -> None:
+        """Release the blobs and index entries of a removed checkpoint."""
+        self._release_blobs(checkpoint)
+        ids = self._name_index.get(checkpoint.name)
+        if ids is not None:
+            ids.pop(checkpoint.id, None)
+            if not ids:
+                del self._name_index[checkpoint.name]
+        for path in checkpoint.files:
+            ids = self._path_index.get(path)
+            if ids is not None:
+                ids.pop(checkpoint.id, None)
+                if not ids:
+                    del self._path_index[path]
+    
+    def _retain_blobs(self, checkpoint: Checkpoint) -> None:
+        """Point a checkpoint's snapshots at shared blobs, adding new ones."""
+        for snapshot in checkpoint.files.values():
+            sha = snapshot.sha
+            blob = self._blobs.get(sha)
+            if blob is None:
+                self._blobs[sha] = snapshot.content
+                self._blob_refs[sha] = 1
+            elif blob == snapshot.content:
+                snapshot.content = blob
+                self._blob_refs[sha] += 1
+    
+    def _release_blobs(self, checkpoint: Checkpoint) -> None:
+        """Drop a checkpoint's references, evicting blobs no longer used."""
+        for snapshot in checkpoint.files.values():
+            sha = snapshot.sha
+            refs = self._blob_refs.get(sha, 0) - 1
+            if refs > 0:
+                self._blob_refs[sha] = refs
+            else:
+                self._blob_refs.pop(sha, None)
+                self._blobs.pop(sha, None)
+    
+    def _iter_json(self) -> Iterator[str]:
+        """
+        Serialize to JSON in chunks.
+        
+        Each checkpoint and blob is encoded separately, so peak memory is
+        bounded by the largest single item rather than the whole manager.
+        """
+        encode = _JSON_ENCODER.encode
+        
+        def encode_object(items: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+            separator = "{"
+            for key, value in items:
+                yield f"{separator}{encode(key)}:{encode(value)}"
+                separator = ","
+            yield "{}" if separator == "{" else "}"
+        
+        yield '{"checkpoints":'
+        yield from encode_object(
+            (cp_id, cp.to_dict(blobs=self._blobs))
+            for cp_id, cp in self._checkpoints.items()
+        )
+        yield f',"order":{encode(list(self._checkpoints))}'
+        yield f',"current_state":{encode(self._current_state)}'
+        yield ',"blobs":'
+        yield from encode_object(
+            (sha, content) for sha, content in self._blobs.items()
+            if len(content) < _COMPRESS_MIN_SIZE
+        )
+        yield ',"compressed_blobs":'
+        yield from encode_object(
+            (sha, _compress_blob(content)) for sha, content in self._blobs.items()
+            if len(content) >= _COMPRESS_MIN_SIZE
+        )
+        yield "}"
     
     def to_json(self) -> str:
         """Serialize to JSON."""
-        data = {
-            "checkpoints": {
-                cp_id: cp.to_dict()
-                for cp_id, cp in self._checkpoints.items()
-            },
-            "order": self._checkpoint_order,
-            "current_state": self._current_state,
-        }
-        return json.dumps(data, indent=2)
+        return "".join(self._iter_json())
     
     @classmethod
     def from_json(cls, json_str: str, max_checkpoints: int = 50) -> "CheckpointManager":
         """Deserialize from JSON."""
-        data = json.loads(json_str)
-        
+        return cls._from_data(_loads(json_str), max_checkpoints)
+    
+    @classmethod
+    def _from_data(cls, data: dict, max_checkpoints: int = 50) -> "CheckpointManager":
+        """Build a manager from decoded JSON data."""
         manager = cls(max_checkpoints=max_checkpoints)
-        manager._checkpoint_order = data.get("order", [])
         manager._current_state = data.get("current_state", {})
         
-        for cp_id, cp_data in data.get("checkpoints", {}).items():
-            manager._checkpoints[cp_id] = Checkpoint.from_dict(cp_data)
+        blobs = data.get("blobs", {})
+        for sha, compressed in data.get("compressed_blobs", {}).items():
+            blobs[sha] = _decompress_blob(compressed)
+        
+        checkpoints = data.get("checkpoints", {})
+        for cp_id in data.get("order", list(checkpoints)):
+            cp_data = checkpoints.get(cp_id)
+            if cp_data is None:
+                continue
+            checkpoint = Checkpoint.from_dict(cp_data, blobs=blobs)
+            manager._add(checkpoint)
+        
+        return manager
+    
+    def _iter_records(self) -> Iterator[bytes]:
+        """
+        Serialize to NDJSON records, one line per blob, checkpoint and file.
+        
+        Blobs come first so checkpoints can be rebuilt as they are read.
+        """
+        yield _NDJSON_HEADER
+        for sha, content in self._blobs.items():
+            yield _encode_record({"blob": sha, "content": content})
+        for checkpoint in self._checkpoints.values():
+            yield _encode_record({"checkpoint": checkpoint.to_dict(blobs=self._blobs)})
+        for path, content in self._current_state.items():
+            yield _encode_record({"state": path, "content": content})
+    
+    @classmethod
+    def _from_records(
+        cls, lines: Iterable[bytes], max_checkpoints: int = 50
+    ) -> "CheckpointManager":
+        """Build a manager from NDJSON lines (header already consumed)."""
+        manager = cls(max_checkpoints=max_checkpoints)
+        blobs: Dict[str, str] = {}
+        
+        for line in lines:
+            if not line.strip():
+                continue
+            record = _loads(line)
+            if "blob" in record:
+                blobs[record["blob"]] = record["content"]
+            elif "checkpoint" in record:
+                manager._add(Checkpoint.from_dict(record["checkpoint"], blobs=blobs))
+            elif "state" in record:
+                manager._current_state[record["state"]] = record["content"]
         
         return manager
     
     def save_to_file(self, path: str) -> None:
-        """Save checkpoints to a file."""
-        Path(path).write_text(self.to_json())
+        """
+        Save checkpoints to a file.
+        
+        The format follows the file name: ``.ndjson`` writes one JSON record
+        per line, ``.gz`` writes the same records gzip-compressed, and
+        anything else writes a single JSON document.
+        
+        Output is streamed to a temporary file that then replaces ``path``,
+        so an interrupted save never leaves a truncated checkpoint file.
+        """
+        tmp_path = f"{path}.tmp"
+        if path.endswith((".gz", ".ndjson")):
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(tmp_path, "wb") as f:
+                for record in self._iter_records():
+                    f.write(record)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for chunk in self._iter_json():
+                    f.write(chunk)
+        os.replace(tmp_path, path)
     
     @classmethod
     def load_from_file(cls, path: str, max_checkpoints: int = 50) -> "CheckpointManager":
-        """Load checkpoints from a file."""
-        json_str = Path(path).read_text()
-        return cls.from_json(json_str, max_checkpoints)
+        """
+        Load checkpoints from a file.
+        
+        Any format written by ``save_to_file`` is accepted (detected from the
+        file contents, not its name). NDJSON files are read line by line.
+        """
+        with open(path, "rb") as f:
+            gzipped = f.read(2) == b"\x1f\x8b"
+        
+        with (gzip.open if gzipped else open)(path, "rb") as f:
+            first_line = f.readline()
+            if first_line == _NDJSON_HEADER:
+                return cls._from_records(f, max_checkpoints)
+            data = _loads(first_line + f.read())
+        return cls._from_data(data, max_checkpoints)
     
     @property
     def checkpoint_count(self) -> int:
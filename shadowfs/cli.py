@@ -5,36 +5,168 @@ ShadowFS CLI - Command line interface for ShadowFS.
 import os
 import sys
 import json
+import hashlib
+import time
 import argparse
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from .github_fs import GitHubFS
-from .checkpoint import CheckpointManager
 
+if TYPE_CHECKING:
+    from .checkpoint import Checkpoint, CheckpointManager
+    from .repository import Repository
 
-# Global checkpoint manager (persisted to file)
-CHECKPOINT_FILE = os.path.expanduser("~/.shadowfs/checkpoints.json")
 
+# Global checkpoint manager (persisted to file as gzip-compressed NDJSON)
+CHECKPOINT_FILE = os.path.expanduser("~/.shadowfs/checkpoints.ndjson.gz")
+# Single-document JSON file used by earlier versions; read if CHECKPOINT_FILE is missing
+LEGACY_CHECKPOINT_FILE = os.path.expanduser("~/.shadowfs/checkpoints.json")
 
-def get_checkpoint_manager() -> CheckpointManager:
-    """Get or create checkpoint manager."""
-    checkpoint_dir = Path(CHECKPOINT_FILE).parent
-    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+# Repo file contents keyed by git blob SHA, shared across checkpoints
+BLOB_CACHE_DIR = os.path.expanduser("~/.shadowfs/blob_cache")
+
+# Directory listings, revalidated with conditional requests across runs
+CACHE_DIR = os.path.expanduser("~/.shadowfs/cache")
+# mtime resolution can be as coarse as 2 s (FAT, HFS+, some network mounts)
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def get_checkpoint_manager() -> "CheckpointManager":
+    """
+    Get or create checkpoint manager.
     
-    if Path(CHECKPOINT_FILE).exists():
-        return CheckpointManager.load_from_file(CHECKPOINT_FILE)
+    Read-only: if no checkpoint file exists yet, an empty in-memory manager
+    is returned and nothing is created on disk.
+    """
+    from .checkpoint import CheckpointManager
+    
+    for path in (CHECKPOINT_FILE, LEGACY_CHECKPOINT_FILE):
+        try:
+            return CheckpointManager.load_from_file(path)
+        except FileNotFoundError:
+            continue
     return CheckpointManager()
 
 
-def save_checkpoint_manager(manager: CheckpointManager) -> None:
-    """Save checkpoint manager to file."""
+def save_checkpoint_manager(manager: "CheckpointManager") -> None:
+    """Save checkpoint manager to file, creating its directory if needed."""
+    Path(CHECKPOINT_FILE).parent.mkdir(parents=True, exist_ok=True)
     manager.save_to_file(CHECKPOINT_FILE)
 
 
+def read_stdin(chunk_size: int = 65536) -> str:
+    """Read all of stdin as raw bytes in chunks and decode it once."""
+    stream = getattr(sys.stdin, "buffer", None)
+    if stream is None:
+        # stdin replaced by a text-only stream (e.g. io.StringIO)
+        return sys.stdin.read()
+    chunks = []
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks).decode("utf-8")
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Compute the git blob SHA-1 of some file contents."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def read_repo_file(repo: "Repository", path: str, sha: Optional[str]) -> str:
+    """
+    Read a repo file, going through the local blob cache when its SHA is known.
+    
+    Args:
+        repo: Mounted Repository.
+        path: File path in the repo.
+        sha: Git blob SHA of the file, or None if unknown.
+        
+    Returns:
+        File contents.
+    """
+    if sha is None:
+        return repo.read(path)
+    
+    blob_path = Path(BLOB_CACHE_DIR) / sha
+    try:
+        return blob_path.read_bytes().decode("utf-8")
+    except FileNotFoundError:
+        pass
+    
+    content = repo.read(path)
+    if git_blob_sha(content.encode("utf-8")) != sha:
+        # The branch moved since the SHA was looked up; don't file new
+        # content under the old SHA
+        return content
+    try:
+        # Blobs may come from private repos: keep them readable by the owner only
+        os.makedirs(blob_path.parent, mode=0o700, exist_ok=True)
+        tmp_path = blob_path.with_name(f"{sha}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode("utf-8"))
+        os.replace(tmp_path, blob_path)
+    except OSError:
+        pass  # The cache is best-effort
+    return content
+
+
+def read_concurrently(
+    reader: Callable[[str], str],
+    paths: List[str],
+    max_workers: int = 16,
+) -> List[Tuple[str, Optional[str], Optional[Exception]]]:
+    """
+    Call ``reader`` on each path using a thread pool.
+    
+    Args:
+        reader: Function returning the contents of a path.
+        paths: Paths to read.
+        max_workers: Maximum number of concurrent reads.
+        
+    Returns:
+        List of (path, content, error) in the order of ``paths``; exactly one
+        of content and error is None.
+    """
+    def read_one(path: str) -> Tuple[str, Optional[str], Optional[Exception]]:
+        try:
+            return path, reader(path), None
+        except Exception as e:
+            return path, None, e
+    
+    if len(paths) <= 1:
+        return [read_one(path) for path in paths]
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return list(executor.map(read_one, paths))
+
+
+def read_local_file(filepath: str) -> Tuple[str, Optional[List[int]]]:
+    """
+    Read a local file for a checkpoint, along with a stat stamp.
+    
+    The stamp is ``[st_size, st_mtime_ns]`` taken before the read, so an edit
+    made during or after the read always changes it. Files modified within
+    RACY_WINDOW_NS of the read get no stamp: a further same-size edit could
+    land in the same mtime tick and go unnoticed.
+    
+    Returns:
+        Tuple of (content, stamp or None).
+    """
+    now = time.time_ns()
+    st = os.stat(filepath)
+    content = Path(filepath).read_text(encoding="utf-8")
+    stamp = [st.st_size, st.st_mtime_ns] if now - st.st_mtime_ns > RACY_WINDOW_NS else None
+    return content, stamp
+
+
 def get_fs(token: Optional[str] = None) -> GitHubFS:
     """Get GitHubFS instance."""
-    return GitHubFS(token=token)
+    return GitHubFS(token=token, cache_dir=CACHE_DIR)
 
 
 def cmd_ls(args):
@@ -49,9 +181,11 @@ def cmd_ls(args):
             tree = repo.get_tree(path, recursive=True)
             print(tree.to_tree_string())
         else:
-            entries = repo.listdir(path)
-            for entry in sorted(entries):
-                print(entry)
+            entries = list(repo.listdir(path))
+            if not args.no_sort:
+                entries.sort()
+            if entries:
+                sys.stdout.write("\n".join(entries) + "\n")
     except NotADirectoryError:
         print(f"Error: {path} is not a directory", file=sys.stderr)
         sys.exit(1)
@@ -85,7 +219,7 @@ def cmd_write(args):
     if args.content:
         content = args.content
     else:
-        content = sys.stdin.read()
+        content = read_stdin()
     
     try:
         repo.write(args.path, content)
@@ -124,8 +258,7 @@ def cmd_info(args):
     
     if args.verbose:
         tree = repo.get_tree("/", recursive=True)
-        file_count = sum(1 for _, _, files in tree.walk() for _ in files)
-        dir_count = sum(1 for _, dirs, _ in tree.walk() for _ in dirs)
+        file_count, dir_count = tree.count()
         print(f"Files: {file_count}")
         print(f"Directories: {dir_count}")
 
@@ -154,40 +287,56 @@ def cmd_exists(args):
 
 def cmd_checkpoint_create(args):
     """Create a new checkpoint (snapshot) of files."""
-    manager = get_checkpoint_manager()
-    
     files = {}
+    stamps: Dict[str, List[int]] = {}
     
     if args.repo and args.paths:
         # Snapshot specific files from a GitHub repo
         fs = get_fs(args.token)
         repo = fs.mount(args.repo, branch=args.branch)
         
-        for path in args.paths:
-            try:
-                content = repo.read(path)
+        # One tree call gives every blob SHA; unchanged files then come from disk
+        try:
+            shas = repo.get_blob_shas()
+        except Exception:
+            shas = {}
+        
+        results = read_concurrently(
+            lambda path: read_repo_file(repo, path, shas.get(path.strip("/"))),
+            args.paths,
+        )
+        for path, content, error in results:
+            if error is None:
                 files[f"{args.repo}:{path}"] = content
-            except Exception as e:
-                print(f"Warning: Could not read {path}: {e}", file=sys.stderr)
+            else:
+                print(f"Warning: Could not read {path}: {error}", file=sys.stderr)
     
     elif args.files:
-        # Snapshot local files
-        for filepath in args.files:
-            try:
-                content = Path(filepath).read_text(encoding="utf-8")
+        # Snapshot local files, stamping them so checkpoint-diff can skip
+        # files whose size and mtime are unchanged
+        def read_stamped(filepath: str) -> str:
+            content, stamp = read_local_file(filepath)
+            if stamp is not None:
+                stamps[filepath] = stamp
+            return content
+        
+        results = read_concurrently(read_stamped, args.files)
+        for filepath, content, error in results:
+            if error is None:
                 files[filepath] = content
-            except Exception as e:
-                print(f"Warning: Could not read {filepath}: {e}", file=sys.stderr)
+            else:
+                print(f"Warning: Could not read {filepath}: {error}", file=sys.stderr)
     
     if not files:
         print("Error: No files to checkpoint", file=sys.stderr)
         sys.exit(1)
     
+    manager = get_checkpoint_manager()
     checkpoint = manager.create_checkpoint(
         name=args.name,
         description=args.description or "",
         files=files,
-        metadata={"source": args.repo or "local"},
+        metadata={"source": args.repo} if args.repo else {"source": "local", "stat": stamps},
     )
     
     save_checkpoint_manager(manager)
@@ -207,24 +356,21 @@ def cmd_checkpoint_list(args):
         print("No checkpoints found.")
         return
     
-    print(f"{'ID':<14} {'Name':<20} {'Files':<6} {'Created':<24}")
-    print("-" * 70)
+    lines = [f"{'ID':<14} {'Name':<20} {'Files':<6} {'Created':<24}", "-" * 70]
     
     for cp in checkpoints:
         name = cp.name[:18] + ".." if len(cp.name) > 20 else cp.name
         created = cp.created_at[:19].replace("T", " ")
-        print(f"{cp.id:<14} {name:<20} {len(cp.files):<6} {created:<24}")
+        lines.append(f"{cp.id:<14} {name:<20} {len(cp.files):<6} {created:<24}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_checkpoint_show(args):
     """Show checkpoint details."""
     manager = get_checkpoint_manager()
     
-    checkpoint = manager.get_checkpoint(args.checkpoint_id)
-    if not checkpoint:
-        # Try by name
-        checkpoint = manager.get_checkpoint_by_name(args.checkpoint_id)
-    
+    checkpoint = manager.resolve(args.checkpoint_id)
     if not checkpoint:
         print(f"Checkpoint not found: {args.checkpoint_id}", file=sys.stderr)
         sys.exit(1)
@@ -235,9 +381,12 @@ def cmd_checkpoint_show(args):
     print(f"Created: {checkpoint.created_at}")
     print(f"Files ({len(checkpoint.files)}):")
     
-    for path in sorted(checkpoint.list_files()):
-        snap = checkpoint.get_file(path)
-        print(f"  {path} ({snap.size} bytes)")
+    lines = [
+        f"  {path} ({checkpoint.files[path].size} bytes)"
+        for path in sorted(checkpoint.files)
+    ]
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
     
     if args.verbose:
         print(f"\nMetadata: {json.dumps(checkpoint.metadata, indent=2)}")
@@ -247,10 +396,7 @@ def cmd_checkpoint_restore(args):
     """Restore files from a checkpoint."""
     manager = get_checkpoint_manager()
     
-    checkpoint = manager.get_checkpoint(args.checkpoint_id)
-    if not checkpoint:
-        checkpoint = manager.get_checkpoint_by_name(args.checkpoint_id)
-    
+    checkpoint = manager.resolve(args.checkpoint_id)
     if not checkpoint:
         print(f"Checkpoint not found: {args.checkpoint_id}", file=sys.stderr)
         sys.exit(1)
@@ -294,22 +440,30 @@ def cmd_checkpoint_diff(args):
     """Show diff between checkpoint and current state."""
     manager = get_checkpoint_manager()
     
-    checkpoint = manager.get_checkpoint(args.checkpoint_id)
-    if not checkpoint:
-        checkpoint = manager.get_checkpoint_by_name(args.checkpoint_id)
-    
+    checkpoint = manager.resolve(args.checkpoint_id)
     if not checkpoint:
         print(f"Checkpoint not found: {args.checkpoint_id}", file=sys.stderr)
         sys.exit(1)
     
+    # Files whose size and mtime match the stamp taken at snapshot time are unchanged
+    stamps = checkpoint.metadata.get("stat") or {}
+    
     # Build current state from local files
     current_files = {}
-    for path in checkpoint.list_files():
+    for path, snap in checkpoint.files.items():
         if ":" not in path or path[1] == ":":  # Local path
             try:
+                stamp = stamps.get(path)
+                if stamp is not None:
+                    st = os.stat(path)
+                    if [st.st_size, st.st_mtime_ns] == stamp:
+                        current_files[path] = snap.content
+                        continue
+                # Read the way the snapshot was taken (text mode), so line
+                # ending translation matches
                 current_files[path] = Path(path).read_text(encoding="utf-8")
             except FileNotFoundError:
-                pass  # File was deleted
+                continue  # File was deleted
     
     diff = manager.diff_checkpoint(checkpoint.id, current_files)
     
@@ -338,10 +492,7 @@ def cmd_checkpoint_delete(args):
     """Delete a checkpoint."""
     manager = get_checkpoint_manager()
     
-    checkpoint = manager.get_checkpoint(args.checkpoint_id)
-    if not checkpoint:
-        checkpoint = manager.get_checkpoint_by_name(args.checkpoint_id)
-    
+    checkpoint = manager.resolve(args.checkpoint_id)
     if not checkpoint:
         print(f"Checkpoint not found: {args.checkpoint_id}", file=sys.stderr)
         sys.exit(1)
@@ -368,16 +519,17 @@ def cmd_checkpoint_history(args):
         print(f"No history found for: {args.path}")
         return
     
-    print(f"History for: {args.path}")
-    print("-" * 60)
+    lines = [f"History for: {args.path}", "-" * 60]
     
     for entry in history:
         created = entry["created_at"][:19].replace("T", " ")
-        print(f"  [{entry['checkpoint_id']}] {entry['checkpoint_name']}")
-        print(f"    Created: {created}")
-        print(f"    Size: {entry['size']} bytes")
-        print(f"    SHA: {entry['sha'][:12]}...")
-        print()
+        lines.append(f"  [{entry['checkpoint_id']}] {entry['checkpoint_name']}")
+        lines.append(f"    Created: {created}")
+        lines.append(f"    Size: {entry['size']} bytes")
+        lines.append(f"    SHA: {entry['sha'][:12]}...")
+        lines.append("")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 # =============================================================================
@@ -531,43 +683,28 @@ def cmd_model_info(args):
         print(f"Endpoint:        {model.endpoint}")
 
 
-def main():
-    """Main entry point."""
-    parser = argparse.ArgumentParser(
-        prog="shadowfs",
-        description="ShadowFS - Virtual filesystem for GitHub repositories",
-    )
-    parser.add_argument(
-        "--token",
-        "-t",
-        help="GitHub token (or set GITHUB_TOKEN env var)",
-        default=os.environ.get("GITHUB_TOKEN"),
-    )
-    parser.add_argument(
-        "--version",
-        "-v",
-        action="version",
-        version="%(prog)s 0.1.0",
-    )
-    
-    subparsers = parser.add_subparsers(dest="command", required=True)
-    
-    # ls command
+def _add_ls_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``ls`` subcommand."""
     ls_parser = subparsers.add_parser("ls", help="List directory contents")
     ls_parser.add_argument("repo", help="Repository (owner/repo)")
     ls_parser.add_argument("path", nargs="?", help="Path to list")
     ls_parser.add_argument("--branch", "-b", help="Branch name")
     ls_parser.add_argument("--tree", action="store_true", help="Show as tree")
+    ls_parser.add_argument("--no-sort", action="store_true", help="List entries in API order")
     ls_parser.set_defaults(func=cmd_ls)
-    
-    # cat command
+
+
+def _add_cat_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``cat`` subcommand."""
     cat_parser = subparsers.add_parser("cat", help="Display file contents")
     cat_parser.add_argument("repo", help="Repository (owner/repo)")
     cat_parser.add_argument("path", help="File path")
     cat_parser.add_argument("--branch", "-b", help="Branch name")
     cat_parser.set_defaults(func=cmd_cat)
-    
-    # write command
+
+
+def _add_write_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``write`` subcommand."""
     write_parser = subparsers.add_parser("write", help="Write to a file")
     write_parser.add_argument("repo", help="Repository (owner/repo)")
     write_parser.add_argument("path", help="File path")
@@ -575,34 +712,38 @@ def main():
     write_parser.add_argument("--message", "-m", help="Commit message")
     write_parser.add_argument("--branch", "-b", help="Branch name")
     write_parser.set_defaults(func=cmd_write)
-    
-    # tree command
+
+
+def _add_tree_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``tree`` subcommand."""
     tree_parser = subparsers.add_parser("tree", help="Display directory tree")
     tree_parser.add_argument("repo", help="Repository (owner/repo)")
     tree_parser.add_argument("path", nargs="?", help="Root path")
     tree_parser.add_argument("--branch", "-b", help="Branch name")
     tree_parser.set_defaults(func=cmd_tree)
-    
-    # info command
+
+
+def _add_info_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``info`` subcommand."""
     info_parser = subparsers.add_parser("info", help="Display repository info")
     info_parser.add_argument("repo", help="Repository (owner/repo)")
     info_parser.add_argument("--branch", "-b", help="Branch name")
     info_parser.add_argument("--verbose", "-v", action="store_true")
     info_parser.set_defaults(func=cmd_info)
-    
-    # exists command
+
+
+def _add_exists_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``exists`` subcommand."""
     exists_parser = subparsers.add_parser("exists", help="Check if path exists")
     exists_parser.add_argument("repo", help="Repository (owner/repo)")
     exists_parser.add_argument("path", help="Path to check")
     exists_parser.add_argument("--branch", "-b", help="Branch name")
     exists_parser.add_argument("--quiet", "-q", action="store_true")
     exists_parser.set_defaults(func=cmd_exists)
-    
-    # =========================================================================
-    # Checkpoint commands (like GitHub Copilot restore)
-    # =========================================================================
-    
-    # checkpoint create
+
+
+def _add_checkpoint_create_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``checkpoint`` subcommand (alias cp)."""
     cp_create = subparsers.add_parser(
         "checkpoint",
         aliases=["cp"],
@@ -615,16 +756,20 @@ def main():
     cp_create.add_argument("--paths", "-p", nargs="+", help="Paths in repo to snapshot")
     cp_create.add_argument("--files", "-f", nargs="+", help="Local files to snapshot")
     cp_create.set_defaults(func=cmd_checkpoint_create)
-    
-    # checkpoint-list (list all checkpoints)
+
+
+def _add_checkpoint_list_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``checkpoint-list`` subcommand (alias cp-ls)."""
     cp_list = subparsers.add_parser(
         "checkpoint-list",
         aliases=["cp-ls"],
         help="List all checkpoints",
     )
     cp_list.set_defaults(func=cmd_checkpoint_list)
-    
-    # checkpoint-show (show checkpoint details)
+
+
+def _add_checkpoint_show_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``checkpoint-show`` subcommand (alias cp-show)."""
     cp_show = subparsers.add_parser(
         "checkpoint-show",
         aliases=["cp-show"],
@@ -633,8 +778,10 @@ def main():
     cp_show.add_argument("checkpoint_id", help="Checkpoint ID or name")
     cp_show.add_argument("--verbose", "-v", action="store_true")
     cp_show.set_defaults(func=cmd_checkpoint_show)
-    
-    # restore (restore from checkpoint) - main command!
+
+
+def _add_restore_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``restore`` subcommand."""
     restore = subparsers.add_parser(
         "restore",
         help="Restore files from a checkpoint",
@@ -645,8 +792,10 @@ def main():
     restore.add_argument("--dry-run", "-n", action="store_true", help="Show what would be restored")
     restore.add_argument("--force", "-f", action="store_true", help="Overwrite existing files")
     restore.set_defaults(func=cmd_checkpoint_restore)
-    
-    # checkpoint-diff (compare checkpoint with current state)
+
+
+def _add_checkpoint_diff_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``checkpoint-diff`` subcommand (alias cp-diff)."""
     cp_diff = subparsers.add_parser(
         "checkpoint-diff",
         aliases=["cp-diff"],
@@ -655,8 +804,10 @@ def main():
     cp_diff.add_argument("checkpoint_id", help="Checkpoint ID or name")
     cp_diff.add_argument("--verbose", "-v", action="store_true")
     cp_diff.set_defaults(func=cmd_checkpoint_diff)
-    
-    # checkpoint-delete (delete a checkpoint)
+
+
+def _add_checkpoint_delete_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``checkpoint-delete`` subcommand (alias cp-rm)."""
     cp_delete = subparsers.add_parser(
         "checkpoint-delete",
         aliases=["cp-rm"],
@@ -665,8 +816,10 @@ def main():
     cp_delete.add_argument("checkpoint_id", help="Checkpoint ID or name")
     cp_delete.add_argument("--force", "-f", action="store_true", help="Skip confirmation")
     cp_delete.set_defaults(func=cmd_checkpoint_delete)
-    
-    # checkpoint-history (show file history across checkpoints)
+
+
+def _add_checkpoint_history_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``checkpoint-history`` subcommand (alias cp-history)."""
     cp_history = subparsers.add_parser(
         "checkpoint-history",
         aliases=["cp-history"],
@@ -674,12 +827,10 @@ def main():
     )
     cp_history.add_argument("path", help="File path to show history for")
     cp_history.set_defaults(func=cmd_checkpoint_history)
-    
-    # =========================================================================
-    # Model commands (like GitHub Copilot's model selector)
-    # =========================================================================
-    
-    # models (show available models)
+
+
+def _add_models_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``models`` subcommand."""
     models_cmd = subparsers.add_parser(
         "models",
         help="Show available models (like Copilot's model selector)",
@@ -688,8 +839,10 @@ def main():
     models_cmd.add_argument("--available", "-a", action="store_true", help="Only show models with API keys configured")
     models_cmd.add_argument("--json", "-j", action="store_true", help="Output as JSON")
     models_cmd.set_defaults(func=cmd_models)
-    
-    # model (select or show current model)
+
+
+def _add_model_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``model`` subcommand."""
     model_cmd = subparsers.add_parser(
         "model",
         help="Select a model or show current",
@@ -697,8 +850,10 @@ def main():
     model_cmd.add_argument("model_id", nargs="?", help="Model ID or shortcut (e.g., 'gpt4o', 'claude', 'sonnet')")
     model_cmd.add_argument("--json", "-j", action="store_true", help="Output as JSON")
     model_cmd.set_defaults(func=lambda args: cmd_model_select(args) if args.model_id else cmd_model_current(args))
-    
-    # model-info (show detailed model info)
+
+
+def _add_model_info_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the ``model-info`` subcommand."""
     model_info_cmd = subparsers.add_parser(
         "model-info",
         help="Show detailed info about a model",
@@ -706,8 +861,103 @@ def main():
     model_info_cmd.add_argument("model_id", help="Model ID or shortcut")
     model_info_cmd.add_argument("--json", "-j", action="store_true", help="Output as JSON")
     model_info_cmd.set_defaults(func=cmd_model_info)
+
+
+# Subcommand name or alias -> function adding its parser
+_COMMAND_PARSERS: Dict[
+    str, Callable[["argparse._SubParsersAction[argparse.ArgumentParser]"], None]
+] = {
+    "ls": _add_ls_parser,
+    "cat": _add_cat_parser,
+    "write": _add_write_parser,
+    "tree": _add_tree_parser,
+    "info": _add_info_parser,
+    "exists": _add_exists_parser,
+    "checkpoint": _add_checkpoint_create_parser,
+    "cp": _add_checkpoint_create_parser,
+    "checkpoint-list": _add_checkpoint_list_parser,
+    "cp-ls": _add_checkpoint_list_parser,
+    "checkpoint-show": _add_checkpoint_show_parser,
+    "cp-show": _add_checkpoint_show_parser,
+    "restore": _add_restore_parser,
+    "checkpoint-diff": _add_checkpoint_diff_parser,
+    "cp-diff": _add_checkpoint_diff_parser,
+    "checkpoint-delete": _add_checkpoint_delete_parser,
+    "cp-rm": _add_checkpoint_delete_parser,
+    "checkpoint-history": _add_checkpoint_history_parser,
+    "cp-history": _add_checkpoint_history_parser,
+    "models": _add_models_parser,
+    "model": _add_model_parser,
+    "model-info": _add_model_info_parser,
+}
+
+
+def _find_command(argv: List[str]) -> Optional[str]:
+    """
+    Find the subcommand name in argv, skipping global options and their values.
+    
+    Returns None when help is asked for before the subcommand, since the
+    top-level help lists every subcommand. Long options may be abbreviated,
+    as argparse allows.
+    """
+    args = iter(argv)
+    for arg in args:
+        if arg == "-h" or (len(arg) > 2 and "--help".startswith(arg)):
+            return None
+        if arg == "-t" or (len(arg) > 2 and "--token".startswith(arg)):
+            next(args, None)  # Skip the token value
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def build_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Build the argument parser.
+    
+    Args:
+        command: Subcommand being invoked. Only its parser is built; if None
+            or unknown, all subcommands are added (for help and errors).
+        
+    Returns:
+        Configured ArgumentParser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="shadowfs",
+        description="ShadowFS - Virtual filesystem for GitHub repositories",
+    )
+    parser.add_argument(
+        "--token",
+        "-t",
+        help="GitHub token (or set GITHUB_TOKEN env var)",
+        default=os.environ.get("GITHUB_TOKEN"),
+    )
+    parser.add_argument(
+        "--version",
+        "-v",
+        action="version",
+        version="%(prog)s 0.1.0",
+    )
+    
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    add_parser = _COMMAND_PARSERS.get(command) if command is not None else None
+    if add_parser is not None:
+        add_parser(subparsers)
+    else:
+        for add_parser in dict.fromkeys(_COMMAND_PARSERS.values()):
+            add_parser(subparsers)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
     
-    args = parser.parse_args()
+    parser = build_parser(_find_command(argv))
+    args = parser.parse_args(argv)
     args.func(args)
 
 
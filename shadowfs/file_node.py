@@ -2,11 +2,35 @@
 FileNode and DirectoryNode - Tree node classes for filesystem representation.
 """
 
-from dataclasses import dataclass, field
-from typing import List, Optional, Union
+import operator
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple, TypeVar, Union, cast
 from datetime import datetime
 
+T = TypeVar("T", bound=type)
 
+
+def _slotted(cls: T) -> T:
+    """
+    Recreate a dataclass with ``__slots__`` for its fields.
+    
+    Equivalent to ``@dataclass(slots=True)``, which needs Python 3.10+.
+    Field defaults live in the generated ``__init__``, so the class
+    attributes that would clash with the slots can be dropped. Slots
+    declared in the class body are kept, for plain attributes that are
+    not dataclass fields.
+    """
+    names = tuple(f.name for f in fields(cast(Any, cls))) + tuple(cls.__dict__.get("__slots__", ()))
+    cls_dict = dict(cls.__dict__)
+    for name in names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    cls_dict["__slots__"] = names
+    return cast(T, type(cls)(cls.__name__, cls.__bases__, cls_dict))
+
+
+@_slotted
 @dataclass
 class FileNode:
     """
@@ -17,6 +41,14 @@ class FileNode:
     size: int = 0
     sha: Optional[str] = None
     mode: str = "100644"
+    # name.lower(), precomputed for tree sorting
+    _name_lower: str = field(init=False, repr=False, compare=False)
+    
+    # Plain class attribute (not a field): a cheap type check for hot loops
+    _is_file = True
+    
+    def __post_init__(self) -> None:
+        self._name_lower = self.name.lower()
     
     @property
     def is_file(self) -> bool:
@@ -41,6 +73,7 @@ class FileNode:
         return f"FileNode({self.name}, size={self.size})"
 
 
+@_slotted
 @dataclass
 class DirectoryNode:
     """
@@ -50,6 +83,40 @@ class DirectoryNode:
     path: str
     children: List[Union["FileNode", "DirectoryNode"]] = field(default_factory=list)
     sha: Optional[str] = None
+    # name -> child, for O(1) get_child
+    _child_index: Dict[str, Union["FileNode", "DirectoryNode"]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # children split by type, so listing and traversal don't re-check types
+    _files: List["FileNode"] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _dirs: List["DirectoryNode"] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _name_lower: str = field(init=False, repr=False, compare=False)
+    # Children in display order (dirs first, then by name); reset by add_child
+    _sorted_children: Optional[List[Union["FileNode", "DirectoryNode"]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    _is_file = False
+    
+    def __post_init__(self) -> None:
+        self._name_lower = self.name.lower()
+        # Set here: with __slots__ there is no class attribute to fall back on
+        self._sorted_children = None
+        for child in self.children:
+            self._index_child(child)
+    
+    def _index_child(self, node: Union["FileNode", "DirectoryNode"]) -> None:
+        """Record a child in the name index and the file/dir lists."""
+        self._child_index.setdefault(node.name, node)
+        # _is_file is cheaper than isinstance() but doesn't narrow the type
+        if node._is_file:
+            self._files.append(cast(FileNode, node))
+        else:
+            self._dirs.append(cast(DirectoryNode, node))
     
     @property
     def is_file(self) -> bool:
@@ -62,13 +129,12 @@ class DirectoryNode:
     def add_child(self, node: Union["FileNode", "DirectoryNode"]) -> None:
         """Add a child node."""
         self.children.append(node)
+        self._index_child(node)
+        self._sorted_children = None
     
     def get_child(self, name: str) -> Optional[Union["FileNode", "DirectoryNode"]]:
         """Get child by name."""
-        for child in self.children:
-            if child.name == name:
-                return child
-        return None
+        return self._child_index.get(name)
     
     def list_names(self) -> List[str]:
         """List names of children."""
@@ -76,11 +142,11 @@ class DirectoryNode:
     
     def list_files(self) -> List["FileNode"]:
         """List file children."""
-        return [c for c in self.children if isinstance(c, FileNode)]
+        return list(self._files)
     
     def list_dirs(self) -> List["DirectoryNode"]:
         """List directory children."""
-        return [c for c in self.children if isinstance(c, DirectoryNode)]
+        return list(self._dirs)
     
     def walk(self):
         """
@@ -89,12 +155,29 @@ class DirectoryNode:
         Yields:
             Tuple of (dirpath, dirnames, filenames).
         """
-        dirnames = [d.name for d in self.list_dirs()]
-        filenames = [f.name for f in self.list_files()]
-        yield self.path, dirnames, filenames
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            subdirs = node._dirs
+            yield node.path, [d.name for d in subdirs], [f.name for f in node._files]
+            # Reversed so subdirectories are visited in order (pre-order, like before)
+            stack.extend(reversed(subdirs))
+    
+    def count(self) -> Tuple[int, int]:
+        """
+        Count files and directories below this one in a single traversal.
         
-        for subdir in self.list_dirs():
-            yield from subdir.walk()
+        Returns:
+            Tuple of (file_count, dir_count), not counting this directory.
+        """
+        files = dirs = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            files += len(node._files)
+            dirs += len(node._dirs)
+            stack.extend(node._dirs)
+        return files, dirs
     
     def to_dict(self, recursive: bool = True) -> dict:
         """Convert to dictionary representation."""
@@ -120,28 +203,32 @@ class DirectoryNode:
         Returns:
             String representation of the tree.
         """
-        lines = []
+        out: List[str] = []
+        self._render(out, prefix, is_last)
+        return "\n".join(out)
+    
+    def _render(self, out: List[str], prefix: str, is_last: bool) -> None:
+        """Append this directory's tree lines to ``out``."""
         connector = "└── " if is_last else "├── "
-        lines.append(f"{prefix}{connector}{self.name}/")
+        out.append(f"{prefix}{connector}{self.name}/")
         
         child_prefix = prefix + ("    " if is_last else "│   ")
         
-        # Sort: directories first, then files
-        sorted_children = sorted(
-            self.children,
-            key=lambda x: (x.is_file, x.name.lower())
-        )
+        sorted_children = self._sorted_children
+        if sorted_children is None:
+            # Sort: directories first, then files
+            by_name = operator.attrgetter("_name_lower")
+            sorted_children = sorted(self._dirs, key=by_name)
+            sorted_children += sorted(self._files, key=by_name)
+            self._sorted_children = sorted_children
         
+        last = len(sorted_children) - 1
         for i, child in enumerate(sorted_children):
-            is_last_child = i == len(sorted_children) - 1
-            
-            if isinstance(child, DirectoryNode):
-                lines.append(child.to_tree_string(child_prefix, is_last_child))
+            if child._is_file:
+                child_connector = "└── " if i == last else "├── "
+                out.append(f"{child_prefix}{child_connector}{child.name}")
             else:
-                child_connector = "└── " if is_last_child else "├── "
-                lines.append(f"{child_prefix}{child_connector}{child.name}")
-        
-        return "\n".join(lines)
+                cast(DirectoryNode, child)._render(out, child_prefix, i == last)
     
     def __repr__(self) -> str:
         return f"DirectoryNode({self.name}, children={len(self.children)})"
@@ -158,24 +245,31 @@ def build_tree_from_paths(paths: List[str]) -> DirectoryNode:
         Root DirectoryNode.
     """
     root = DirectoryNode(name="/", path="/")
+    # Directory prefix -> node, so each directory is created exactly once
+    dirs: Dict[str, DirectoryNode] = {"": root}
     
-    for path in sorted(paths):
+    for path in paths:
         parts = path.strip("/").split("/")
+        last = len(parts) - 1
         current = root
+        prefix = ""
         
         for i, part in enumerate(parts):
-            is_file = i == len(parts) - 1 and "." in part
+            prefix = f"{prefix}/{part}" if prefix else part
             
-            existing = current.get_child(part)
-            if existing:
-                if isinstance(existing, DirectoryNode):
-                    current = existing
-            else:
-                if is_file:
+            if i == last and "." in part:
+                if current.get_child(part) is None:
                     current.add_child(FileNode(name=part, path=path))
-                else:
-                    new_dir = DirectoryNode(name=part, path="/".join(parts[:i+1]))
-                    current.add_child(new_dir)
-                    current = new_dir
+                break
+            
+            node = dirs.get(prefix)
+            if node is None:
+                if current.get_child(part) is not None:
+                    # A file already uses this name; keep descending from here
+                    continue
+                node = DirectoryNode(name=part, path=prefix)
+                current.add_child(node)
+                dirs[prefix] = node
+            current = node
     
     return root
@@ -2,10 +2,51 @@
 GitHubFS - Main class for GitHub filesystem operations.
 """
 
+import atexit
+import hashlib
+import logging
 import os
-from typing import Dict, Optional, List
+import time
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Mapping, Optional, List, TypeVar
 from .repository import Repository
-from .cache import Cache
+from .cache import Cache, DiskCache
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+# Pause until the rate-limit window resets once this few requests remain
+RATE_LIMIT_THRESHOLD = 2
+
+# Most recently used in-memory cache entries saved to cache_dir on close
+PERSISTED_CACHE_ENTRIES = 500
+
+# Clients with a cache to persist that have not been closed yet
+_unclosed: "weakref.WeakSet[GitHubFS]" = weakref.WeakSet()
+
+
+class RateLimitError(RuntimeError):
+    """Raised when the API rate limit would need a longer wait than allowed."""
+    
+    def __init__(self, reset: float):
+        self.reset = reset
+        super().__init__(
+            "GitHub API rate limit exhausted; it resets at "
+            f"{time.strftime('%H:%M:%S', time.localtime(reset))}"
+        )
+
+
+@atexit.register
+def _persist_unclosed() -> None:
+    """Persist the caches of clients still open at interpreter exit."""
+    for fs in list(_unclosed):
+        fs._persist_cache()
 
 
 class GitHubFS:
@@ -24,6 +65,9 @@ class GitHubFS:
         api_url: str = "https://api.github.com",
         cache_enabled: bool = True,
         cache_ttl: int = 300,
+        cache_dir: Optional[str] = None,
+        max_workers: int = 8,
+        max_rate_limit_wait: float = 60.0,
     ):
         """
         Initialize GitHubFS.
@@ -33,25 +77,155 @@ class GitHubFS:
             api_url: GitHub API URL (for GitHub Enterprise support).
             cache_enabled: Enable caching of API responses.
             cache_ttl: Cache time-to-live in seconds.
+            cache_dir: Directory for a persistent cache of directory listings,
+                revalidated with conditional requests. The hottest in-memory
+                cache entries are also saved there on close (or at exit)
+                and reloaded on start. Both are private to the user and
+                scoped to the token and API URL. Disabled if None.
+            max_workers: Maximum number of API requests issued concurrently
+                by operations that fan out (e.g. recursive get_tree).
+            max_rate_limit_wait: Longest wait, in seconds, for the rate
+                limit to reset before a request; RateLimitError is raised
+                instead if the reset is further away.
         """
         self.token = token or os.environ.get("GITHUB_TOKEN")
-        self.api_url = api_url.rstrip("/")
-        self._mounts: Dict[str, Repository] = {}
-        self._cache = Cache(enabled=cache_enabled, ttl=cache_ttl) if cache_enabled else None
-        
         if not self.token:
             raise ValueError(
                 "GitHub token required. Provide via token parameter or GITHUB_TOKEN environment variable."
             )
+        self.api_url = api_url.rstrip("/")
+        self._mounts: Dict[str, Repository] = {}
+        self._cache = Cache(enabled=cache_enabled, ttl=cache_ttl) if cache_enabled else None
+        # Cached responses are only reused with the same credential and host
+        scope = hashlib.sha256(
+            f"{self.api_url}\0{self.token}".encode("utf-8")
+        ).hexdigest()[:16]
+        self._disk_cache = (
+            DiskCache(os.path.join(cache_dir, f"listings-{scope}"), ttl=cache_ttl)
+            if cache_enabled and cache_dir else None
+        )
+        self._persist_path: Optional[str] = None
+        if self._cache is not None and cache_dir:
+            # Keep the hot set across restarts
+            self._persist_path = os.path.join(cache_dir, f"memory-cache-{scope}.ndjson")
+            self._cache.load(self._persist_path)
+            _unclosed.add(self)
+        self._headers: Mapping[str, str] = MappingProxyType({})
+        self._headers_token: Optional[str] = None
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # One pooled session for every mount, so connections are kept alive
+        self._session = requests.Session()
+        self._session_token: Optional[str] = None
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        # Last seen X-RateLimit-Remaining / X-RateLimit-Reset, shared by all mounts
+        self._rate_remaining: Optional[int] = None
+        self._rate_reset = 0.0
+        self.max_rate_limit_wait = max_rate_limit_wait
+    
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """
+        Get headers for GitHub API requests.
+        
+        The mapping is built once and reused for every request; it is only
+        rebuilt if ``token`` is changed. It is read-only.
+        """
+        if self._headers_token != self.token:
+            self._headers = MappingProxyType({
+                "Authorization": f"Bearer {self.token}",
+                "Accept": "application/vnd.github.v3+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            })
+            self._headers_token = self.token
+        return self._headers
     
     @property
-    def headers(self) -> Dict[str, str]:
-        """Get headers for GitHub API requests."""
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/vnd.github.v3+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
+    def session(self) -> requests.Session:
+        """
+        Shared HTTP session for API requests.
+        
+        The session carries the API headers as defaults, refreshed whenever
+        ``token`` changes, so requests only need to pass extra headers.
+        """
+        if self._session_token != self.token:
+            self._session.headers.update(self.headers)
+            self._session_token = self.token
+        return self._session
+    
+    def _update_rate_limit(self, headers: Mapping[str, str]) -> None:
+        """Record the rate-limit state reported by a response."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            self._rate_reset = float(reset)
+            self._rate_remaining = int(remaining)
+        except ValueError:
+            pass
+    
+    def _wait_for_rate_limit(self) -> None:
+        """
+        Sleep until the rate-limit window resets if it is nearly exhausted.
+        
+        Waiting up front avoids a burst of rejected requests when the
+        remaining quota runs out mid-operation.
+        
+        Raises:
+            RateLimitError: If the reset is more than max_rate_limit_wait
+                seconds away.
+        """
+        remaining = self._rate_remaining
+        if remaining is None or remaining > RATE_LIMIT_THRESHOLD:
+            return
+        delay = self._rate_reset - time.time()
+        if delay > self.max_rate_limit_wait:
+            raise RateLimitError(self._rate_reset)
+        if delay > 0:
+            logger.warning("GitHub API rate limit nearly exhausted; waiting %.0fs for reset", delay)
+            time.sleep(delay)
+        # The next response reports the fresh window
+        self._rate_remaining = None
+    
+    def _map(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """
+        Apply ``fn`` to each item concurrently, returning results in order.
+        
+        Used to overlap independent API round-trips. The worker pool is
+        created on first use; a single item is run inline. The first
+        exception raised by ``fn`` is re-raised.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [fn(item) for item in items]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="shadowfs"
+            )
+        return list(self._executor.map(fn, items))
+    
+    def _persist_cache(self) -> None:
+        """Save the hottest cache entries, keeping other clients' live ones."""
+        if self not in _unclosed:
+            return
+        _unclosed.discard(self)
+        if self._cache is None or self._persist_path is None:
+            return
+        # Another client may have saved since we loaded: our entries win, and
+        # its tombstones drop what it invalidated (e.g. by a commit)
+        self._cache.load(self._persist_path, replace=False)
+        self._cache.persist(self._persist_path, PERSISTED_CACHE_ENTRIES)
+    
+    def close(self) -> None:
+        """Persist the cache and release the worker threads and pooled connections."""
+        self._persist_cache()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._session.close()
     
     def mount(self, repo_path: str, branch: Optional[str] = None) -> Repository:
         """
@@ -3,17 +3,20 @@ GUI - Rich console interface for checkpoint/restore.
 Similar to GitHub Copilot's checkpoint GUI in VS Code.
 """
 
+import io
 import os
 import sys
+import functools
+import textwrap
 from datetime import datetime
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Dict, TextIO, Tuple, Union
 from dataclasses import dataclass
 
 from .session import Session, LLMCall, AutoCheckpoint
 from .checkpoint import CheckpointManager, Checkpoint
 
 
-# ANSI color codes
+# ANSI escape sequences; c() merges several into a single escape
 class Colors:
     RESET = "\033[0m"
     BOLD = "\033[1m"
@@ -38,6 +41,9 @@ class Colors:
     BG_WHITE = "\033[47m"
 
 
+_RESET = "\033[0m"
+
+
 def supports_color() -> bool:
     """Check if terminal supports colors."""
     if os.environ.get("NO_COLOR"):
@@ -47,12 +53,127 @@ def supports_color() -> bool:
     return hasattr(sys.stdout, "isatty") and sys.stdout.isatty()
 
 
-def c(text: str, *colors: str) -> str:
-    """Apply colors to text if supported."""
-    if not supports_color():
-        return text
-    color_str = "".join(colors)
-    return f"{color_str}{text}{Colors.RESET}"
+# Detected once; call _refresh_color() after changing NO_COLOR/FORCE_COLOR or stdout
+_COLOR_ENABLED = supports_color()
+
+
+def _c_plain(text: str, *colors: str) -> str:
+    """c() for terminals without color support: returns text unchanged."""
+    return text
+
+
+@functools.lru_cache(maxsize=256)
+def _sgr(colors: Tuple[str, ...]) -> str:
+    """Merge escape sequences (or bare SGR parameters) into a single escape."""
+    params = ";".join(
+        code[2:-1] if code.startswith("\033[") else code for code in colors
+    )
+    return f"\033[{params}m"
+
+
+def _c_color(text: str, *colors: str) -> str:
+    """c() for color terminals: wraps text in a single SGR escape."""
+    return f"{_sgr(colors)}{text}{_RESET}"
+
+
+# Apply colors to text if supported; bound to the right variant up front
+c = _c_color if _COLOR_ENABLED else _c_plain
+
+
+# Colored strings reused on every render; set by _build_styles()
+_BAR: str
+_BADGES: Dict[str, str]
+# Template for statuses without a dedicated badge
+_UNKNOWN_BADGE_FMT: str
+# Diff status -> (icon, label); anything unrecognised is shown as modified
+_STATUS_DECOR: Dict[str, Tuple[str, str]]
+
+
+def _build_styles() -> None:
+    """Precompute the colored strings reused on every render."""
+    global _BAR, _BADGES, _UNKNOWN_BADGE_FMT, _STATUS_DECOR
+    _BAR = c("║", Colors.CYAN)
+    _BADGES = {
+        "completed": c(" ✓ DONE ", Colors.BG_GREEN, Colors.BLACK),
+        "failed": c(" ✗ FAIL ", Colors.BG_RED, Colors.WHITE),
+        "pending": c(" ⏳ RUN  ", Colors.BG_YELLOW, Colors.BLACK),
+        "restored": c(" ↩ REST ", Colors.BG_BLUE, Colors.WHITE),
+    }
+    _UNKNOWN_BADGE_FMT = c(" {} ", Colors.DIM)
+    _STATUS_DECOR = {
+        "added": (c("➕", Colors.GREEN), c("added", Colors.GREEN)),
+        "deleted": (c("➖", Colors.RED), c("deleted", Colors.RED)),
+        "modified": (c("✏️ ", Colors.YELLOW), c("modified", Colors.YELLOW)),
+    }
+
+
+_build_styles()
+
+
+def _refresh_color() -> None:
+    """Re-detect color support and rebuild the precomputed styles."""
+    global _COLOR_ENABLED, c
+    _COLOR_ENABLED = supports_color()
+    c = _c_color if _COLOR_ENABLED else _c_plain
+    _build_styles()
+
+
+# Call timestamps and durations never change, so repeated renders reuse the text
+@functools.lru_cache(maxsize=1024)
+def _format_time(timestamp: str) -> str:
+    """Format timestamp for display."""
+    try:
+        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        return dt.strftime("%I:%M %p")
+    except:
+        return timestamp[:8]
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_duration(ms: Optional[int]) -> str:
+    """Format duration."""
+    if ms is None:
+        return ""
+    if ms < 1000:
+        return f"{ms}ms"
+    return f"{ms/1000:.1f}s"
+
+
+# Menu icons for interactive_restore
+_STATUS_ICONS = {"completed": "✅", "failed": "❌", "pending": "⏳", "restored": "↩️"}
+
+
+@functools.lru_cache(maxsize=128)
+def _spaces(n: int) -> str:
+    """Return a run of n spaces (widths repeat, so these are cached)."""
+    return " " * n
+
+
+# Fixed gaps used by every call card
+_PAD25 = " " * 25
+_PAD5 = " " * 5
+
+
+def _cwrite(buf: TextIO, text: str, *colors: str) -> None:
+    """Write text to buf with colors applied, like buf.write(c(text, *colors))."""
+    if _COLOR_ENABLED:
+        buf.write(_sgr(colors))
+        buf.write(text)
+        buf.write(_RESET)
+    else:
+        buf.write(text)
+
+
+def _truncate(text: str, n: int, suffix: str = "...") -> str:
+    """Cut text to n characters, marking the cut with suffix."""
+    return text[:n] + suffix if len(text) > n else text
+
+
+def _count_lines(text: Union[str, bytes]) -> int:
+    """Count lines like len(text.splitlines()) for \n endings, without the list."""
+    if isinstance(text, bytes):
+        return text.count(b"\n") + (0 if not text or text.endswith(b"\n") else 1)
+    return text.count("\n") + (0 if not text or text.endswith("\n") else 1)
 
 
 class CheckpointGUI:
@@ -82,44 +203,38 @@ class CheckpointGUI:
             self.session = session
         else:
             self.session = AutoCheckpoint.get_instance().session
+        # Lines of the frame being rendered, written out in one go by _flush()
+        self._buf: List[str] = []
     
-    def _format_time(self, timestamp: str) -> str:
-        """Format timestamp for display."""
-        try:
-            dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            return dt.strftime("%I:%M %p")
-        except:
-            return timestamp[:8]
+    def _emit(self, line: str) -> None:
+        """Queue a line of output."""
+        self._buf.append(line)
     
-    def _format_duration(self, ms: Optional[int]) -> str:
-        """Format duration."""
-        if ms is None:
-            return ""
-        if ms < 1000:
-            return f"{ms}ms"
-        return f"{ms/1000:.1f}s"
+    def _render_frame(self) -> str:
+        """Join the queued lines into one frame and reset the buffer."""
+        frame = "\n".join(self._buf) + "\n"
+        self._buf.clear()
+        return frame
+    
+    def _flush(self) -> None:
+        """Write the queued lines to stdout with a single write() call."""
+        if not self._buf:
+            return
+        sys.stdout.write(self._render_frame())
     
     def _status_badge(self, status: str) -> str:
         """Get colored status badge."""
-        badges = {
-            "completed": c(" ✓ DONE ", Colors.BG_GREEN, Colors.BLACK),
-            "failed": c(" ✗ FAIL ", Colors.BG_RED, Colors.WHITE),
-            "pending": c(" ⏳ RUN  ", Colors.BG_YELLOW, Colors.BLACK),
-            "restored": c(" ↩ REST ", Colors.BG_BLUE, Colors.WHITE),
-        }
-        return badges.get(status, c(f" {status} ", Colors.DIM))
+        badge = _BADGES.get(status)
+        return badge if badge is not None else _UNKNOWN_BADGE_FMT.format(status)
     
     def header(self, title: str, width: int = 70) -> str:
         """Generate header box."""
         lines = []
         lines.append(c("╔" + "═" * (width - 2) + "╗", Colors.CYAN))
         
-        # Center title
-        padding = (width - 4 - len(title)) // 2
-        title_line = "║" + " " * padding + c(title, Colors.BOLD, Colors.WHITE) + " " * (width - 4 - padding - len(title)) + "║"
-        lines.append(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-        lines.append(c("║", Colors.CYAN) + " " * padding + c(title, Colors.BOLD, Colors.WHITE) + " " * (width - 4 - padding - len(title)) + c("║", Colors.CYAN))
-        lines.append(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
+        lines.append(f"{_BAR}{_spaces(width - 2)}{_BAR}")
+        lines.append(f"{_BAR}{c(title.center(width - 4), Colors.BOLD, Colors.WHITE)}{_BAR}")
+        lines.append(f"{_BAR}{_spaces(width - 2)}{_BAR}")
         lines.append(c("╠" + "═" * (width - 2) + "╣", Colors.CYAN))
         
         return "\n".join(lines)
@@ -144,25 +259,27 @@ class CheckpointGUI:
         if show_model:
             self._show_model_bar(width)
         
-        print(self.header("🔄 Restore Points (Before LLM Calls)", width))
+        self._emit(self.header("🔄 Restore Points (Before LLM Calls)", width))
         
-        history = self.session.get_history()[:limit]
+        history = self.session.get_history(limit=limit)
         
         if not history:
-            print(c("║", Colors.CYAN) + "  No restore points yet. " + " " * 42 + c("║", Colors.CYAN))
-            print(c("║", Colors.CYAN) + "  Use session.llm_call() to create checkpoints automatically." + " " * 6 + c("║", Colors.CYAN))
-            print(self.footer(width))
+            self._emit(f"{_BAR}{'  No restore points yet. ':<67}{_BAR}")
+            self._emit(f"{_BAR}{'  Use session.llm_call() to create checkpoints automatically.':<67}{_BAR}")
+            self._emit(self.footer(width))
+            self._flush()
             return
         
         for i, call in enumerate(history):
             self._render_call_card(call, width, is_last=(i == len(history) - 1))
         
         # Help text
-        print(c("╠" + "═" * (width - 2) + "╣", Colors.CYAN))
-        print(c("║", Colors.CYAN) + c("  💡 Commands:", Colors.YELLOW) + " " * 53 + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"     {c('session.restore_before_call', Colors.GREEN)}('{c('call-XXXX', Colors.CYAN)}')" + " " * 24 + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"     {c('session.show_diff_since_call', Colors.GREEN)}('{c('call-XXXX', Colors.CYAN)}')" + " " * 22 + c("║", Colors.CYAN))
-        print(self.footer(width))
+        self._emit(c("╠" + "═" * (width - 2) + "╣", Colors.CYAN))
+        self._emit(f"{_BAR}{c('  💡 Commands:', Colors.YELLOW)}{_spaces(53)}{_BAR}")
+        self._emit(f"{_BAR}     {c('session.restore_before_call', Colors.GREEN)}('{c('call-XXXX', Colors.CYAN)}'){_spaces(24)}{_BAR}")
+        self._emit(f"{_BAR}     {c('session.show_diff_since_call', Colors.GREEN)}('{c('call-XXXX', Colors.CYAN)}'){_spaces(22)}{_BAR}")
+        self._emit(self.footer(width))
+        self._flush()
     
     def _show_model_bar(self, width: int = 70) -> None:
         """Show the current model selection bar (like Copilot's model dropdown)."""
@@ -189,48 +306,74 @@ class CheckpointGUI:
             features.append("⚡")
         features_str = " ".join(features)
         
-        print()
-        print(c("┌" + "─" * (width - 2) + "┐", Colors.MAGENTA))
-        print(c("│", Colors.MAGENTA) + f"  {icon} {c('Model:', Colors.DIM)} {c(model.name, Colors.MAGENTA, Colors.BOLD)}  {features_str}" + " " * (width - 18 - len(model.name) - len(features_str)) + c("│", Colors.MAGENTA))
-        print(c("│", Colors.MAGENTA) + f"     {c(model.description[:50], Colors.DIM)}" + " " * (width - 8 - min(50, len(model.description))) + c("│", Colors.MAGENTA))
-        print(c("│", Colors.MAGENTA) + f"     {c(f'Context: {model.context_window//1000}K tokens', Colors.DIM)}" + " " * (width - 30) + c("[Change: session.select_model()]", Colors.DIM) + c("│", Colors.MAGENTA))
-        print(c("└" + "─" * (width - 2) + "┘", Colors.MAGENTA))
-        print()
+        self._emit("")
+        self._emit(c("┌" + "─" * (width - 2) + "┐", Colors.MAGENTA))
+        side = c("│", Colors.MAGENTA)
+        self._emit("".join((
+            side,
+            f"  {icon} {c('Model:', Colors.DIM)} {c(model.name, Colors.MAGENTA, Colors.BOLD)}  ",
+            f"{features_str:<{max(0, width - 18 - len(model.name))}}",
+            side,
+        )))
+        self._emit("".join((
+            side,
+            f"     {c(model.description[:50], Colors.DIM)}",
+            f"{_spaces(width - 8 - min(50, len(model.description)))}",
+            side,
+        )))
+        self._emit("".join((
+            side,
+            f"     {c(f'Context: {model.context_window//1000}K tokens', Colors.DIM)}{_spaces(width - 30)}",
+            c("[Change: session.select_model()]", Colors.DIM),
+            side,
+        )))
+        self._emit(c("└" + "─" * (width - 2) + "┘", Colors.MAGENTA))
+        self._emit("")
     
     def _render_call_card(self, call: LLMCall, width: int, is_last: bool = False) -> None:
         """Render a single LLM call card."""
-        # Time and status line
-        time_str = self._format_time(call.timestamp)
-        status = self._status_badge(call.status)
-        duration = self._format_duration(call.duration_ms)
+        prompt = _truncate(call.prompt_preview, 50)
         
-        # Call ID
-        call_id = c(call.id, Colors.CYAN, Colors.BOLD)
+        # The card is assembled in one buffer; colored spans are written in
+        # place rather than built as separate strings first. Columns are
+        # padded on the visible text, so they line up with colors on too.
+        buf = io.StringIO()
+        write = buf.write
         
-        # Model
-        model = c(call.model, Colors.MAGENTA)
+        write(f"{_BAR}{_spaces(width - 2)}{_BAR}\n")
         
-        # Files
-        file_count = len(call.files_modified)
-        files_str = c(f"{file_count} file{'s' if file_count != 1 else ''}", Colors.DIM)
+        # Status, call ID and time
+        write(f"{_BAR}  {self._status_badge(call.status)}  ")
+        _cwrite(buf, call.id, Colors.CYAN, Colors.BOLD)
+        write(f"  {_format_time(call.timestamp)}{_PAD25}{_BAR}\n")
         
-        # Prompt preview
-        prompt = call.prompt_preview[:50] + ("..." if len(call.prompt_preview) > 50 else "")
+        # Model and duration
+        write(f"{_BAR}  │  🤖 ")
+        _cwrite(buf, call.model, Colors.MAGENTA)
+        write(f"{_spaces(15 - len(call.model))} {_format_duration(call.duration_ms):>10}{_PAD25}{_BAR}\n")
         
-        print(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  {status}  {call_id}  {time_str}" + " " * 25 + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  │  🤖 {model:<15} {duration:>10}" + " " * 25 + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  │  📝 {c(prompt, Colors.DIM):<50}" + " " * 5 + c("║", Colors.CYAN))
+        # Prompt preview
+        write(f"{_BAR}  │  📝 ")
+        _cwrite(buf, prompt, Colors.DIM)
+        write(f"{_spaces(50 - len(prompt))}{_PAD5}{_BAR}")
         
         if call.files_modified:
             files_preview = ", ".join(call.files_modified[:3])
             if len(call.files_modified) > 3:
                 files_preview += f" +{len(call.files_modified) - 3} more"
-            print(c("║", Colors.CYAN) + f"  │  📁 {c(files_preview[:50], Colors.DIM):<50}" + " " * 5 + c("║", Colors.CYAN))
+            files_preview = files_preview[:50]
+            write(f"\n{_BAR}  │  📁 ")
+            _cwrite(buf, files_preview, Colors.DIM)
+            write(f"{_spaces(50 - len(files_preview))}{_PAD5}{_BAR}")
         
         if not is_last:
-            print(c("║", Colors.CYAN) + c("  │", Colors.DIM) + " " * (width - 5) + c("║", Colors.CYAN))
-            print(c("║", Colors.CYAN) + c("  ▼", Colors.DIM) + " " * (width - 5) + c("║", Colors.CYAN))
+            write(f"\n{_BAR}")
+            _cwrite(buf, "  │", Colors.DIM)
+            write(f"{_spaces(width - 5)}{_BAR}\n{_BAR}")
+            _cwrite(buf, "  ▼", Colors.DIM)
+            write(f"{_spaces(width - 5)}{_BAR}")
+        
+        self._emit(buf.getvalue())
     
     def show_call_details(self, call_id: str) -> None:
         """Show detailed view of a specific call."""
@@ -241,37 +384,36 @@ class CheckpointGUI:
         
         width = 70
         
-        print(self.header(f"📋 Restore Point Details: {call_id}", width))
+        self._emit(self.header(f"📋 Restore Point Details: {call_id}", width))
         
-        print(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  {c('Call ID:', Colors.BOLD)} {call.id}" + " " * (width - 15 - len(call.id)) + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  {c('Model:', Colors.BOLD)} {call.model}" + " " * (width - 13 - len(call.model)) + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  {c('Status:', Colors.BOLD)} {self._status_badge(call.status)}" + " " * (width - 23) + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  {c('Time:', Colors.BOLD)} {call.timestamp}" + " " * (width - 12 - len(call.timestamp)) + c("║", Colors.CYAN))
+        self._emit(f"{_BAR}{_spaces(width - 2)}{_BAR}")
+        self._emit(f"{_BAR}  {c('Call ID:', Colors.BOLD)} {call.id:<{width - 15}}{_BAR}")
+        self._emit(f"{_BAR}  {c('Model:', Colors.BOLD)} {call.model:<{width - 13}}{_BAR}")
+        self._emit(f"{_BAR}  {c('Status:', Colors.BOLD)} {self._status_badge(call.status)}{_spaces(width - 23)}{_BAR}")
+        self._emit(f"{_BAR}  {c('Time:', Colors.BOLD)} {call.timestamp:<{width - 12}}{_BAR}")
         
         if call.duration_ms:
-            dur = self._format_duration(call.duration_ms)
-            print(c("║", Colors.CYAN) + f"  {c('Duration:', Colors.BOLD)} {dur}" + " " * (width - 15 - len(dur)) + c("║", Colors.CYAN))
+            dur = _format_duration(call.duration_ms)
+            self._emit(f"{_BAR}  {c('Duration:', Colors.BOLD)} {dur:<{width - 15}}{_BAR}")
         
-        print(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  {c('Prompt:', Colors.BOLD)}" + " " * (width - 12) + c("║", Colors.CYAN))
+        self._emit(f"{_BAR}{_spaces(width - 2)}{_BAR}")
+        self._emit(f"{_BAR}  {c('Prompt:', Colors.BOLD)}{_spaces(width - 12)}{_BAR}")
         
-        # Word wrap prompt
-        prompt = call.prompt_preview
-        for i in range(0, len(prompt), width - 8):
-            chunk = prompt[i:i + width - 8]
-            print(c("║", Colors.CYAN) + f"    {c(chunk, Colors.DIM)}" + " " * (width - 6 - len(chunk)) + c("║", Colors.CYAN))
+        # Word wrap prompt (prompt_preview is already capped by the session)
+        for chunk in textwrap.wrap(call.prompt_preview, width - 8):
+            self._emit(f"{_BAR}    {c(chunk, Colors.DIM)}{_spaces(width - 6 - len(chunk))}{_BAR}")
         
         if call.files_modified:
-            print(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-            print(c("║", Colors.CYAN) + f"  {c('Files Modified:', Colors.BOLD)}" + " " * (width - 20) + c("║", Colors.CYAN))
+            self._emit(f"{_BAR}{_spaces(width - 2)}{_BAR}")
+            self._emit(f"{_BAR}  {c('Files Modified:', Colors.BOLD)}{_spaces(width - 20)}{_BAR}")
             for f in call.files_modified:
-                print(c("║", Colors.CYAN) + f"    • {c(f, Colors.GREEN)}" + " " * (width - 8 - len(f)) + c("║", Colors.CYAN))
+                self._emit(f"{_BAR}    • {c(f, Colors.GREEN)}{_spaces(width - 8 - len(f))}{_BAR}")
         
-        print(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-        print(c("╠" + "═" * (width - 2) + "╣", Colors.CYAN))
-        print(c("║", Colors.CYAN) + f"  {c('Restore:', Colors.YELLOW)} session.restore_before_call('{call.id}')" + " " * 10 + c("║", Colors.CYAN))
-        print(self.footer(width))
+        self._emit(f"{_BAR}{_spaces(width - 2)}{_BAR}")
+        self._emit(c("╠" + "═" * (width - 2) + "╣", Colors.CYAN))
+        self._emit(f"{_BAR}  {c('Restore:', Colors.YELLOW)} session.restore_before_call('{call.id}'){_spaces(10)}{_BAR}")
+        self._emit(self.footer(width))
+        self._flush()
     
     def show_diff(self, call_id: str) -> None:
         """Show diff since a call with rich formatting."""
@@ -286,94 +428,97 @@ class CheckpointGUI:
         )
         
         width = 70
-        print(self.header(f"📊 Changes Since {call_id}", width))
+        self._emit(self.header(f"📊 Changes Since {call_id}", width))
         
         if not diff:
-            print(c("║", Colors.CYAN) + c("  No changes.", Colors.DIM) + " " * (width - 16) + c("║", Colors.CYAN))
-            print(self.footer(width))
+            self._emit(f"{_BAR}{c('  No changes.', Colors.DIM)}{_spaces(width - 16)}{_BAR}")
+            self._emit(self.footer(width))
+            self._flush()
             return
         
         for path, change in sorted(diff.items()):
             status = change["status"]
             
-            if status == "added":
-                icon = c("➕", Colors.GREEN)
-                label = c("added", Colors.GREEN)
-            elif status == "deleted":
-                icon = c("➖", Colors.RED)
-                label = c("deleted", Colors.RED)
-            else:
-                icon = c("✏️ ", Colors.YELLOW)
-                label = c("modified", Colors.YELLOW)
-            
-            line = f"  {icon} {path} ({label})"
+            icon, label = _STATUS_DECOR.get(status, _STATUS_DECOR["modified"])
             padding = width - 4 - len(path) - 15
-            print(c("║", Colors.CYAN) + f"  {icon} {c(path, Colors.WHITE)} ({label})" + " " * max(1, padding) + c("║", Colors.CYAN))
+            self._emit(f"{_BAR}  {icon} {c(path, Colors.WHITE)} ({label}){_spaces(max(1, padding))}{_BAR}")
             
             if status == "modified":
-                old_lines = len(change["old_content"].splitlines())
-                new_lines = len(change["new_content"].splitlines())
+                old_lines = _count_lines(change["old_content"])
+                new_lines = _count_lines(change["new_content"])
                 delta = new_lines - old_lines
                 delta_str = f"+{delta}" if delta > 0 else str(delta)
-                print(c("║", Colors.CYAN) + f"      {old_lines} → {new_lines} lines ({delta_str})" + " " * 40 + c("║", Colors.CYAN))
+                self._emit(f"{_BAR}      {old_lines} → {new_lines} lines ({delta_str}){_spaces(40)}{_BAR}")
         
-        print(self.footer(width))
+        self._emit(self.footer(width))
+        self._flush()
+    
+    def _format_entry(self, index: int, call: LLMCall) -> str:
+        """Format one menu entry of interactive_restore (three lines)."""
+        status_icon = _STATUS_ICONS.get(call.status, "❓")
+        return (
+            f"  {c(str(index + 1), Colors.CYAN)}) {status_icon} [{call.id}] {call.model} @ {_format_time(call.timestamp)}\n"
+            f"      {c(call.prompt_preview[:60], Colors.DIM)}\n"
+        )
     
-    def interactive_restore(self) -> Optional[str]:
+    def interactive_restore(self, limit: int = 50) -> Optional[str]:
         """
         Interactive restore selection.
         
+        Args:
+            limit: Maximum number of restore points to offer.
+        
         Returns the call ID that was restored, or None if cancelled.
         """
-        history = self.session.get_history()
+        history = self.session.get_history(limit=limit)
         
         if not history:
             print(c("No restore points available.", Colors.YELLOW))
             return None
         
-        print(c("\n📍 Select a restore point:\n", Colors.BOLD))
+        self._emit(c("\n📍 Select a restore point:\n", Colors.BOLD))
+        self._buf.extend(self._format_entry(i, call) for i, call in enumerate(history))
+        self._emit(f"  {c('0', Colors.CYAN)}) Cancel\n")
+        self._flush()
         
-        for i, call in enumerate(history):
-            time_str = self._format_time(call.timestamp)
-            status_icon = {"completed": "✅", "failed": "❌", "pending": "⏳", "restored": "↩️"}.get(call.status, "❓")
-            
-            print(f"  {c(str(i + 1), Colors.CYAN)}) {status_icon} [{call.id}] {call.model} @ {time_str}")
-            print(f"      {c(call.prompt_preview[:60], Colors.DIM)}")
-            print()
+        try:
+            choice = input(c("Enter number: ", Colors.YELLOW)).strip()
+        except KeyboardInterrupt:
+            print(c("\nCancelled.", Colors.DIM))
+            return None
         
-        print(f"  {c('0', Colors.CYAN)}) Cancel")
-        print()
+        digits = choice[1:] if choice.startswith("-") else choice
+        if not digits.isdecimal():
+            print(c("\nCancelled.", Colors.DIM))
+            return None
+        idx = int(choice) - 1
+        
+        if idx < 0:
+            print(c("Cancelled.", Colors.DIM))
+            return None
+        
+        if idx >= len(history):
+            print(c("Invalid choice.", Colors.RED))
+            return None
+        
+        call = history[idx]
         
         try:
-            choice = input(c("Enter number: ", Colors.YELLOW))
-            idx = int(choice) - 1
-            
-            if idx < 0:
-                print(c("Cancelled.", Colors.DIM))
-                return None
-            
-            if idx >= len(history):
-                print(c("Invalid choice.", Colors.RED))
-                return None
-            
-            call = history[idx]
-            
             confirm = input(c(f"Restore to before {call.id}? [y/N] ", Colors.YELLOW))
-            if confirm.lower() != 'y':
-                print(c("Cancelled.", Colors.DIM))
-                return None
-            
-            restored = self.session.restore_before_call(call.id)
-            print(c(f"\n✅ Restored {len(restored)} files to state before {call.id}", Colors.GREEN))
-            
-            for path in restored:
-                print(f"   • {c(path, Colors.WHITE)}")
-            
-            return call.id
-            
-        except (ValueError, KeyboardInterrupt):
+        except KeyboardInterrupt:
             print(c("\nCancelled.", Colors.DIM))
             return None
+        if confirm.lower() != 'y':
+            print(c("Cancelled.", Colors.DIM))
+            return None
+        
+        restored = self.session.restore_before_call(call.id)
+        print(c(f"\n✅ Restored {len(restored)} files to state before {call.id}", Colors.GREEN))
+        
+        for path in restored:
+            print(f"   • {c(path, Colors.WHITE)}")
+        
+        return call.id
 
 
 def show_checkpoints(session: Optional[Session] = None, limit: int = 10) -> None:
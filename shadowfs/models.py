@@ -4,10 +4,35 @@ Similar to GitHub Copilot's model selector GUI.
 """
 
 import os
+import sys
+import json
+import bisect
+import operator
+import functools
+import itertools
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Callable
+from types import MappingProxyType, ModuleType
+from typing import Dict, Iterator, List, Mapping, Optional, Any, Callable, Tuple
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:  # Optional speedup (pip install shadowfs[fast])
+    orjson = None  # type: ignore[assignment]
+
+from .file_node import _slotted
+
+
+if orjson is not None:
+    _dumps: Callable[[Any], bytes] = orjson.dumps
+else:
+    _JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    
+    def _dumps(obj: Any) -> bytes:
+        return _JSON_ENCODER.encode(obj).encode("utf-8")
+
 
 class ModelProvider(Enum):
     """Supported model providers."""
@@ -19,9 +44,44 @@ class ModelProvider(Enum):
     CUSTOM = "custom"
 
 
+# API key env var -> is it set, while a render pass is running (None otherwise)
+_env_availability_cache: Optional[Dict[str, bool]] = None
+
+
+@contextmanager
+def _env_cache_scope() -> Iterator[None]:
+    """
+    Read each API key env var at most once until the block exits.
+    
+    Listing and rendering check is_available for every model, and many
+    models share a key. Nested scopes reuse the outer snapshot.
+    """
+    global _env_availability_cache
+    if _env_availability_cache is not None:
+        yield
+        return
+    _env_availability_cache = {}
+    try:
+        yield
+    finally:
+        _env_availability_cache = None
+
+
+@_slotted
 @dataclass
 class ModelConfig:
-    """Configuration for an LLM model."""
+    """
+    Configuration for an LLM model.
+    
+    Configs must not be mutated after construction: derived values such
+    as the to_dict() result and the selector row cells are computed once
+    and would go stale.
+    """
+    # Derived values, kept out of fields() so asdict() and comparisons ignore them:
+    # the to_dict() result (built on first use), the list_models() ordering
+    # (provider value, name), and the model selector row cells
+    __slots__ = ("_cached_dict", "_sort_key", "_short_name", "_features_str", "_ctx_str")
+    
     id: str
     name: str
     provider: ModelProvider
@@ -37,6 +97,18 @@ class ModelConfig:
     endpoint: Optional[str] = None
     default_params: Dict[str, Any] = field(default_factory=dict)
     
+    def __post_init__(self) -> None:
+        self._cached_dict: Optional[Dict[str, Any]] = None
+        self._sort_key = (self.provider.value, self.name)
+        self._short_name = self.name[:20]
+        features = []
+        if self.supports_vision:
+            features.append("👁")
+        if self.supports_tools:
+            features.append("🔧")
+        self._features_str = " ".join(features) if features else "  "
+        self._ctx_str = f"{self.context_window // 1000}K"
+    
     @property
     def display_name(self) -> str:
         """Get display name with provider."""
@@ -45,25 +117,42 @@ class ModelConfig:
     @property
     def is_available(self) -> bool:
         """Check if model is available (API key set)."""
-        if not self.api_key_env:
+        key = self.api_key_env
+        if not key:
             return True  # No key required (e.g., Ollama)
-        return bool(os.environ.get(self.api_key_env))
+        cache = _env_availability_cache
+        if cache is None:
+            return bool(os.environ.get(key))
+        available = cache.get(key)
+        if available is None:
+            available = cache[key] = bool(os.environ.get(key))
+        return available
     
     def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "provider": self.provider.value,
-            "description": self.description,
-            "max_tokens": self.max_tokens,
-            "supports_vision": self.supports_vision,
-            "supports_tools": self.supports_tools,
-            "context_window": self.context_window,
-        }
-
-
-# Pre-configured models (like Copilot's model list)
-BUILTIN_MODELS: Dict[str, ModelConfig] = {
+        cached = self._cached_dict
+        if cached is None:
+            cached = self._cached_dict = {
+                "id": self.id,
+                "name": self.name,
+                "provider": self.provider.value,
+                "description": self.description,
+                "max_tokens": self.max_tokens,
+                "supports_vision": self.supports_vision,
+                "supports_tools": self.supports_tools,
+                "context_window": self.context_window,
+            }
+        # Copy so callers can't alter the cached dict
+        return dict(cached)
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize to_dict() as compact UTF-8 JSON (uses orjson if installed)."""
+        if self._cached_dict is None:
+            self.to_dict()
+        return _dumps(self._cached_dict)
+
+
+# Pre-configured models (like Copilot's model list); read-only, shared by all selectors
+BUILTIN_MODELS: Mapping[str, ModelConfig] = MappingProxyType({
     # OpenAI Models
     "gpt-4o": ModelConfig(
         id="gpt-4o",
@@ -243,8 +332,133 @@ BUILTIN_MODELS: Dict[str, ModelConfig] = {
         context_window=131072,
         endpoint="http://localhost:11434",
     ),
+})
+
+
+# quick_select() shortcut -> model ID
+_SHORTCUTS: Dict[str, str] = {
+    "4o": "gpt-4o",
+    "gpt4o": "gpt-4o",
+    "4m": "gpt-4o-mini",
+    "mini": "gpt-4o-mini",
+    "turbo": "gpt-4-turbo",
+    "o1": "o1",
+    "o1m": "o1-mini",
+    "claude": "claude-sonnet-4-20250514",
+    "sonnet": "claude-sonnet-4-20250514",
+    "sonnet4": "claude-sonnet-4-20250514",
+    "opus": "claude-opus-4-20250514",
+    "opus4": "claude-opus-4-20250514",
+    "haiku": "claude-3-5-haiku-20241022",
+    "3.5": "claude-3-5-sonnet-20241022",
+    "gemini": "gemini-2.0-flash",
+    "flash": "gemini-2.0-flash",
+    "pro": "gemini-1.5-pro",
+    "llama": "llama3.3",
+    "codellama": "codellama",
+    "deepseek": "deepseek-coder-v2",
+    "qwen": "qwen2.5-coder",
+}
+
+# Sorted, for prefix lookups by bisection
+_SHORTCUT_KEYS = tuple(sorted(_SHORTCUTS))
+
+
+@functools.lru_cache(maxsize=256)
+def _match_shortcut_prefix(prefix: str) -> Optional[str]:
+    """
+    Resolve a prefix of one or more shortcuts to a model ID.
+    
+    Returns None if no shortcut starts with the prefix, or if the matching
+    shortcuts point at different models.
+    """
+    if not prefix:
+        return None
+    model_ids = set()
+    for key in itertools.islice(_SHORTCUT_KEYS, bisect.bisect_left(_SHORTCUT_KEYS, prefix), None):
+        if not key.startswith(prefix):
+            break
+        model_ids.add(_SHORTCUTS[key])
+    return model_ids.pop() if len(model_ids) == 1 else None
+
+
+# The gui module, imported on first use: it pulls in session and checkpoint,
+# which plain model lookups (e.g. from the CLI) don't need
+_gui_module: Optional[ModuleType] = None
+
+
+def _gui() -> ModuleType:
+    """Get the gui module, importing it the first time."""
+    global _gui_module
+    if _gui_module is None:
+        from . import gui
+        _gui_module = gui
+    return _gui_module
+
+
+# Provider icons shown in the model selector
+_PROVIDER_ICONS: Dict[ModelProvider, str] = {
+    ModelProvider.OPENAI: "🟢",
+    ModelProvider.ANTHROPIC: "🟠",
+    ModelProvider.GOOGLE: "🔵",
+    ModelProvider.AZURE: "☁️",
+    ModelProvider.OLLAMA: "🦙",
+    ModelProvider.CUSTOM: "⚙️",
 }
 
+# Provider headings, e.g. "OPENAI"
+_PROVIDER_UPPER: Dict[ModelProvider, str] = {p: p.value.upper() for p in ModelProvider}
+
+
+# Model selector columns: name cell width, and status cell width (incl. padding)
+_NAME_COLUMN = 22
+_STATUS_COLUMN = 15
+_NO_KEY = "(no key)"
+# Padding strings indexed by length, for the selector's rows
+_SPACES = tuple(" " * n for n in range(80))
+
+
+@functools.lru_cache(maxsize=8)
+def _selector_frame(colorize: Callable[..., str], width: int) -> Dict[str, str]:
+    """
+    Build the fixed border and scaffold strings of ModelSelector.show().
+    
+    Keyed on the gui color function in use, so a change in color support
+    gets a fresh set.
+    """
+    Colors = _gui().Colors
+    
+    bar = colorize("║", Colors.CYAN)
+    selected_name, name_end = colorize("\0", Colors.GREEN, Colors.BOLD).split("\0")
+    return {
+        "bar": bar,
+        "top": colorize("╔" + "═" * (width - 2) + "╗", Colors.CYAN),
+        "separator": colorize("╠" + "═" * (width - 2) + "╣", Colors.CYAN),
+        "bottom": colorize("╚" + "═" * (width - 2) + "╝", Colors.CYAN),
+        "blank": bar + " " * (width - 2) + bar,
+        "title": bar + colorize("  🤖 Model Selector", Colors.BOLD, Colors.WHITE) + " " * (width - 23) + bar,
+        "rule": bar + colorize("  ─" * 35, Colors.DIM) + " " + bar,
+        "legend": bar + colorize("  Legend: 👁 Vision  🔧 Tools  ● Selected", Colors.DIM) + " " * 25 + bar,
+        "selected": colorize("● ", Colors.GREEN, Colors.BOLD),
+        "unselected": colorize("○ ", Colors.DIM),
+        "no_key": colorize(_NO_KEY, Colors.RED),
+        # Escape prefixes for model names, plus the shared reset suffix
+        "name_selected": selected_name,
+        "name_unavailable": colorize("\0", Colors.DIM).split("\0")[0],
+        "name_available": colorize("\0", Colors.WHITE).split("\0")[0],
+        "name_end": name_end,
+    }
+
+
+_BY_SORT_KEY = operator.attrgetter("_sort_key")
+_BY_PROVIDER = operator.attrgetter("provider")
+_PROVIDER_ORDER = {provider: i for i, provider in enumerate(ModelProvider)}
+
+
+def _provider_order_key(model: ModelConfig) -> Tuple[int, str]:
+    """Sort key: provider in declaration order, then name."""
+    return _PROVIDER_ORDER[model.provider], model.name
+
 
 class ModelSelector:
     """
@@ -279,10 +493,16 @@ class ModelSelector:
             default_model: Default model ID.
             custom_models: Additional custom models.
         """
-        self._models: Dict[str, ModelConfig] = BUILTIN_MODELS.copy()
+        # Copy-on-write: the builtin table is shared until models are changed
+        self._models: Mapping[str, ModelConfig] = BUILTIN_MODELS
         
         if custom_models:
-            self._models.update(custom_models)
+            self._models = {**BUILTIN_MODELS, **custom_models}
+        
+        # Derived views, rebuilt lazily after add/remove: provider -> models
+        # sorted by name, and all models in list_models() order
+        self._by_provider: Optional[Dict[ModelProvider, List[ModelConfig]]] = None
+        self._sorted_models: Optional[List[ModelConfig]] = None
         
         self._current_model_id = default_model
         self._on_change_callbacks: List[Callable[[ModelConfig], None]] = []
@@ -307,14 +527,15 @@ class ModelSelector:
         Returns:
             Selected ModelConfig.
         """
-        if model_id not in self._models:
-            raise ValueError(f"Unknown model: {model_id}. Use list_models() to see available models.")
+        try:
+            model = self._models[model_id]
+        except KeyError:
+            raise ValueError(f"Unknown model: {model_id}. Use list_models() to see available models.") from None
         
         self._current_model_id = model_id
-        model = self._models[model_id]
         
-        # Notify callbacks
-        for callback in self._on_change_callbacks:
+        # Notify callbacks (snapshot, so a callback may register or remove others)
+        for callback in tuple(self._on_change_callbacks):
             callback(model)
         
         return model
@@ -325,15 +546,41 @@ class ModelSelector:
     
     def add_model(self, config: ModelConfig) -> None:
         """Add a custom model."""
-        self._models[config.id] = config
+        self._own_models()[config.id] = config
+        self._by_provider = self._sorted_models = None
     
     def remove_model(self, model_id: str) -> bool:
         """Remove a model."""
         if model_id in self._models:
-            del self._models[model_id]
+            del self._own_models()[model_id]
+            self._by_provider = self._sorted_models = None
             return True
         return False
     
+    def _own_models(self) -> Dict[str, ModelConfig]:
+        """Get a model table this selector may modify, copying the shared one first."""
+        models = self._models
+        if not isinstance(models, dict):
+            # Still the shared read-only BUILTIN_MODELS
+            models = self._models = dict(models)
+        return models
+    
+    def _models_by_provider(self) -> Dict[ModelProvider, List[ModelConfig]]:
+        """
+        Get models grouped by provider, each group sorted by name.
+        
+        Providers appear in ModelProvider declaration order, without
+        entries for providers that have no models.
+        """
+        by_provider = self._by_provider
+        if by_provider is None:
+            models = sorted(self._models.values(), key=_provider_order_key)
+            by_provider = self._by_provider = {
+                provider: list(group)
+                for provider, group in itertools.groupby(models, key=_BY_PROVIDER)
+            }
+        return by_provider
+    
     def list_models(
         self,
         provider: Optional[ModelProvider] = None,
@@ -349,62 +596,53 @@ class ModelSelector:
         Returns:
             List of ModelConfig.
         """
-        models = list(self._models.values())
+        models = self._sorted_models
+        if models is None:
+            models = self._sorted_models = sorted(self._models.values(), key=_BY_SORT_KEY)
         
+        # Filtering keeps the order, so the cached sort is reused
         if provider:
             models = [m for m in models if m.provider == provider]
         
         if available_only:
-            models = [m for m in models if m.is_available]
+            with _env_cache_scope():
+                models = [m for m in models if m.is_available]
         
-        return sorted(models, key=lambda m: (m.provider.value, m.name))
+        return list(models) if models is self._sorted_models else models
     
     def get_model(self, model_id: str) -> Optional[ModelConfig]:
         """Get a model by ID."""
         return self._models.get(model_id)
     
+    @_env_cache_scope()
     def show(self, show_unavailable: bool = True) -> None:
         """
         Display model selector GUI.
         
         Similar to Copilot's model dropdown.
         """
-        from .gui import Colors, c, supports_color
+        gui = _gui()
+        Colors, c = gui.Colors, gui.c
         
         width = 75
+        frame = _selector_frame(c, width)
+        bar = frame["bar"]
         
-        print()
-        print(c("╔" + "═" * (width - 2) + "╗", Colors.CYAN))
-        print(c("║", Colors.CYAN) + c("  🤖 Model Selector", Colors.BOLD, Colors.WHITE) + " " * (width - 23) + c("║", Colors.CYAN))
-        print(c("╠" + "═" * (width - 2) + "╣", Colors.CYAN))
-        
-        # Group by provider
-        by_provider: Dict[ModelProvider, List[ModelConfig]] = {}
-        for model in self._models.values():
-            if model.provider not in by_provider:
-                by_provider[model.provider] = []
-            by_provider[model.provider].append(model)
-        
-        for provider in ModelProvider:
-            if provider not in by_provider:
-                continue
-            
-            models = sorted(by_provider[provider], key=lambda m: m.name)
+        lines = [""]
+        lines.append(frame["top"])
+        lines.append(frame["title"])
+        lines.append(frame["separator"])
+        
+        by_provider = self._models_by_provider()
+        
+        for provider, models in by_provider.items():
             
             # Provider header
-            provider_icons = {
-                ModelProvider.OPENAI: "🟢",
-                ModelProvider.ANTHROPIC: "🟠",
-                ModelProvider.GOOGLE: "🔵",
-                ModelProvider.AZURE: "☁️",
-                ModelProvider.OLLAMA: "🦙",
-                ModelProvider.CUSTOM: "⚙️",
-            }
-            icon = provider_icons.get(provider, "•")
+            icon = _PROVIDER_ICONS.get(provider, "•")
             
-            print(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-            print(c("║", Colors.CYAN) + f"  {icon} {c(provider.value.upper(), Colors.BOLD)}" + " " * (width - 8 - len(provider.value)) + c("║", Colors.CYAN))
-            print(c("║", Colors.CYAN) + c("  ─" * 35, Colors.DIM) + " " + c("║", Colors.CYAN))
+            lines.append(frame["blank"])
+            lines.append(f"{bar}  {icon} {c(_PROVIDER_UPPER[provider], Colors.BOLD)}{_SPACES[width - 8 - len(provider.value)]}{bar}")
+            lines.append(frame["rule"])
             
             for model in models:
                 # Check if selected
@@ -417,76 +655,55 @@ class ModelSelector:
                     continue
                 
                 # Selection indicator
-                if is_selected:
-                    indicator = c("● ", Colors.GREEN, Colors.BOLD)
-                else:
-                    indicator = c("○ ", Colors.DIM)
+                indicator = frame["selected"] if is_selected else frame["unselected"]
                 
                 # Model name
-                name = model.name[:20]
+                name = model._short_name
                 if is_selected:
-                    name_str = c(name, Colors.GREEN, Colors.BOLD)
+                    name_start = frame["name_selected"]
                 elif not available:
-                    name_str = c(name, Colors.DIM)
+                    name_start = frame["name_unavailable"]
                 else:
-                    name_str = c(name, Colors.WHITE)
+                    name_start = frame["name_available"]
                 
-                # Features
-                features = []
-                if model.supports_vision:
-                    features.append("👁")
-                if model.supports_tools:
-                    features.append("🔧")
-                features_str = " ".join(features) if features else "  "
-                
-                # Context window
-                ctx = f"{model.context_window // 1000}K"
-                
-                # Availability
-                if not available:
-                    status = c("(no key)", Colors.RED)
-                else:
+                # Availability; padding uses visible widths, not the colored strings
+                if available:
                     status = ""
+                    status_pad = _SPACES[_STATUS_COLUMN]
+                else:
+                    status = frame["no_key"]
+                    status_pad = _SPACES[_STATUS_COLUMN - len(_NO_KEY)]
                 
-                line = f"  {indicator}{name_str:<22} {features_str:<6} {ctx:>6} {status}"
-                padding = width - 4 - 22 - 8 - 8 - len(status) + (len(name_str) - len(name))
-                print(c("║", Colors.CYAN) + f"  {indicator}{name_str}" + " " * (22 - len(name)) + f"{features_str:<6} {ctx:>6} {status}" + " " * max(1, 15 - len(status)) + c("║", Colors.CYAN))
+                lines.append(f"{bar}  {indicator}{name_start}{name}{frame['name_end']}{_SPACES[_NAME_COLUMN - len(name)]}{model._features_str:<6} {model._ctx_str:>6} {status}{status_pad}{bar}")
         
         # Legend
-        print(c("║", Colors.CYAN) + " " * (width - 2) + c("║", Colors.CYAN))
-        print(c("╠" + "═" * (width - 2) + "╣", Colors.CYAN))
-        print(c("║", Colors.CYAN) + c("  Legend: 👁 Vision  🔧 Tools  ● Selected", Colors.DIM) + " " * 25 + c("║", Colors.CYAN))
-        print(c("║", Colors.CYAN) + c(f"  Current: {self.current.name}", Colors.GREEN) + " " * (width - 14 - len(self.current.name)) + c("║", Colors.CYAN))
-        print(c("╚" + "═" * (width - 2) + "╝", Colors.CYAN))
+        lines.append(frame["blank"])
+        lines.append(frame["separator"])
+        lines.append(frame["legend"])
+        current_name = self.current.name
+        lines.append(f"{bar}{c(f'  Current: {current_name}', Colors.GREEN)}{_SPACES[max(0, width - 14 - len(current_name))]}{bar}")
+        lines.append(frame["bottom"])
+        sys.stdout.write("\n".join(lines) + "\n")
     
+    @_env_cache_scope()
     def select(self) -> Optional[ModelConfig]:
         """
         Interactive model selection.
         
         Returns selected model or None if cancelled.
         """
-        from .gui import Colors, c
-        
-        models = self.list_models()
+        gui = _gui()
+        Colors, c = gui.Colors, gui.c
         
-        print(c("\n🤖 Select a model:\n", Colors.BOLD))
+        lines = [c("\n🤖 Select a model:\n", Colors.BOLD)]
         
-        # Group by provider
-        by_provider: Dict[ModelProvider, List[ModelConfig]] = {}
-        for model in models:
-            if model.provider not in by_provider:
-                by_provider[model.provider] = []
-            by_provider[model.provider].append(model)
+        by_provider = self._models_by_provider()
         
         idx = 1
         model_map: Dict[int, ModelConfig] = {}
         
-        for provider in ModelProvider:
-            if provider not in by_provider:
-                continue
-            
-            provider_models = sorted(by_provider[provider], key=lambda m: m.name)
-            print(c(f"  {provider.value.upper()}", Colors.BOLD, Colors.CYAN))
+        for provider, provider_models in by_provider.items():
+            lines.append(c(f"  {_PROVIDER_UPPER[provider]}", Colors.BOLD, Colors.CYAN))
             
             for model in provider_models:
                 is_current = model.id == self._current_model_id
@@ -502,16 +719,17 @@ class ModelSelector:
                 else:
                     name_str = model.name
                 
-                print(f"    {c(str(idx), Colors.CYAN)}) {name_str}{current_marker}{unavailable}")
-                print(f"       {c(model.description, Colors.DIM)}")
+                lines.append(f"    {c(str(idx), Colors.CYAN)}) {name_str}{current_marker}{unavailable}")
+                lines.append(f"       {c(model.description, Colors.DIM)}")
                 
                 model_map[idx] = model
                 idx += 1
             
-            print()
+            lines.append("")
         
-        print(f"  {c('0', Colors.CYAN)}) Cancel")
-        print()
+        lines.append(f"  {c('0', Colors.CYAN)}) Cancel")
+        lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         try:
             choice = input(c("Enter number: ", Colors.YELLOW))
@@ -548,34 +766,19 @@ class ModelSelector:
             - "gemini" / "flash" -> gemini-2.0-flash
             - "llama" -> llama3.3
             - "o1" -> o1
-        """
-        shortcuts = {
-            "4o": "gpt-4o",
-            "gpt4o": "gpt-4o",
-            "4m": "gpt-4o-mini",
-            "mini": "gpt-4o-mini",
-            "turbo": "gpt-4-turbo",
-            "o1": "o1",
-            "o1m": "o1-mini",
-            "claude": "claude-sonnet-4-20250514",
-            "sonnet": "claude-sonnet-4-20250514",
-            "sonnet4": "claude-sonnet-4-20250514",
-            "opus": "claude-opus-4-20250514",
-            "opus4": "claude-opus-4-20250514",
-            "haiku": "claude-3-5-haiku-20241022",
-            "3.5": "claude-3-5-sonnet-20241022",
-            "gemini": "gemini-2.0-flash",
-            "flash": "gemini-2.0-flash",
-            "pro": "gemini-1.5-pro",
-            "llama": "llama3.3",
-            "codellama": "codellama",
-            "deepseek": "deepseek-coder-v2",
-            "qwen": "qwen2.5-coder",
-        }
-        
-        model_id = shortcuts.get(shortcut.lower(), shortcut)
         
-        if model_id in self._models:
+        A model ID, or an unambiguous prefix of a shortcut ("son" for
+        "sonnet"), is accepted too.
+        """
+        # Shortcuts are lowercase, so most inputs hit without lower()
+        model_id = _SHORTCUTS.get(shortcut) or _SHORTCUTS.get(shortcut.lower())
+        if model_id is None:
+            if shortcut in self._models:
+                model_id = shortcut
+            else:
+                model_id = _match_shortcut_prefix(shortcut.lower())
+        
+        if model_id is not None and model_id in self._models:
             return self.set_model(model_id)
         
         return None
@@ -583,14 +786,21 @@ class ModelSelector:
 
 # Global model selector instance
 _global_selector: Optional[ModelSelector] = None
+_global_selector_lock = threading.Lock()
 
 
 def get_model_selector() -> ModelSelector:
     """Get or create global model selector."""
     global _global_selector
-    if _global_selector is None:
-        _global_selector = ModelSelector()
-    return _global_selector
+    selector = _global_selector
+    if selector is None:
+        # Double-checked so concurrent first calls create a single selector,
+        # while later calls never take the lock
+        with _global_selector_lock:
+            selector = _global_selector
+            if selector is None:
+                selector = _global_selector = ModelSelector()
+    return selector
 
 
 def set_model(model_id: str) -> ModelConfig:
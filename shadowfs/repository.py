@@ -2,16 +2,26 @@
 Repository - Represents a mounted GitHub repository.
 """
 
-import base64
+import os
+import sys
+import tempfile
+import threading
+import time
 import requests
-from typing import TYPE_CHECKING, Dict, List, Optional, Any
-from pathlib import PurePosixPath
+from collections import OrderedDict
+from typing import IO, TYPE_CHECKING, Callable, Dict, Hashable, List, Optional, Any, Set, Tuple, cast
 from .file_node import FileNode, DirectoryNode
 
 if TYPE_CHECKING:
     from .github_fs import GitHubFS
     from .cache import Cache
 
+# Asks the contents API for a file's raw bytes instead of base64 in JSON
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+# Cached responses stay revalidatable (via ETag) for this many TTLs
+REVALIDATE_TTL_FACTOR = 12
+
 
 class Repository:
     """
@@ -24,6 +34,7 @@ class Repository:
         fs: "GitHubFS",
         branch: Optional[str] = None,
         cache: Optional["Cache"] = None,
+        max_staged_bytes: Optional[int] = 64 * 1024 * 1024,
     ):
         """
         Initialize Repository.
@@ -33,11 +44,24 @@ class Repository:
             fs: Parent GitHubFS instance.
             branch: Branch name. If None, uses default branch.
             cache: Cache instance for API responses.
+            max_staged_bytes: Memory budget for staged file contents. Past
+                it, the least recently written files are spilled to a
+                temporary file until commit. Unbounded if None.
         """
-        self.path = path
+        self.path = sys.intern(path)
         self._fs = fs
         self._cache = cache
-        self._staged_changes: Dict[str, str] = {}
+        self.max_staged_bytes = max_staged_bytes
+        # Staged contents in write order, with their UTF-8 sizes
+        self._staged_changes: "OrderedDict[str, str]" = OrderedDict()
+        self._staged_sizes: Dict[str, int] = {}
+        self._staged_bytes = 0
+        # Staged files spilled to disk: path -> (offset, size) in _spill_file
+        self._spilled: Dict[str, Tuple[int, int]] = {}
+        self._spill_file: Optional[IO[bytes]] = None
+        self._spill_lock = threading.Lock()
+        # Cache keys made stale by staged changes, dropped once they are committed
+        self._pending_invalidations: Set[Hashable] = set()
         
         # Parse owner and repo
         parts = path.split("/")
@@ -46,32 +70,161 @@ class Repository:
         self.owner, self.name = parts
         
         # Get default branch if not specified
-        self._branch = branch or self._get_default_branch()
+        self._branch = sys.intern(branch or self._get_default_branch())
     
     @property
     def branch(self) -> str:
         """Current branch name."""
         return self._branch
     
+    def _key(self, op: str, path: str = "") -> Tuple[str, str, str, str]:
+        """
+        Build a cache key for an operation on the current branch.
+        
+        Keys are ``(repo, branch, op, path)`` tuples, so everything cached
+        for a branch shares the ``(repo, branch)`` prefix.
+        """
+        return (self.path, self._branch, op, path)
+    
     def _api_url(self, endpoint: str) -> str:
         """Build API URL for endpoint."""
         return f"{self._fs.api_url}/repos/{self.path}/{endpoint}"
     
-    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> requests.Response:
         """Make API request."""
         url = self._api_url(endpoint)
-        response = requests.request(
-            method,
-            url,
-            headers=self._fs.headers,
-            **kwargs,
-        )
+        self._fs._wait_for_rate_limit()
+        response = self._fs.session.request(method, url, headers=headers, **kwargs)
+        self._fs._update_rate_limit(response.headers)
         response.raise_for_status()
         return response
     
+    def _listing_key(self, endpoint: str) -> str:
+        """Disk cache key for a listing of the current branch."""
+        return f"{self.path}/{self._branch}/{endpoint}"
+    
+    @staticmethod
+    def _ancestors(path: str) -> List[str]:
+        """Get every directory containing ``path``, up to the root ("")."""
+        parents = []
+        while path:
+            path = path.rpartition("/")[0]
+            parents.append(path)
+        return parents
+    
+    def _get_listing(self, endpoint: str) -> Any:
+        """
+        GET a directory listing, going through the persistent disk cache.
+        
+        Fresh entries are returned without a request; stale ones are
+        revalidated with a conditional request, where a 304 reuses the body.
+        """
+        params = {"ref": self._branch}
+        disk_cache = self._fs._disk_cache
+        if disk_cache is None:
+            return self._request("GET", endpoint, params=params).json()
+        
+        key = self._listing_key(endpoint)
+        entry = disk_cache.get(key)
+        if entry is not None and disk_cache.is_fresh(entry):
+            return entry["body"]
+        
+        response = self._request(
+            "GET",
+            endpoint,
+            params=params,
+            headers=disk_cache.conditional_headers(entry) if entry else None,
+        )
+        if response.status_code == 304 and entry is not None:
+            disk_cache.touch(key, entry)
+            return entry["body"]
+        
+        body = response.json()
+        disk_cache.set(
+            key,
+            body,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return body
+    
+    def _get_cached(
+        self,
+        op: str,
+        path: str,
+        fetch: Callable[[Optional[str]], Tuple[Any, Optional[str]]],
+        parse: Callable[[Any], Any],
+    ) -> Any:
+        """
+        Get a value through the memory cache, revalidating it once stale.
+        
+        Entries are ``(value, etag, fresh_until)``. A fresh entry is returned
+        as is; a stale one is kept for a while longer so it can be
+        revalidated with ``If-None-Match`` instead of refetched.
+        
+        Args:
+            op: Cache key operation name.
+            path: Normalized path the value belongs to.
+            fetch: Called with the cached ETag (or None); returns the
+                response body and its ETag, or a None body if unchanged.
+            parse: Turns a response body into the value to cache.
+        """
+        cache = self._cache
+        if cache is None:
+            return parse(fetch(None)[0])
+        
+        key = self._key(op, path)
+        entry = cache.get(key)
+        if entry is not None and time.time() < entry[2]:
+            return entry[0]
+        
+        body, etag = fetch(entry[1] if entry is not None else None)
+        if body is None and entry is not None:
+            value = entry[0]
+        else:
+            value = parse(body)
+        
+        cache.set(
+            key,
+            (value, etag, time.time() + cache.ttl),
+            ttl=cache.ttl * REVALIDATE_TTL_FACTOR if etag else None,
+        )
+        return value
+    
+    def _fetch_contents(
+        self, path: str, raw: bool = False
+    ) -> Callable[[Optional[str]], Tuple[Any, Optional[str]]]:
+        """
+        Build a conditional fetch of ``contents/{path}`` for _get_cached.
+        
+        With ``raw``, a file's body is requested as raw bytes rather than
+        base64 inside JSON; directories still come back as a JSON listing.
+        """
+        headers = {"Accept": RAW_MEDIA_TYPE} if raw else {}
+        
+        def fetch(etag: Optional[str]) -> Tuple[Any, Optional[str]]:
+            response = self._request(
+                "GET",
+                f"contents/{path}" if path else "contents",
+                params={"ref": self._branch},
+                headers={**headers, "If-None-Match": etag} if etag else headers or None,
+            )
+            if response.status_code == 304:
+                return None, etag
+            if raw and not response.headers.get("Content-Type", "").startswith("application/json"):
+                return response.content, response.headers.get("ETag")
+            return response.json(), response.headers.get("ETag")
+        return fetch
+    
     def _get_default_branch(self) -> str:
         """Get the default branch name."""
-        cache_key = f"default_branch:{self.path}"
+        cache_key = (self.path, "", "default_branch", "")
         if self._cache:
             cached = self._cache.get(cache_key)
             if cached:
@@ -95,27 +248,21 @@ class Repository:
         Returns:
             List of file/directory names.
         """
-        path = self._normalize_path(path)
-        cache_key = f"listdir:{self.path}:{self._branch}:{path}"
-        
-        if self._cache:
-            cached = self._cache.get(cache_key)
-            if cached:
-                return cached
-        
-        endpoint = f"contents/{path}" if path else "contents"
-        response = self._request("GET", endpoint, params={"ref": self._branch})
-        
-        contents = response.json()
-        if not isinstance(contents, list):
-            raise NotADirectoryError(f"Not a directory: {path}")
-        
-        names = [item["name"] for item in contents]
-        
-        if self._cache:
-            self._cache.set(cache_key, names)
-        
-        return names
+        path = path.strip("/")
+        
+        def parse(contents: Any) -> List[str]:
+            if not isinstance(contents, list):
+                raise NotADirectoryError(f"Not a directory: {path}")
+            return [item["name"] for item in contents]
+        
+        fetch: Callable[[Optional[str]], Tuple[Any, Optional[str]]]
+        if self._fs._disk_cache is not None:
+            # The disk cache does its own revalidation
+            endpoint = f"contents/{path}" if path else "contents"
+            fetch = lambda etag: (self._get_listing(endpoint), None)
+        else:
+            fetch = self._fetch_contents(path)
+        return self._get_cached("listdir", path, fetch, parse)
     
     def read(self, path: str) -> str:
         """
@@ -127,26 +274,14 @@ class Repository:
         Returns:
             File contents as string.
         """
-        path = self._normalize_path(path)
-        cache_key = f"read:{self.path}:{self._branch}:{path}"
-        
-        if self._cache:
-            cached = self._cache.get(cache_key)
-            if cached:
-                return cached
+        path = path.strip("/")
         
-        response = self._request("GET", f"contents/{path}", params={"ref": self._branch})
-        data = response.json()
+        def parse(body: Any) -> str:
+            if not isinstance(body, bytes):
+                raise IsADirectoryError(f"Is a directory: {path}")
+            return body.decode("utf-8")
         
-        if data.get("type") != "file":
-            raise IsADirectoryError(f"Is a directory: {path}")
-        
-        content = base64.b64decode(data["content"]).decode("utf-8")
-        
-        if self._cache:
-            self._cache.set(cache_key, content)
-        
-        return content
+        return self._get_cached("read", path, self._fetch_contents(path, raw=True), parse)
     
     def read_binary(self, path: str) -> bytes:
         """
@@ -158,14 +293,13 @@ class Repository:
         Returns:
             File contents as bytes.
         """
-        path = self._normalize_path(path)
-        response = self._request("GET", f"contents/{path}", params={"ref": self._branch})
-        data = response.json()
+        path = path.strip("/")
+        body, _ = self._fetch_contents(path, raw=True)(None)
         
-        if data.get("type") != "file":
+        if not isinstance(body, bytes):
             raise IsADirectoryError(f"Is a directory: {path}")
         
-        return base64.b64decode(data["content"])
+        return body
     
     def write(self, path: str, content: str, message: Optional[str] = None) -> None:
         """
@@ -176,14 +310,72 @@ class Repository:
             content: File contents.
             message: Commit message (if auto-commit enabled).
         """
-        path = self._normalize_path(path)
+        path = path.strip("/")
+        self._unstage(path)
+        size = len(content.encode("utf-8"))
         self._staged_changes[path] = content
-        
-        # Invalidate cache
-        if self._cache:
-            self._cache.invalidate(f"read:{self.path}:{self._branch}:{path}")
-            parent = str(PurePosixPath(path).parent)
-            self._cache.invalidate(f"listdir:{self.path}:{self._branch}:{parent}")
+        self._staged_sizes[path] = size
+        self._staged_bytes += size
+        self._spill_overflow()
+        
+        # Cached reads still reflect the branch until the commit lands. A new
+        # file can also create directories, so every ancestor listing is stale.
+        if self._cache is not None:
+            self._pending_invalidations.add(self._key("read", path))
+            self._pending_invalidations.add(self._key("info", path))
+            for parent in self._ancestors(path):
+                self._pending_invalidations.add(self._key("listdir", parent))
+                self._pending_invalidations.add(self._key("info", parent))
+    
+    def _unstage(self, path: str) -> None:
+        """Drop a staged file, wherever it is held."""
+        if path in self._staged_changes:
+            del self._staged_changes[path]
+            self._staged_bytes -= self._staged_sizes.pop(path)
+        else:
+            # Its bytes stay in the spill file as dead space until commit
+            self._spilled.pop(path, None)
+    
+    def _spill_overflow(self) -> None:
+        """Spill the oldest staged files to disk while over max_staged_bytes."""
+        if self.max_staged_bytes is None:
+            return
+        # The newest file always stays in memory, however large
+        while self._staged_bytes > self.max_staged_bytes and len(self._staged_changes) > 1:
+            path, content = self._staged_changes.popitem(last=False)
+            size = self._staged_sizes.pop(path)
+            self._staged_bytes -= size
+            
+            spill = self._spill_file
+            if spill is None:
+                spill = self._spill_file = tempfile.TemporaryFile()
+            with self._spill_lock:
+                spill.seek(0, os.SEEK_END)
+                offset = spill.tell()
+                spill.write(content.encode("utf-8"))
+            self._spilled[path] = (offset, size)
+    
+    def _staged_content(self, path: str) -> str:
+        """Get the staged contents of a file, loading it back if spilled."""
+        content = self._staged_changes.get(path)
+        if content is not None:
+            return content
+        offset, size = self._spilled[path]
+        spill = self._spill_file
+        assert spill is not None
+        with self._spill_lock:
+            spill.seek(offset)
+            return spill.read(size).decode("utf-8")
+    
+    def _clear_staged(self) -> None:
+        """Forget all staged files and release the spill file."""
+        self._staged_changes.clear()
+        self._staged_sizes.clear()
+        self._staged_bytes = 0
+        self._spilled.clear()
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
     
     def commit(self, message: str) -> str:
         """
@@ -195,28 +387,18 @@ class Repository:
         Returns:
             Commit SHA.
         """
-        if not self._staged_changes:
+        if not self._staged_changes and not self._spilled:
             raise ValueError("No staged changes to commit")
         
         # Get current tree
         ref_response = self._request("GET", f"git/ref/heads/{self._branch}")
         current_sha = ref_response.json()["object"]["sha"]
         
-        # Create blobs for each file
-        tree_items = []
-        for path, content in self._staged_changes.items():
-            blob_response = self._request(
-                "POST",
-                "git/blobs",
-                json={"content": content, "encoding": "utf-8"},
-            )
-            blob_sha = blob_response.json()["sha"]
-            tree_items.append({
-                "path": path,
-                "mode": "100644",
-                "type": "blob",
-                "sha": blob_sha,
-            })
+        # Create blobs for each file. The uploads are independent of each
+        # other (a blob's SHA depends only on its content), so they run
+        # concurrently; results come back in staging order.
+        staged_paths = [*self._spilled, *self._staged_changes]
+        tree_items = self._fs._map(self._create_blob, staged_paths)
         
         # Create tree
         tree_response = self._request(
@@ -245,11 +427,38 @@ class Repository:
             json={"sha": commit_sha},
         )
         
-        # Clear staged changes
-        self._staged_changes.clear()
+        self._clear_staged()
+        
+        # Listings of the touched directories are stale on disk as well
+        disk_cache = self._fs._disk_cache
+        if disk_cache is not None:
+            parents = {parent for path in staged_paths for parent in self._ancestors(path)}
+            for parent in parents:
+                disk_cache.invalidate(self._listing_key(f"contents/{parent}" if parent else "contents"))
+        
+        # The branch now points at a new tree
+        if self._cache is not None:
+            self._pending_invalidations.add(self._key("tree"))
+            self._pending_invalidations.add(self._key("blob_shas"))
+            self._cache.invalidate_many(self._pending_invalidations)
+        self._pending_invalidations.clear()
         
         return commit_sha
     
+    def _create_blob(self, path: str) -> Dict[str, str]:
+        """Upload one staged file as a blob and return its tree entry."""
+        blob_response = self._request(
+            "POST",
+            "git/blobs",
+            json={"content": self._staged_content(path), "encoding": "utf-8"},
+        )
+        return {
+            "path": path,
+            "mode": "100644",
+            "type": "blob",
+            "sha": blob_response.json()["sha"],
+        }
+    
     def exists(self, path: str) -> bool:
         """Check if path exists."""
         try:
@@ -275,10 +484,16 @@ class Repository:
             return False
     
     def _get_content_info(self, path: str) -> Dict[str, Any]:
-        """Get content info for path."""
-        path = self._normalize_path(path)
-        response = self._request("GET", f"contents/{path}", params={"ref": self._branch})
-        return response.json()
+        """Get the type, SHA and size of a path (directories only have a type)."""
+        path = path.strip("/")
+        
+        def parse(contents: Any) -> Dict[str, Any]:
+            # Keep file bodies out of the cache; a directory comes back as its listing
+            if isinstance(contents, list):
+                return {"type": "dir"}
+            return {name: contents.get(name) for name in ("type", "sha", "size")}
+        
+        return self._get_cached("info", path, self._fetch_contents(path), parse)
     
     def checkout(self, branch: str) -> None:
         """
@@ -287,19 +502,73 @@ class Repository:
         Args:
             branch: Branch name.
         """
-        if self._staged_changes:
+        if self._staged_changes or self._spilled:
             raise RuntimeError("Cannot switch branches with uncommitted changes")
         
-        self._branch = branch
+        old_branch = self._branch
+        self._branch = sys.intern(branch)
         
-        # Clear cache for this repo
-        if self._cache:
-            self._cache.invalidate_prefix(f"*:{self.path}:{self._branch}:")
+        # Drop what was cached for the branch being left
+        if self._cache is not None:
+            self._cache.invalidate_prefix((self.path, old_branch))
+    
+    def _get_git_tree(self) -> Dict[str, Any]:
+        """
+        Get the whole tree of the current branch from one recursive Git
+        Trees API call.
+        
+        Returns:
+            The API response: a flat ``tree`` list of entries (parents before
+            their children) and a ``truncated`` flag set by GitHub when the
+            tree was too large to list in full.
+        """
+        def fetch(etag: Optional[str]) -> Tuple[Any, Optional[str]]:
+            response = self._request(
+                "GET",
+                f"git/trees/{self._branch}",
+                params={"recursive": "1"},
+                headers={"If-None-Match": etag} if etag else None,
+            )
+            if response.status_code == 304:
+                return None, etag
+            return response.json(), response.headers.get("ETag")
+        
+        return cast(Dict[str, Any], self._get_cached("tree", "", fetch, lambda tree: tree))
+    
+    def get_blob_shas(self) -> Dict[str, str]:
+        """
+        Get the blob SHA of every file on the current branch.
+        
+        Uses a single recursive Git Trees API call.
+        
+        Returns:
+            Dict mapping file path (relative to repo root) to blob SHA.
+        """
+        cache_key = self._key("blob_shas")
+        if self._cache is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cast(Dict[str, str], cached)
+        
+        shas = {
+            item["path"]: item["sha"]
+            for item in self._get_git_tree().get("tree", [])
+            if item.get("type") == "blob"
+        }
+        
+        if self._cache is not None:
+            self._cache.set(cache_key, shas)
+        
+        return shas
     
     def get_tree(self, path: str = "/", recursive: bool = False) -> DirectoryNode:
         """
         Get directory tree.
         
+        A recursive tree is built from a single Git Trees API call. If
+        GitHub truncates that listing, the tree is instead fetched one level
+        at a time, listing the directories of each level concurrently.
+        
         Args:
             path: Root path for tree.
             recursive: Include subdirectories recursively.
@@ -307,37 +576,105 @@ class Repository:
         Returns:
             DirectoryNode representing the tree.
         """
-        path = self._normalize_path(path)
-        endpoint = f"contents/{path}" if path else "contents"
-        response = self._request("GET", endpoint, params={"ref": self._branch})
-        
-        contents = response.json()
-        if not isinstance(contents, list):
-            raise NotADirectoryError(f"Not a directory: {path}")
+        path = path.strip("/")
+        if recursive:
+            git_tree = self._get_git_tree()
+            if not git_tree.get("truncated"):
+                return self._build_tree(path, git_tree.get("tree", []))
         
         root = DirectoryNode(name=path or "/", path=path or "/")
         
-        for item in contents:
-            if item["type"] == "file":
-                root.add_child(FileNode(
-                    name=item["name"],
-                    path=item["path"],
-                    size=item["size"],
+        level = [root]
+        while level:
+            listings = self._fs._map(self._list_contents, [node.path for node in level])
+            next_level = []
+            for directory, contents in zip(level, listings):
+                for item in contents:
+                    if item["type"] == "file":
+                        directory.add_child(FileNode(
+                            name=item["name"],
+                            path=item["path"],
+                            size=item["size"],
+                            sha=item["sha"],
+                        ))
+                    elif item["type"] == "dir":
+                        subdir = DirectoryNode(name=item["name"], path=item["path"])
+                        directory.add_child(subdir)
+                        if recursive:
+                            next_level.append(subdir)
+            level = next_level
+        
+        return root
+    
+    @staticmethod
+    def _build_tree(path: str, entries: List[Dict[str, Any]]) -> DirectoryNode:
+        """
+        Build the tree below ``path`` from flat Git Trees API entries.
+        
+        Args:
+            path: Normalized root path ("" for the repository root).
+            entries: Entries of a recursive Git Trees API response.
+            
+        Returns:
+            DirectoryNode representing the tree.
+        """
+        root = DirectoryNode(name=path or "/", path=path or "/")
+        prefix = f"{path}/" if path else ""
+        dirs: Dict[str, DirectoryNode] = {path: root}
+        found = not path
+        
+        for item in entries:
+            item_path = item["path"]
+            if not item_path.startswith(prefix):
+                if item_path == path:
+                    if item["type"] != "tree":
+                        raise NotADirectoryError(f"Not a directory: {path}")
+                    found = True
+                    root.sha = item["sha"]
+                continue
+            
+            parent_path, _, name = item_path.rpartition("/")
+            parent = dirs.get(parent_path)
+            if parent is None:
+                # Entries list parents first; tolerate a missing one anyway
+                parent = root
+                sub_path = path
+                for part in parent_path[len(prefix):].split("/"):
+                    sub_path = f"{sub_path}/{part}" if sub_path else part
+                    node = dirs.get(sub_path)
+                    if node is None:
+                        node = DirectoryNode(name=part, path=sub_path)
+                        parent.add_child(node)
+                        dirs[sub_path] = node
+                    parent = node
+            
+            if item["type"] == "blob":
+                parent.add_child(FileNode(
+                    name=name,
+                    path=item_path,
+                    size=item.get("size", 0),
                     sha=item["sha"],
+                    mode=item.get("mode", "100644"),
                 ))
-            elif item["type"] == "dir":
-                if recursive:
-                    subdir = self.get_tree(item["path"], recursive=True)
-                    root.add_child(subdir)
+            elif item["type"] == "tree":
+                node = dirs.get(item_path)
+                if node is None:
+                    node = DirectoryNode(name=name, path=item_path, sha=item["sha"])
+                    parent.add_child(node)
+                    dirs[item_path] = node
                 else:
-                    root.add_child(DirectoryNode(
-                        name=item["name"],
-                        path=item["path"],
-                    ))
+                    node.sha = item["sha"]
+        
+        if not found:
+            raise FileNotFoundError(f"No such directory: {path}")
         
         return root
     
-    @staticmethod
-    def _normalize_path(path: str) -> str:
-        """Normalize path (remove leading/trailing slashes)."""
-        return path.strip("/")
+    def _list_contents(self, path: str) -> List[Dict[str, Any]]:
+        """Get the raw contents listing of a directory."""
+        path = path.strip("/")
+        endpoint = f"contents/{path}" if path else "contents"
+        contents = self._get_listing(endpoint)
+        if not isinstance(contents, list):
+            raise NotADirectoryError(f"Not a directory: {path}")
+        return contents
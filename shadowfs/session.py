@@ -6,6 +6,7 @@ Similar to GitHub Copilot's restore functionality in the GUI.
 import os
 import time
 import functools
+import itertools
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Callable, Union, TYPE_CHECKING
 from dataclasses import dataclass, field
@@ -290,9 +291,16 @@ class Session:
             return wrapper
         return decorator
     
-    def get_history(self) -> List[LLMCall]:
-        """Get all LLM calls (newest first)."""
-        return list(reversed(self._llm_calls))
+    def get_history(self, limit: Optional[int] = None) -> List[LLMCall]:
+        """
+        Get LLM calls (newest first).
+        
+        Args:
+            limit: Maximum number of calls to return. If None, returns all.
+        """
+        if limit is None:
+            return list(reversed(self._llm_calls))
+        return list(itertools.islice(reversed(self._llm_calls), max(limit, 0)))
     
     def get_call(self, call_id: str) -> Optional[LLMCall]:
         """Get an LLM call by ID."""
@@ -369,7 +377,7 @@ class Session:
             lines.append("╚══════════════════════════════════════════════════════════════════╝")
             return "\n".join(lines)
         
-        history = self.get_history()[:limit]
+        history = self.get_history(limit=limit)
         
         for i, call in enumerate(history):
             # Status indicator
@@ -1,8 +1,12 @@
 """Tests for Cache module."""
 
+import os
+import sys
+import stat
 import time
+import threading
 import pytest
-from shadowfs.cache import Cache
+from shadowfs.cache import Cache, DiskCache
 
 
 class TestCache:
@@ -58,6 +62,19 @@ class TestCache:
         cache.invalidate("key1")
         assert cache.get("key1") is None
     
+    def test_invalidate_many(self):
+        """Test invalidating a batch of keys."""
+        cache = Cache(enabled=True, ttl=60)
+        
+        for i in range(10):
+            cache.set(f"key{i}", i)
+        
+        count = cache.invalidate_many({"key1", "key5", "key9", "missing"})
+        assert count == 3
+        assert cache.size == 7
+        assert cache.get("key5") is None
+        assert cache.get("key0") == 0
+    
     def test_invalidate_prefix(self):
         """Test invalidating by prefix pattern."""
         cache = Cache(enabled=True, ttl=60)
@@ -75,6 +92,58 @@ class TestCache:
         assert cache.get("read:repo2:file1") == "content3"
         assert cache.get("write:repo1:file1") == "content4"
     
+    def test_invalidate_literal_prefix(self):
+        """Test invalidating by a literal prefix without wildcards."""
+        cache = Cache(enabled=True, ttl=60)
+        
+        cache.set("read:repo1:file1", "content1")
+        cache.set("read:repo1:file2", "content2")
+        cache.set("listdir:repo1:", "content3")
+        
+        count = cache.invalidate_prefix("read:repo1:")
+        assert count == 2
+        assert cache.get("listdir:repo1:") == "content3"
+    
+    def test_invalidate_wildcard_pattern(self):
+        """Test invalidating by a pattern with inner wildcards."""
+        cache = Cache(enabled=True, ttl=60)
+        
+        cache.set("read:repo1:main:a.py", "content1")
+        cache.set("listdir:repo1:main:", "content2")
+        cache.set("read:repo2:main:a.py", "content3")
+        
+        count = cache.invalidate_prefix("*:repo1:main:*")
+        assert count == 2
+        assert cache.get("read:repo2:main:a.py") == "content3"
+    
+    def test_tuple_keys(self):
+        """Test tuple keys, including invalidation by a tuple prefix."""
+        cache = Cache(enabled=True, ttl=60)
+        
+        cache.set(("repo1", "main", "read", "a.py"), "content1")
+        cache.set(("repo1", "main", "listdir", ""), ["a.py"])
+        cache.set(("repo1", "dev", "read", "a.py"), "content2")
+        
+        assert cache.get(("repo1", "main", "read", "a.py")) == "content1"
+        assert cache.invalidate_prefix(("repo1", "main")) == 2
+        assert cache.get(("repo1", "main", "listdir", "")) is None
+        assert cache.get(("repo1", "dev", "read", "a.py")) == "content2"
+    
+    def test_tuple_prefix_index(self):
+        """Test that the group index follows removals and evictions."""
+        cache = Cache(enabled=True, ttl=60, max_size=2, shards=1)
+        
+        cache.set(("repo1", "main", "read", "a.py"), 1)
+        cache.set(("repo1", "main", "read", "b.py"), 2)
+        cache.invalidate(("repo1", "main", "read", "a.py"))
+        cache.set(("repo1", "dev", "read", "a.py"), 3)
+        cache.set(("repo1", "dev", "read", "b.py"), 4)  # evicts main/b.py
+        
+        assert ("repo1", "main") not in cache._groups[0]
+        assert cache.invalidate_prefix(("repo1", "main")) == 0
+        assert cache.invalidate_prefix(("repo1", "dev")) == 2
+        assert cache._groups[0] == {}
+    
     def test_clear(self):
         """Test clearing all entries."""
         cache = Cache(enabled=True, ttl=60)
@@ -99,6 +168,34 @@ class TestCache:
         cache.set("key4", "value4")
         assert cache.size == 3
     
+    def test_lru_eviction_order(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = Cache(enabled=True, ttl=60, max_size=3, shards=1)
+        
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.set("key3", "value3")
+        
+        cache.get("key1")  # key2 is now least recently used
+        cache.set("key4", "value4")
+        
+        assert cache.get("key1") == "value1"
+        assert cache.get("key2") is None
+        assert cache.get("key3") == "value3"
+        assert cache.get("key4") == "value4"
+    
+    def test_overwrite_does_not_evict(self):
+        """Test that overwriting an existing key at max size keeps other entries."""
+        cache = Cache(enabled=True, ttl=60, max_size=2)
+        
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.set("key1", "updated")
+        
+        assert cache.size == 2
+        assert cache.get("key1") == "updated"
+        assert cache.get("key2") == "value2"
+    
     def test_stats(self):
         """Test cache statistics."""
         cache = Cache(enabled=True, ttl=60)
@@ -120,6 +217,26 @@ class TestCache:
         assert "key1" in cache
         assert "key2" not in cache
     
+    def test_contains_does_not_touch_stats(self):
+        """Test that membership checks leave hit/miss counters alone."""
+        cache = Cache(enabled=True, ttl=60)
+        
+        cache.set("key1", "value1")
+        assert "key1" in cache
+        assert "key2" not in cache
+        
+        assert cache.stats["hits"] == 0
+        assert cache.stats["misses"] == 0
+    
+    def test_contains_expired(self):
+        """Test that expired entries are not reported as contained."""
+        cache = Cache(enabled=True, ttl=1)
+        
+        cache.set("key1", "value1")
+        time.sleep(1.1)
+        
+        assert "key1" not in cache
+    
     def test_cleanup_expired(self):
         """Test cleanup of expired entries."""
         cache = Cache(enabled=True, ttl=1)
@@ -132,3 +249,283 @@ class TestCache:
         count = cache.cleanup_expired()
         assert count == 1
         assert cache.get("key2") == "value2"
+    
+    def test_concurrent_get_set(self):
+        """Test concurrent readers and writers do not raise or corrupt entries."""
+        cache = Cache(enabled=True, ttl=60, max_size=50)
+        errors = []
+        
+        def worker(offset):
+            try:
+                for i in range(2000):
+                    key = f"key{(i + offset) % 100}"
+                    cache.set(key, key)
+                    value = cache.get(key)
+                    assert value is None or value == key
+                    cache.invalidate_prefix("key9*")
+            except Exception as e:  # pragma: no cover - surfaced via errors
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert errors == []
+        # Racing writers on different shards may overshoot by one entry each
+        assert cache.size <= 50 + len(threads)
+    
+    def test_concurrent_stats(self):
+        """Test that hits and misses counted from many threads are not lost."""
+        cache = Cache(enabled=True, ttl=60, shards=1)
+        cache.set("key", "value")
+        previous = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        
+        def worker():
+            for _ in range(5000):
+                cache.get("key")
+                cache.get("missing")
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(previous)
+        
+        stats = cache.stats
+        assert stats["hits"] == 8 * 5000
+        assert stats["misses"] == 8 * 5000
+    
+    def test_exited_thread_counters_retired(self):
+        """Test that counters of exited threads are folded into the totals."""
+        cache = Cache(enabled=True, ttl=60)
+        cache.set("key", "value")
+        
+        for _ in range(20):
+            t = threading.Thread(target=lambda: (cache.get("key"), cache.get("missing")))
+            t.start()
+            t.join()
+        cache.get("key")
+        
+        assert len(cache._counters) == 1
+        stats = cache.stats
+        assert stats["hits"] == 21
+        assert stats["misses"] == 20
+    
+    def test_shard_count_rounded_to_power_of_two(self):
+        """Test that the shard count is rounded up to a power of two."""
+        cache = Cache(enabled=True, ttl=60, shards=5)
+        
+        assert len(cache._shards) == 8
+    
+    def test_max_size_across_shards(self):
+        """Test that max size is enforced across all shards."""
+        cache = Cache(enabled=True, ttl=60, max_size=10, shards=4)
+        
+        for i in range(100):
+            cache.set(f"key{i}", i)
+        
+        assert cache.size == 10
+        assert cache.get("key99") == 99
+    
+    def test_cleanup_expired_after_overwrite(self):
+        """Test that overwriting a key with a longer TTL keeps it alive."""
+        cache = Cache(enabled=True, ttl=1)
+        
+        cache.set("key1", "value1")
+        cache.set("key1", "value2", ttl=60)
+        
+        time.sleep(1.1)
+        
+        assert cache.cleanup_expired() == 0
+        assert cache.get("key1") == "value2"
+    
+    def test_persist_and_load(self, tmp_path):
+        """Test that entries survive a persist/load round trip."""
+        path = str(tmp_path / "cache.ndjson")
+        cache = Cache(enabled=True, ttl=60)
+        cache.set(("repo1", "main", "read", "a.py"), "content1")
+        cache.set("key1", ["a", "b"], ttl=30)
+        cache.set("unserializable", object())
+        
+        assert cache.persist(path) == 2
+        
+        loaded = Cache(enabled=True, ttl=60)
+        assert loaded.load(path) == 2
+        assert loaded.get(("repo1", "main", "read", "a.py")) == "content1"
+        assert loaded.get("key1") == ["a", "b"]
+        assert loaded._shards[loaded._index("key1")]["key1"][1] <= time.monotonic() + 30
+    
+    def test_persist_limit_keeps_recent(self, tmp_path):
+        """Test that a limited persist keeps the most recently used entries."""
+        path = str(tmp_path / "cache.ndjson")
+        cache = Cache(enabled=True, ttl=60, shards=1)
+        for i in range(5):
+            cache.set(f"key{i}", i)
+        cache.get("key0")
+        
+        assert cache.persist(path, limit=2) == 2
+        
+        loaded = Cache(enabled=True, ttl=60)
+        loaded.load(path)
+        assert loaded.get("key0") == 0
+        assert loaded.get("key4") == 4
+        assert loaded.size == 2
+    
+    def test_persist_limit_underfull_shard(self, tmp_path):
+        """Test that a shard holding fewer entries than its share keeps them all."""
+        path = str(tmp_path / "cache.ndjson")
+        cache = Cache(enabled=True, ttl=60, shards=1)
+        for i in range(3):
+            cache.set(f"key{i}", i)
+        
+        assert cache.persist(path, limit=5) == 3
+        
+        loaded = Cache(enabled=True, ttl=60)
+        assert loaded.load(path) == 3
+    
+    def test_persist_file_private(self, tmp_path):
+        """Test that the persisted file is readable by its owner only."""
+        path = str(tmp_path / "cache.ndjson")
+        cache = Cache(enabled=True, ttl=60)
+        cache.set("key1", "secret")
+        
+        cache.persist(path)
+        
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    
+    def test_load_without_replace_keeps_newer(self, tmp_path):
+        """Test that loading without replace only fills in missing keys."""
+        path = str(tmp_path / "cache.ndjson")
+        old = Cache(enabled=True, ttl=60)
+        old.set("key1", "old")
+        old.set("key2", "other")
+        old.persist(path)
+        
+        cache = Cache(enabled=True, ttl=60)
+        cache.set("key1", "new")
+        
+        assert cache.load(path, replace=False) == 1
+        assert cache.get("key1") == "new"
+        assert cache.get("key2") == "other"
+    
+    def test_persisted_expiry_is_wall_clock(self, tmp_path, monkeypatch):
+        """Test that time passed between persist and load counts against the TTL."""
+        path = str(tmp_path / "cache.ndjson")
+        cache = Cache(enabled=True, ttl=60)
+        cache.set("key1", "value1")
+        cache.persist(path)
+        
+        later = time.time() + 61
+        monkeypatch.setattr(time, "time", lambda: later)
+        
+        loaded = Cache(enabled=True, ttl=60)
+        assert loaded.load(path) == 0
+        assert loaded.get("key1") is None
+    
+    def test_invalidated_key_not_reloaded(self, tmp_path):
+        """Test that an invalidation is persisted and wins over older copies."""
+        path = str(tmp_path / "cache.ndjson")
+        stale = Cache(enabled=True, ttl=60)
+        stale.set("key1", "old")
+        stale.set("key2", "other")
+        stale.persist(path)
+        
+        cache = Cache(enabled=True, ttl=60)
+        cache.load(path)
+        cache.invalidate_many(["key1"])
+        assert cache.load(path, replace=False) == 0
+        assert cache.get("key1") is None
+        cache.persist(path)
+        
+        assert stale.load(path, replace=False) == 0
+        assert stale.get("key1") is None
+        assert stale.get("key2") == "other"
+    
+    def test_unpersisted_cache_keeps_no_tombstones(self):
+        """Test that invalidating in a cache never tied to a file records nothing."""
+        cache = Cache(enabled=True, ttl=60)
+        cache.set("key1", "value1")
+        cache.invalidate("key1")
+        cache.clear()
+        
+        assert cache._tombstones == {}
+    
+    def test_expired_tombstones_pruned(self, tmp_path, monkeypatch):
+        """Test that tombstones are dropped once they outlive every entry."""
+        cache = Cache(enabled=True, ttl=60)
+        cache.load(str(tmp_path / "cache.ndjson"))
+        cache.invalidate_many(["key1", "key2"])
+        assert set(cache._tombstones) == {"key1", "key2"}
+        
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 61)
+        cache.invalidate("key3")
+        
+        assert set(cache._tombstones) == {"key3"}
+    
+    def test_load_missing_file(self, tmp_path):
+        """Test that loading a missing file is a no-op."""
+        cache = Cache(enabled=True, ttl=60)
+        
+        assert cache.load(str(tmp_path / "missing.ndjson")) == 0
+        assert cache.size == 0
+
+
+class TestDiskCache:
+    """Test cases for DiskCache class."""
+    
+    def test_set_and_get(self, tmp_path):
+        """Test that entries persist across instances."""
+        DiskCache(str(tmp_path / "cache")).set("k", [{"name": "a"}], etag='"abc"')
+        
+        entry = DiskCache(str(tmp_path / "cache")).get("k")
+        
+        assert entry["body"] == [{"name": "a"}]
+        assert entry["etag"] == '"abc"'
+    
+    def test_entries_private(self, tmp_path):
+        """Test that the directory and entry files are readable by their owner only."""
+        cache = DiskCache(str(tmp_path / "cache"))
+        cache.set("k", "body")
+        
+        assert stat.S_IMODE(os.stat(tmp_path / "cache").st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(cache._path("k")).st_mode) == 0o600
+    
+    def test_missing_or_corrupt_entry(self, tmp_path):
+        """Test that unreadable entries are treated as misses."""
+        cache = DiskCache(str(tmp_path))
+        assert cache.get("missing") is None
+        
+        with open(cache._path("bad"), "w") as f:
+            f.write("not json")
+        assert cache.get("bad") is None
+    
+    def test_freshness_and_touch(self, tmp_path):
+        """Test TTL freshness and refreshing after revalidation."""
+        cache = DiskCache(str(tmp_path), ttl=60)
+        cache.set("k", "body", etag='"v1"')
+        entry = cache.get("k")
+        assert cache.is_fresh(entry)
+        
+        entry["stored_at"] -= 120
+        assert not cache.is_fresh(entry)
+        
+        cache.touch("k", entry)
+        assert cache.is_fresh(cache.get("k"))
+    
+    def test_conditional_headers(self, tmp_path):
+        """Test building conditional request headers from validators."""
+        cache = DiskCache(str(tmp_path))
+        
+        assert cache.conditional_headers({"etag": '"v1"', "last_modified": None}) == {
+            "If-None-Match": '"v1"',
+        }
+        assert cache.conditional_headers({"etag": None, "last_modified": "Mon"}) == {
+            "If-Modified-Since": "Mon",
+        }
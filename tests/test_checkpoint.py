@@ -2,8 +2,10 @@
 Tests for the checkpoint module.
 """
 
+import json
+import hashlib
 import pytest
-from shadowfs.checkpoint import FileSnapshot, Checkpoint, CheckpointManager
+from shadowfs.checkpoint import _HASH_CHUNK, FileSnapshot, Checkpoint, CheckpointManager
 
 
 class TestFileSnapshot:
@@ -18,6 +20,23 @@ class TestFileSnapshot:
         assert snap.size == len("print('hello')")
         assert len(snap.sha) == 40
     
+    def test_snapshot_sha_is_content_addressed(self):
+        """Test that identical content yields identical SHAs."""
+        a = FileSnapshot(path="a.py", content="same")
+        b = FileSnapshot(path="b.py", content="same")
+        c = FileSnapshot(path="c.py", content="different")
+        
+        assert a.sha == b.sha
+        assert a.sha != c.sha
+    
+    def test_snapshot_sha_of_large_content(self):
+        """Test that content hashed in slices matches a one-shot hash."""
+        content = "é" * (_HASH_CHUNK + 7)
+        
+        snap = FileSnapshot(path="big.txt", content=content)
+        
+        assert snap.sha == hashlib.blake2b(content.encode("utf-8"), digest_size=20).hexdigest()
+    
     def test_snapshot_with_sha(self):
         """Test snapshot with provided SHA."""
         snap = FileSnapshot(
@@ -53,6 +72,14 @@ class TestFileSnapshot:
         assert snap.path == "test.py"
         assert snap.content == "test"
         assert snap.sha == "abc123"
+    
+    def test_snapshot_from_dict_without_sha(self):
+        """Test that a dict missing sha/size still gets them computed."""
+        snap = FileSnapshot.from_dict({"path": "test.py", "content": "test"})
+        
+        assert snap.sha == FileSnapshot(path="x", content="test").sha
+        assert snap.size == 4
+        assert snap == FileSnapshot.from_dict(snap.to_dict())
 
 
 class TestCheckpoint:
@@ -121,6 +148,33 @@ class TestCheckpoint:
         assert restored.description == cp.description
         assert len(restored.files) == 1
         assert restored.metadata["key"] == "value"
+    
+    def test_to_dict_cached_until_add_file(self):
+        """Test that to_dict is cached and refreshed by add_file."""
+        cp = Checkpoint.create(name="test", files={"a.py": "a"})
+        
+        first = cp.to_dict()
+        assert cp.to_dict() is first
+        
+        cp.add_file("b.py", "b")
+        assert set(cp.to_dict()["files"]) == {"a.py", "b.py"}
+    
+    def test_to_dict_cached_per_blob_store(self):
+        """Test that a dict built for one blob store is not reused for another."""
+        cp = Checkpoint.create(name="test", files={"a.py": "a"})
+        snap = cp.files["a.py"]
+        
+        assert "content" not in cp.to_dict(blobs={snap.sha: snap.content})["files"]["a.py"]
+        assert cp.to_dict(blobs={})["files"]["a.py"]["content"] == "a"
+    
+    def test_to_dict_refreshed_on_field_assignment(self):
+        """Test that assigning a field drops the cached dict."""
+        cp = Checkpoint.create(name="test", files={"a.py": "a"})
+        cp.to_dict()
+        
+        cp.name = "renamed"
+        
+        assert cp.to_dict()["name"] == "renamed"
 
 
 class TestCheckpointManager:
@@ -167,6 +221,29 @@ class TestCheckpointManager:
         assert cp is not None
         assert cp.name == "first"
     
+    def test_get_checkpoint_by_name_after_delete(self):
+        """Test that deleting the newest same-named checkpoint falls back to the older one."""
+        manager = CheckpointManager()
+        older = manager.create_checkpoint(name="wip", files={"a.py": "1"})
+        newer = manager.create_checkpoint(name="wip", files={"a.py": "2"})
+        
+        assert manager.get_checkpoint_by_name("wip") is newer
+        
+        manager.delete_checkpoint(newer.id)
+        assert manager.get_checkpoint_by_name("wip") is older
+        
+        manager.delete_checkpoint(older.id)
+        assert manager.get_checkpoint_by_name("wip") is None
+    
+    def test_resolve(self):
+        """Test resolving a checkpoint by ID or name."""
+        manager = CheckpointManager()
+        cp = manager.create_checkpoint(name="first", files={"a.py": "a"})
+        
+        assert manager.resolve(cp.id) is cp
+        assert manager.resolve("first") is cp
+        assert manager.resolve("missing") is None
+    
     def test_list_checkpoints(self):
         """Test listing checkpoints (newest first)."""
         manager = CheckpointManager()
@@ -246,6 +323,24 @@ class TestCheckpointManager:
         assert diff["deleted.py"]["status"] == "deleted"
         assert diff["new.py"]["status"] == "added"
     
+    def test_diff_internal_state(self):
+        """Test diffing against the manager's own current state."""
+        manager = CheckpointManager()
+        cp = manager.create_checkpoint(
+            name="backup",
+            files={"same.py": "same", "changed.py": "before"},
+        )
+        
+        manager.update_current_state("same.py", "".join(["sa", "me"]))
+        manager.update_current_state("changed.py", "after")
+        
+        diff = manager.diff_checkpoint(cp.id)
+        assert set(diff) == {"changed.py"}
+        
+        manager.update_current_state("same.py", "edited")
+        diff = manager.diff_checkpoint(cp.id)
+        assert diff["same.py"]["status"] == "modified"
+    
     def test_delete_checkpoint(self):
         """Test deleting a checkpoint."""
         manager = CheckpointManager()
@@ -275,6 +370,20 @@ class TestCheckpointManager:
         assert history[0]["content"] == "version 1"
         assert history[2]["content"] == "version 3"
     
+    def test_file_history_after_delete(self):
+        """Test that file history skips deleted and unrelated checkpoints."""
+        manager = CheckpointManager()
+        
+        v1 = manager.create_checkpoint(name="v1", files={"test.py": "version 1"})
+        manager.create_checkpoint(name="other", files={"other.py": "x"})
+        manager.create_checkpoint(name="v2", files={"test.py": "version 2"})
+        manager.delete_checkpoint(v1.id)
+        
+        history = manager.get_file_history("test.py")
+        
+        assert [h["checkpoint_name"] for h in history] == ["v2"]
+        assert manager.get_file_history("missing.py") == []
+    
     def test_max_checkpoints_enforcement(self):
         """Test that old checkpoints are removed when max is exceeded."""
         manager = CheckpointManager(max_checkpoints=3)
@@ -304,6 +413,78 @@ class TestCheckpointManager:
         checkpoints = restored.list_checkpoints()
         assert checkpoints[0].name == "test"
     
+    def test_identical_content_is_shared(self):
+        """Test that identical file contents are stored once across checkpoints."""
+        manager = CheckpointManager()
+        
+        content = "x = 1\n" * 100
+        cp1 = manager.create_checkpoint(name="v1", files={"a.py": content})
+        cp2 = manager.create_checkpoint(name="v2", files={"a.py": "".join(["x = 1\n"] * 100)})
+        
+        assert cp1.get_file("a.py").content is cp2.get_file("a.py").content
+        assert len(manager._blobs) == 1
+    
+    def test_delete_releases_blobs(self):
+        """Test that blobs are evicted once no checkpoint references them."""
+        manager = CheckpointManager()
+        cp1 = manager.create_checkpoint(name="v1", files={"a.py": "shared", "b.py": "only v1"})
+        manager.create_checkpoint(name="v2", files={"a.py": "shared"})
+        
+        manager.delete_checkpoint(cp1.id)
+        
+        assert list(manager._blobs.values()) == ["shared"]
+    
+    def test_json_stores_content_once(self):
+        """Test that serialized checkpoints reference shared blobs by SHA."""
+        manager = CheckpointManager()
+        manager.create_checkpoint(name="v1", files={"a.py": "shared"})
+        manager.create_checkpoint(name="v2", files={"a.py": "shared", "b.py": "new"})
+        
+        json_str = manager.to_json()
+        assert json_str.count('"shared"') == 1
+        
+        restored = CheckpointManager.from_json(json_str)
+        v2 = restored.get_checkpoint_by_name("v2")
+        assert v2.get_file("a.py").content == "shared"
+        assert v2.get_file("b.py").content == "new"
+    
+    def test_json_compresses_large_blobs(self):
+        """Test that large blobs are compressed when serialized."""
+        manager = CheckpointManager()
+        content = "def handler(event):\n    return event\n" * 200
+        manager.create_checkpoint(name="big", files={"big.py": content})
+        
+        json_str = manager.to_json()
+        assert len(json_str) < len(content)
+        
+        restored = CheckpointManager.from_json(json_str)
+        assert restored.get_checkpoint_by_name("big").get_file("big.py").content == content
+    
+    def test_from_json_inline_content(self):
+        """Test loading data with content stored inline in each snapshot."""
+        cp = Checkpoint.create(name="old", files={"a.py": "inline"})
+        json_str = json.dumps({
+            "checkpoints": {cp.id: cp.to_dict()},
+            "order": [cp.id],
+            "current_state": {},
+        })
+        
+        restored = CheckpointManager.from_json(json_str)
+        assert restored.get_checkpoint(cp.id).get_file("a.py").content == "inline"
+    
+    def test_json_preserves_order(self):
+        """Test that checkpoint order survives serialization and deletion."""
+        manager = CheckpointManager()
+        first = manager.create_checkpoint(name="first", files={"a.py": "1"})
+        manager.create_checkpoint(name="second", files={"a.py": "2"})
+        manager.create_checkpoint(name="third", files={"a.py": "3"})
+        manager.delete_checkpoint(first.id)
+        
+        restored = CheckpointManager.from_json(manager.to_json())
+        
+        names = [cp.name for cp in restored.list_checkpoints()]
+        assert names == ["third", "second"]
+    
     def test_update_current_state(self):
         """Test updating current state."""
         manager = CheckpointManager()
@@ -334,3 +515,58 @@ class TestCheckpointManagerPersistence:
         cp = loaded.list_checkpoints()[0]
         assert cp.name == "test"
         assert cp.get_file("a.py").content == "content"
+    
+    def test_save_replaces_existing_file(self, tmp_path):
+        """Test that saving over an existing file leaves no temporary file."""
+        filepath = tmp_path / "checkpoints.json"
+        filepath.write_text("stale")
+        
+        manager = CheckpointManager()
+        manager.create_checkpoint(name="test", files={"a.py": "content"})
+        manager.save_to_file(str(filepath))
+        
+        assert [p.name for p in tmp_path.iterdir()] == ["checkpoints.json"]
+        assert len(CheckpointManager.load_from_file(str(filepath))) == 1
+    
+    def test_save_and_load_non_ascii(self, tmp_path):
+        """Test that non-ASCII content survives a save/load round-trip."""
+        filepath = tmp_path / "checkpoints.json"
+        
+        manager = CheckpointManager()
+        manager.create_checkpoint(name="unicode", files={"a.md": "héllo → wörld ✓"})
+        manager.save_to_file(str(filepath))
+        
+        loaded = CheckpointManager.load_from_file(str(filepath))
+        cp = loaded.list_checkpoints()[0]
+        assert cp.get_file("a.md").content == "héllo → wörld ✓"
+    
+    @pytest.mark.parametrize("filename", ["checkpoints.ndjson", "checkpoints.ndjson.gz"])
+    def test_save_and_load_ndjson(self, tmp_path, filename):
+        """Test the line-delimited formats, plain and gzip-compressed."""
+        filepath = tmp_path / filename
+        
+        manager = CheckpointManager()
+        manager.create_checkpoint(name="first", files={"a.py": "line 1\nline 2", "b.py": "b"})
+        manager.create_checkpoint(name="second", files={"a.py": "line 1\nline 2"})
+        manager.update_current_state("c.py", "current ✓")
+        manager.save_to_file(str(filepath))
+        
+        loaded = CheckpointManager.load_from_file(str(filepath))
+        
+        assert [cp.name for cp in loaded.list_checkpoints()] == ["second", "first"]
+        first = loaded.get_checkpoint_by_name("first")
+        assert first.get_file("a.py").content == "line 1\nline 2"
+        assert first.get_file("b.py").content == "b"
+        assert loaded._current_state == {"c.py": "current ✓"}
+        assert len(loaded._blobs) == 2
+    
+    def test_gzip_is_compressed(self, tmp_path):
+        """Test that the .gz format is actually gzip-compressed."""
+        filepath = tmp_path / "checkpoints.ndjson.gz"
+        
+        manager = CheckpointManager()
+        manager.create_checkpoint(name="big", files={"a.py": "x = 1\n" * 10000})
+        manager.save_to_file(str(filepath))
+        
+        assert filepath.read_bytes()[:2] == b"\x1f\x8b"
+        assert filepath.stat().st_size < 10000
@@ -0,0 +1,267 @@
+"""Tests for the command line interface."""
+
+import os
+import stat
+import time
+import threading
+import pytest
+from shadowfs import cli
+from shadowfs.file_node import build_tree_from_paths
+
+
+class FakeRepo:
+    """Repository stand-in serving fixed file contents."""
+    
+    def __init__(self, files):
+        self.files = files
+        self.reads = []
+    
+    def read(self, path):
+        self.reads.append(path)
+        return self.files[path]
+
+
+@pytest.fixture
+def blob_cache(tmp_path, monkeypatch):
+    """Point the blob cache at a temporary directory."""
+    monkeypatch.setattr(cli, "BLOB_CACHE_DIR", str(tmp_path / "blobs"))
+    return tmp_path / "blobs"
+
+
+class TestReadRepoFile:
+    """Test cases for reads through the blob cache."""
+    
+    def test_git_blob_sha(self):
+        """Test that blob SHAs match git hash-object."""
+        assert cli.git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+    
+    def test_cached_by_sha(self, blob_cache):
+        """Test that a verified read is cached and reused without the repo."""
+        sha = cli.git_blob_sha(b"print()")
+        repo = FakeRepo({"a.py": "print()"})
+        
+        assert cli.read_repo_file(repo, "a.py", sha) == "print()"
+        assert cli.read_repo_file(repo, "a.py", sha) == "print()"
+        assert repo.reads == ["a.py"]
+        assert (blob_cache / sha).read_text() == "print()"
+    
+    def test_cached_line_endings_kept(self, blob_cache):
+        """Test that CRLF and bare CR line endings survive a cache hit."""
+        content = "a\r\nb\rc\n"
+        sha = cli.git_blob_sha(content.encode("utf-8"))
+        repo = FakeRepo({"a.txt": content})
+        
+        assert cli.read_repo_file(repo, "a.txt", sha) == content
+        assert cli.read_repo_file(repo, "a.txt", sha) == content
+        assert repo.reads == ["a.txt"]
+    
+    def test_cached_blob_private(self, blob_cache):
+        """Test that cached blobs are readable by their owner only."""
+        sha = cli.git_blob_sha(b"secret")
+        cli.read_repo_file(FakeRepo({"a.py": "secret"}), "a.py", sha)
+        
+        assert stat.S_IMODE(os.stat(blob_cache / sha).st_mode) == 0o600
+    
+    def test_moved_branch_not_cached(self, blob_cache):
+        """Test that content not matching the SHA is returned but not cached."""
+        sha = cli.git_blob_sha(b"old")
+        repo = FakeRepo({"a.py": "new"})
+        
+        assert cli.read_repo_file(repo, "a.py", sha) == "new"
+        assert not (blob_cache / sha).exists()
+
+
+class TestReadConcurrently:
+    """Test cases for reading many paths on a thread pool."""
+    
+    def test_results_in_order(self):
+        """Test that results keep the order of the paths, errors included."""
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def reader(path):
+            if path == "missing":
+                raise FileNotFoundError(path)
+            barrier.wait()  # Breaks unless both reads run at once
+            return path.upper()
+        
+        results = cli.read_concurrently(reader, ["a", "missing", "b"])
+        
+        assert [(path, content) for path, content, _ in results] == [
+            ("a", "A"), ("missing", None), ("b", "B"),
+        ]
+        assert isinstance(results[1][2], FileNotFoundError)
+        assert results[0][2] is None
+    
+    def test_single_path_inline(self):
+        """Test that a single path is read on the calling thread."""
+        caller = threading.get_ident()
+        
+        results = cli.read_concurrently(lambda path: threading.get_ident() == caller, ["a"])
+        
+        assert results == [("a", True, None)]
+
+
+class ListingRepo:
+    """Repository stand-in with a fixed file tree."""
+    
+    path, owner, name, branch = "owner/repo", "owner", "repo", "main"
+    
+    def __init__(self, paths):
+        self.paths = paths
+    
+    def listdir(self, path):
+        return [p for p in self.paths if "/" not in p]
+    
+    def get_tree(self, path, recursive=False):
+        return build_tree_from_paths(self.paths)
+
+
+@pytest.fixture
+def mounted(monkeypatch):
+    """Serve the CLI's mounts from a ListingRepo."""
+    repo = ListingRepo(["b.txt", "a.txt", "src/c.py", "src/lib/d.py"])
+    
+    class FS:
+        def mount(self, path, branch=None):
+            return repo
+    
+    monkeypatch.setattr(cli, "get_fs", lambda token: FS())
+    return repo
+
+
+class TestRepoCommands:
+    """Test cases for commands reading a mounted repository."""
+    
+    def test_info_verbose_counts(self, mounted, capsys):
+        """Test that info -v counts files and directories from one tree."""
+        cli.main(["-t", "X", "info", "owner/repo", "-v"])
+        
+        out = capsys.readouterr().out
+        assert "Files: 4" in out
+        assert "Directories: 2" in out
+    
+    def test_ls_sorted(self, mounted, capsys):
+        """Test that ls sorts entries by default."""
+        cli.main(["-t", "X", "ls", "owner/repo"])
+        
+        assert capsys.readouterr().out == "a.txt\nb.txt\n"
+    
+    def test_ls_no_sort(self, mounted, capsys):
+        """Test that ls --no-sort keeps the API order."""
+        cli.main(["-t", "X", "ls", "owner/repo", "--no-sort"])
+        
+        assert capsys.readouterr().out == "b.txt\na.txt\n"
+
+
+@pytest.fixture
+def checkpoint_file(tmp_path, monkeypatch):
+    """Keep checkpoints in a temporary directory."""
+    monkeypatch.setattr(cli, "CHECKPOINT_FILE", str(tmp_path / "checkpoints.ndjson.gz"))
+    monkeypatch.setattr(cli, "LEGACY_CHECKPOINT_FILE", str(tmp_path / "checkpoints.json"))
+
+
+def age(path, seconds=60):
+    """Move a file's mtime into the past, out of the racy window."""
+    mtime_ns = time.time_ns() - seconds * 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return mtime_ns
+
+
+class TestCheckpointDiff:
+    """Test cases for checkpoint-diff on local files."""
+    
+    def test_read_local_file_stamp(self, tmp_path):
+        """Test that only files older than the racy window get a stamp."""
+        path = tmp_path / "a.txt"
+        path.write_text("one")
+        
+        assert cli.read_local_file(str(path)) == ("one", None)
+        
+        mtime_ns = age(path)
+        assert cli.read_local_file(str(path)) == ("one", [3, mtime_ns])
+    
+    def test_stamped_file_not_read(self, tmp_path, checkpoint_file, monkeypatch, capsys):
+        """Test that a file matching its stamp is compared without reading it."""
+        path = tmp_path / "a.txt"
+        path.write_text("one")
+        age(path)
+        cli.main(["checkpoint", "snap", "--files", str(path)])
+        
+        monkeypatch.setattr(cli.Path, "read_text", pytest.fail)
+        cli.main(["checkpoint-diff", "snap"])
+        
+        assert "No changes since checkpoint." in capsys.readouterr().out
+    
+    def test_same_size_edit_detected(self, tmp_path, checkpoint_file, capsys):
+        """Test that an edit keeping the size is caught by the mtime."""
+        path = tmp_path / "a.txt"
+        path.write_text("one")
+        age(path)
+        cli.main(["checkpoint", "snap", "--files", str(path)])
+        
+        path.write_text("two")
+        cli.main(["checkpoint-diff", "snap"])
+        
+        assert f"~ {path} (modified)" in capsys.readouterr().out
+    
+    def test_racy_file_always_read(self, tmp_path, checkpoint_file, capsys):
+        """Test that a file modified just before the snapshot is re-read."""
+        path = tmp_path / "a.txt"
+        path.write_text("one")
+        mtime_ns = path.stat().st_mtime_ns
+        cli.main(["checkpoint", "snap", "--files", str(path)])
+        
+        # Same size, same mtime tick: only the content tells them apart
+        path.write_text("two")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        cli.main(["checkpoint-diff", "snap"])
+        
+        assert f"~ {path} (modified)" in capsys.readouterr().out
+
+
+def parse(parser, argv, capsys):
+    """Parse argv, returning the namespace (or exit code) and printed output."""
+    try:
+        result = vars(parser.parse_args(argv))
+    except SystemExit as e:
+        result = e.code
+    return result, capsys.readouterr()
+
+
+class TestParser:
+    """Test cases for building only the invoked subcommand's parser."""
+    
+    @pytest.mark.parametrize("argv", [
+        ["-t", "X", "ls", "owner/repo"],
+        ["--token=X", "ls", "owner/repo", "src"],
+        ["--tok", "X", "ls", "owner/repo"],
+        ["-tX", "cat", "owner/repo", "a.py"],
+        ["ls", "owner/repo", "--tree"],
+        ["cp-ls"],
+        ["--help"],
+        ["--help", "ls"],
+        ["--he", "ls"],
+        ["-h", "ls", "owner/repo"],
+        ["ls", "--help"],
+        ["-t", "X", "frobnicate"],
+        ["--token", "ls"],
+        ["-t"],
+        [],
+    ])
+    def test_same_as_full_parser(self, argv, capsys):
+        """Test that parses, help and errors match the parser with every subcommand."""
+        expected = parse(cli.build_parser(), argv, capsys)
+        
+        assert parse(cli.build_parser(cli._find_command(argv)), argv, capsys) == expected
+    
+    @pytest.mark.parametrize("argv, command", [
+        (["-t", "X", "ls"], "ls"),
+        (["--token=X", "ls"], "ls"),
+        (["--tok", "X", "ls"], "ls"),
+        (["--token", "ls"], None),
+        (["--help", "ls"], None),
+        (["frobnicate"], "frobnicate"),
+    ])
+    def test_find_command(self, argv, command):
+        """Test that global options and their values are skipped."""
+        assert cli._find_command(argv) == command
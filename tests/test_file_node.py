@@ -27,6 +27,14 @@ class TestFileNode:
         assert d["type"] == "file"
         assert d["size"] == 100
         assert d["sha"] == "abc123"
+    
+    def test_slots(self):
+        """Test that nodes use slots instead of a per-instance dict."""
+        node = FileNode(name="test.py", path="src/test.py")
+        
+        assert not hasattr(node, "__dict__")
+        with pytest.raises(AttributeError):
+            node.extra = 1
 
 
 class TestDirectoryNode:
@@ -65,6 +73,13 @@ class TestDirectoryNode:
         assert parent.get_child("utils.py") == child2
         assert parent.get_child("nonexistent.py") is None
     
+    def test_get_child_from_constructor(self):
+        """Test that children passed to the constructor are indexed."""
+        child = FileNode(name="main.py", path="src/main.py")
+        parent = DirectoryNode(name="src", path="src", children=[child])
+        
+        assert parent.get_child("main.py") is child
+    
     def test_list_names(self):
         """Test listing child names."""
         parent = DirectoryNode(name="src", path="src")
@@ -94,6 +109,15 @@ class TestDirectoryNode:
         assert file1 in files
         assert dir1 in dirs
     
+    def test_list_files_and_dirs_from_constructor(self):
+        """Test that children passed to the constructor are split by type."""
+        readme = FileNode(name="README.md", path="README.md")
+        src = DirectoryNode(name="src", path="src")
+        root = DirectoryNode(name="/", path="/", children=[readme, src])
+        
+        assert root.list_files() == [readme]
+        assert root.list_dirs() == [src]
+    
     def test_walk(self):
         """Test directory walking."""
         root = DirectoryNode(name="/", path="/")
@@ -109,6 +133,49 @@ class TestDirectoryNode:
         assert "README.md" in walked[0][2]  # files in root
         assert "src" in walked[0][1]  # dirs in root
     
+    def test_walk_preorder(self):
+        """Test that walk visits directories depth-first in child order."""
+        root = build_tree_from_paths(["a/x/f.txt", "a/g.txt", "b/h.txt"])
+        
+        assert [path for path, _, _ in root.walk()] == ["/", "a", "a/x", "b"]
+    
+    def test_count(self):
+        """Test counting files and directories in one pass."""
+        root = build_tree_from_paths(["a/x/f.txt", "a/g.txt", "b/h.txt", "README.md"])
+        
+        assert root.count() == (4, 3)
+    
+    def test_to_tree_string(self):
+        """Test ASCII tree rendering with directories sorted first."""
+        root = build_tree_from_paths(["src/b.py", "src/A.py", "README.md", "docs/x/y.md"])
+        
+        assert root.to_tree_string() == "\n".join([
+            "└── //",
+            "    ├── docs/",
+            "    │   └── x/",
+            "    │       └── y.md",
+            "    ├── src/",
+            "    │   ├── A.py",
+            "    │   └── b.py",
+            "    └── README.md",
+        ])
+    
+    def test_to_tree_string_after_add_child(self):
+        """Test that adding a child after rendering shows up in the next render."""
+        root = build_tree_from_paths(["b.txt"])
+        root.to_tree_string()
+        
+        root.add_child(FileNode(name="a.txt", path="a.txt"))
+        
+        assert root.to_tree_string().splitlines()[1:] == ["    ├── a.txt", "    └── b.txt"]
+    
+    def test_to_tree_string_empty_directory(self):
+        """Test rendering a directory that never had children added."""
+        root = DirectoryNode(name="/", path="/")
+        root.add_child(DirectoryNode(name="empty", path="empty"))
+        
+        assert root.to_tree_string() == "└── //\n    └── empty/"
+    
     def test_to_dict(self):
         """Test DirectoryNode to_dict conversion."""
         parent = DirectoryNode(name="src", path="src")
@@ -155,3 +222,20 @@ class TestBuildTreeFromPaths:
         core = src.get_child("core")
         assert core is not None
         assert len(core.children) == 2
+    
+    def test_unsorted_paths_share_directories(self):
+        """Test that unsorted input doesn't create duplicate directories."""
+        paths = [
+            "src/utils/helper.py",
+            "README.md",
+            "src/main.py",
+            "src/utils/io.py",
+        ]
+        
+        root = build_tree_from_paths(paths)
+        
+        assert sorted(root.list_names()) == ["README.md", "src"]
+        src = root.get_child("src")
+        assert sorted(src.list_names()) == ["main.py", "utils"]
+        assert sorted(src.get_child("utils").list_names()) == ["helper.py", "io.py"]
+        assert src.get_child("utils").path == "src/utils"
@@ -0,0 +1,144 @@
+"""Tests for GitHubFS."""
+
+import logging
+import time
+import pytest
+from shadowfs import github_fs
+from shadowfs.github_fs import GitHubFS, RateLimitError
+
+
+class TestPersistedCache:
+    """Test cases for the in-memory cache saved to cache_dir."""
+    
+    def test_close_persists(self, tmp_path):
+        """Test that entries saved on close are reloaded by a new client."""
+        fs = GitHubFS(token="t", cache_dir=str(tmp_path))
+        fs._cache.set("key1", "value1")
+        fs.close()
+        
+        assert fs not in github_fs._unclosed
+        assert GitHubFS(token="t", cache_dir=str(tmp_path))._cache.get("key1") == "value1"
+    
+    def test_scoped_to_token(self, tmp_path):
+        """Test that a client with another token does not see the entries."""
+        fs = GitHubFS(token="t", cache_dir=str(tmp_path))
+        fs._cache.set("key1", "value1")
+        fs.close()
+        
+        other = GitHubFS(token="u", cache_dir=str(tmp_path))
+        assert other._cache.get("key1") is None
+        other = GitHubFS(token="t", api_url="https://ghe.example.com/api/v3", cache_dir=str(tmp_path))
+        assert other._cache.get("key1") is None
+    
+    def test_clients_sharing_dir_merge(self, tmp_path):
+        """Test that closing one client keeps entries saved by another."""
+        first = GitHubFS(token="t", cache_dir=str(tmp_path))
+        second = GitHubFS(token="t", cache_dir=str(tmp_path))
+        first._cache.set("key1", "first")
+        second._cache.set("key2", "second")
+        
+        first.close()
+        second.close()
+        
+        cache = GitHubFS(token="t", cache_dir=str(tmp_path))._cache
+        assert cache.get("key1") == "first"
+        assert cache.get("key2") == "second"
+    
+    def test_missing_token_touches_nothing(self, tmp_path, monkeypatch):
+        """Test that a missing token is rejected before any cache or session work."""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        monkeypatch.setattr(github_fs.requests, "Session", pytest.fail)
+        
+        with pytest.raises(ValueError):
+            GitHubFS(cache_dir=str(tmp_path))
+        
+        assert len(github_fs._unclosed) == 0
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_unclosed_client_released(self, tmp_path):
+        """Test that the exit hook does not keep dropped clients alive."""
+        GitHubFS(token="t", cache_dir=str(tmp_path))
+        
+        assert len(github_fs._unclosed) == 0
+
+
+class TestRateLimit:
+    """Test cases for waiting on the API rate limit."""
+    
+    def test_waits_for_near_reset(self, monkeypatch, caplog):
+        """Test that a reset within the allowed wait is slept through and logged."""
+        sleeps = []
+        monkeypatch.setattr(github_fs.time, "sleep", sleeps.append)
+        fs = GitHubFS(token="t")
+        fs._update_rate_limit({"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": str(time.time() + 30)})
+        
+        with caplog.at_level(logging.WARNING, logger="shadowfs.github_fs"):
+            fs._wait_for_rate_limit()
+        
+        assert len(sleeps) == 1 and 0 < sleeps[0] <= 30
+        assert "rate limit" in caplog.text
+        fs._wait_for_rate_limit()
+        assert len(sleeps) == 1
+    
+    def test_raises_for_distant_reset(self, monkeypatch):
+        """Test that a reset beyond max_rate_limit_wait raises instead of blocking."""
+        monkeypatch.setattr(github_fs.time, "sleep", pytest.fail)
+        fs = GitHubFS(token="t", max_rate_limit_wait=60)
+        reset = time.time() + 3600
+        fs._update_rate_limit({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+        
+        with pytest.raises(RateLimitError) as excinfo:
+            fs._wait_for_rate_limit()
+        assert excinfo.value.reset == reset
+    
+    def test_plenty_remaining(self, monkeypatch):
+        """Test that no wait happens while requests remain."""
+        monkeypatch.setattr(github_fs.time, "sleep", pytest.fail)
+        fs = GitHubFS(token="t")
+        fs._update_rate_limit({"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": str(time.time() + 3600)})
+        
+        fs._wait_for_rate_limit()
+
+
+class TestSession:
+    """Test cases for the pooled HTTP session."""
+    
+    def test_shared_by_mounts(self, monkeypatch):
+        """Test that every mount sends requests through the same pooled session."""
+        class Response:
+            status_code = 200
+            headers = {}
+            
+            def raise_for_status(self):
+                pass
+            
+            def json(self):
+                return {"default_branch": "main"}
+        
+        urls = []
+        monkeypatch.setattr(github_fs.requests, "request", pytest.fail)
+        fs = GitHubFS(token="t", cache_enabled=False)
+        monkeypatch.setattr(fs._session, "request", lambda method, url, **kwargs: urls.append(url) or Response())
+        
+        fs.mount("owner/a")
+        fs.mount("owner/b")
+        
+        assert urls == ["https://api.github.com/repos/owner/a/", "https://api.github.com/repos/owner/b/"]
+        assert fs.session.get_adapter("https://api.github.com")._pool_maxsize == 64
+    
+    def test_headers_follow_token(self):
+        """Test that the session's default headers are refreshed when the token changes."""
+        fs = GitHubFS(token="t")
+        assert fs.session.headers["Authorization"] == "Bearer t"
+        
+        fs.token = "u"
+        
+        assert fs.session.headers["Authorization"] == "Bearer u"
+        assert fs.session.headers["X-GitHub-Api-Version"] == "2022-11-28"
+    
+    def test_headers_read_before_session(self):
+        """Test that reading headers first does not leave the session unauthenticated."""
+        fs = GitHubFS(token="abc", cache_enabled=False)
+        fs.headers
+        
+        assert fs.session.headers["Authorization"] == "Bearer abc"
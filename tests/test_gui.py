@@ -0,0 +1,184 @@
+"""Tests for the checkpoint GUI."""
+
+import io
+import pytest
+from shadowfs import gui
+from shadowfs.gui import CheckpointGUI
+from shadowfs.models import ModelConfig, ModelProvider
+from shadowfs.session import Session
+
+
+@pytest.fixture
+def plain_output(monkeypatch):
+    """Render without colors, restoring the detected styles afterwards."""
+    monkeypatch.setenv("NO_COLOR", "1")
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    gui._refresh_color()
+    yield
+    monkeypatch.undo()
+    gui._refresh_color()
+
+
+@pytest.fixture
+def session(tmp_path):
+    """Session over an empty workspace."""
+    return Session(workspace_path=str(tmp_path))
+
+
+@pytest.fixture
+def history(session):
+    """Session with one call that changed app.py from v1 to v2."""
+    session.track_file("app.py", "v1")
+    with session.llm_call("gpt-4", "Change app"):
+        session.track_file("app.py", "v2")
+    return session
+
+
+def answer(monkeypatch, *replies):
+    """Patch input() to return replies in order; an exception type is raised."""
+    replies = iter(replies)
+    
+    def fake_input(prompt=""):
+        reply = next(replies)
+        if isinstance(reply, type):
+            raise reply()
+        return reply
+    
+    monkeypatch.setattr("builtins.input", fake_input)
+
+
+class TestColor:
+    """Test cases for color detection and the module-level c()."""
+    
+    def test_refresh_rebinds_c(self, plain_output, monkeypatch):
+        """Test that _refresh_color swaps c() and rebuilds the styles."""
+        assert gui.c is gui._c_plain
+        assert gui.c("x", gui.Colors.RED) == "x"
+        assert "\033[" not in gui._BADGES["completed"]
+        
+        monkeypatch.delenv("NO_COLOR")
+        monkeypatch.setenv("FORCE_COLOR", "1")
+        gui._refresh_color()
+        
+        assert gui.c is gui._c_color
+        assert gui.c("x", gui.Colors.RED, gui.Colors.BOLD) == "\033[31;1mx\033[0m"
+        assert gui._BADGES["completed"].startswith("\033[")
+    
+    def test_plain_show_has_no_escapes(self, history, plain_output, capsys):
+        """Test that a rendered frame has no escape codes with NO_COLOR."""
+        CheckpointGUI(history).show()
+        
+        out = capsys.readouterr().out
+        assert "Change app" in out
+        assert "\033[" not in out
+
+
+class TestColors:
+    """Test cases for the public color table."""
+    
+    def test_values_are_escape_sequences(self):
+        """Test that the values can still be concatenated with text."""
+        assert gui.Colors.RED + "x" + gui.Colors.RESET == "\033[31mx\033[0m"
+        assert gui.Colors.BG_WHITE == "\033[47m"
+    
+    def test_bare_parameters_accepted(self):
+        """Test that c() merges bare SGR parameters like full sequences."""
+        assert gui._c_color("x", "31", gui.Colors.BOLD) == "\033[31;1mx\033[0m"
+
+
+class TestFlush:
+    """Test cases for writing a rendered frame."""
+    
+    def test_single_write(self, session, monkeypatch):
+        """Test that the frame goes out in one write through sys.stdout."""
+        writes = []
+        
+        class Tty(io.StringIO):
+            def isatty(self):
+                return True
+            
+            def write(self, text):
+                writes.append(text)
+                return super().write(text)
+        
+        monkeypatch.setattr("sys.stdout", Tty())
+        view = CheckpointGUI(session)
+        view._emit("a")
+        view._emit("✓ b")
+        
+        view._flush()
+        view._flush()
+        
+        assert writes == ["a\n✓ b\n"]
+        assert view._buf == []
+
+
+class TestCountLines:
+    """Test cases for _count_lines."""
+    
+    @pytest.mark.parametrize("text", ["", "a", "a\n", "a\nb", "a\n\nb\n", "\n"])
+    def test_matches_splitlines(self, text):
+        """Test that counts match splitlines() for newline-terminated text."""
+        assert gui._count_lines(text) == len(text.splitlines())
+        assert gui._count_lines(text.encode()) == len(text.splitlines())
+
+
+class TestInteractiveRestore:
+    """Test cases for interactive_restore input handling."""
+    
+    def test_no_history(self, session, plain_output, capsys):
+        """Test that an empty history returns without prompting."""
+        assert CheckpointGUI(session).interactive_restore() is None
+        assert "No restore points available." in capsys.readouterr().out
+    
+    @pytest.mark.parametrize("choice, message", [
+        ("0", "Cancelled."),
+        ("-1", "Cancelled."),
+        ("", "Cancelled."),
+        ("abc", "Cancelled."),
+        ("1.5", "Cancelled."),
+        ("2", "Invalid choice."),
+    ])
+    def test_rejected_choice(self, history, plain_output, monkeypatch, capsys, choice, message):
+        """Test that cancel, malformed and out-of-range choices restore nothing."""
+        answer(monkeypatch, choice)
+        
+        assert CheckpointGUI(history).interactive_restore() is None
+        assert message in capsys.readouterr().out
+        assert history.get_history()[0].status != "restored"
+    
+    @pytest.mark.parametrize("replies", [("1", "n"), ("1", ""), (KeyboardInterrupt,), ("1", KeyboardInterrupt)])
+    def test_declined(self, history, plain_output, monkeypatch, capsys, replies):
+        """Test that declining or interrupting either prompt cancels."""
+        answer(monkeypatch, *replies)
+        
+        assert CheckpointGUI(history).interactive_restore() is None
+        assert "Cancelled." in capsys.readouterr().out
+    
+    def test_confirmed(self, history, plain_output, monkeypatch, capsys, tmp_path):
+        """Test that a confirmed choice restores the files before the call."""
+        call = history.get_history()[0]
+        answer(monkeypatch, " 1 ", "Y")
+        
+        assert CheckpointGUI(history).interactive_restore() == call.id
+        out = capsys.readouterr().out
+        assert f"Restored 1 files to state before {call.id}" in out
+        assert "• app.py" in out
+        assert (tmp_path / "app.py").read_text() == "v1"
+
+
+class TestModelBar:
+    """Test cases for the model bar shown above the history."""
+    
+    def test_long_model_name(self, session, plain_output, capsys):
+        """Test that a model name wider than the bar does not break rendering."""
+        session.model_selector.add_model(ModelConfig(
+            id="long-model",
+            name="A" * 60,
+            provider=ModelProvider.CUSTOM,
+        ))
+        session.set_model("long-model")
+        
+        CheckpointGUI(session).show()
+        
+        assert "A" * 60 in capsys.readouterr().out
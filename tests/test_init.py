@@ -0,0 +1,44 @@
+"""Tests for the package's lazily imported exports."""
+
+import os
+import subprocess
+import sys
+import pytest
+import shadowfs
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ["shadowfs.checkpoint", "shadowfs.session", "shadowfs.gui", "shadowfs.models"]
+
+
+def imported_after(code):
+    """Run code in a fresh interpreter and return which lazy modules it imported."""
+    script = f"import sys\n{code}\nprint(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return out.split()
+
+
+class TestLazyImports:
+    """Test cases for exports loaded on first attribute access."""
+    
+    def test_import_loads_only_filesystem(self):
+        """Test that importing the package leaves the checkpoint, GUI and model code alone."""
+        assert imported_after("import shadowfs; shadowfs.GitHubFS") == []
+    
+    def test_attribute_loads_its_module(self):
+        """Test that a lazy export imports its module on access."""
+        assert "shadowfs.models" in imported_after("import shadowfs; shadowfs.ModelConfig")
+        assert "shadowfs.gui" not in imported_after("from shadowfs import ModelConfig")
+    
+    def test_exports(self):
+        """Test that every name in __all__ resolves and is listed by dir()."""
+        for name in shadowfs.__all__:
+            assert getattr(shadowfs, name) is not None
+            assert name in dir(shadowfs)
+    
+    def test_unknown_attribute(self):
+        """Test that unknown names still raise AttributeError."""
+        with pytest.raises(AttributeError):
+            shadowfs.NotAThing
@@ -3,6 +3,7 @@ Tests for the models module - Model selector like GitHub Copilot.
 """
 
 import os
+import dataclasses
 import pytest
 from shadowfs.models import (
     ModelConfig,
@@ -34,6 +35,14 @@ class TestModelConfig:
         assert config.provider == ModelProvider.OPENAI
         assert config.max_tokens == 4096
     
+    def test_slotted(self):
+        """Test that configs use slots instead of a per-instance dict."""
+        config = ModelConfig(id="x", name="X", provider=ModelProvider.CUSTOM)
+        
+        assert not hasattr(config, "__dict__")
+        assert config.default_params == {}
+        assert config == ModelConfig(id="x", name="X", provider=ModelProvider.CUSTOM)
+    
     def test_display_name(self):
         """Test display name property."""
         config = ModelConfig(
@@ -81,6 +90,25 @@ class TestModelConfig:
         
         assert config.is_available is True
     
+    def test_is_available_snapshot_within_scope(self, monkeypatch):
+        """Test that a render pass reads each key once and doesn't go stale after."""
+        from shadowfs.models import _env_cache_scope
+        
+        monkeypatch.delenv("TEST_API_KEY", raising=False)
+        config = ModelConfig(
+            id="test",
+            name="Test",
+            provider=ModelProvider.CUSTOM,
+            api_key_env="TEST_API_KEY",
+        )
+        
+        with _env_cache_scope():
+            assert config.is_available is False
+            monkeypatch.setenv("TEST_API_KEY", "secret")
+            assert config.is_available is False
+        
+        assert config.is_available is True
+    
     def test_to_dict(self):
         """Test converting to dict."""
         config = ModelConfig(
@@ -96,6 +124,41 @@ class TestModelConfig:
         assert data["name"] == "GPT-4"
         assert data["provider"] == "openai"
         assert data["supports_vision"] is True
+    
+    def test_to_json_bytes(self):
+        """Test compact JSON export matches to_dict."""
+        import json
+        
+        config = ModelConfig(id="gpt-4", name="GPT-4", provider=ModelProvider.OPENAI)
+        
+        data = config.to_json_bytes()
+        
+        assert isinstance(data, bytes)
+        assert json.loads(data) == config.to_dict()
+    
+    def test_to_dict_cached_copy(self):
+        """Test that to_dict is built once and returns independent copies."""
+        config = ModelConfig(
+            id="gpt-4",
+            name="GPT-4",
+            provider=ModelProvider.OPENAI,
+        )
+        
+        first = config.to_dict()
+        first["name"] = "changed"
+        
+        assert config.to_dict()["name"] == "GPT-4"
+        assert config._cached_dict is not None
+    
+    def test_derived_values_not_fields(self):
+        """Test that precomputed values stay out of fields() and asdict()."""
+        config = ModelConfig(id="gpt-4", name="GPT-4", provider=ModelProvider.OPENAI)
+        config.to_dict()
+        
+        names = {f.name for f in dataclasses.fields(config)}
+        assert not any(name.startswith("_") for name in names)
+        assert set(dataclasses.asdict(config)) == names
+        assert not hasattr(config, "__dict__")
 
 
 class TestBuiltinModels:
@@ -124,6 +187,11 @@ class TestBuiltinModels:
         model = BUILTIN_MODELS["llama3.3"]
         assert model.provider == ModelProvider.OLLAMA
         assert model.endpoint == "http://localhost:11434"
+    
+    def test_builtin_models_read_only(self):
+        """Test that the builtin table can't be modified in place."""
+        with pytest.raises(TypeError):
+            BUILTIN_MODELS["new"] = BUILTIN_MODELS["gpt-4o"]
 
 
 class TestModelSelector:
@@ -167,6 +235,46 @@ class TestModelSelector:
         assert len(models) > 0
         assert any(m.id == "gpt-4o" for m in models)
     
+    def test_list_models_sorted_by_provider_and_name(self):
+        """Test that models are ordered by provider value, then name."""
+        selector = ModelSelector()
+        selector.add_model(ModelConfig(id="z", name="Zeta", provider=ModelProvider.ANTHROPIC))
+        
+        models = selector.list_models()
+        
+        assert [m._sort_key for m in models] == sorted((m.provider.value, m.name) for m in models)
+        assert models[0]._sort_key == ("anthropic", models[0].name)
+    
+    def test_list_models_cached_order(self):
+        """Test that list_models stays sorted across add/remove and returns copies."""
+        selector = ModelSelector()
+        first = selector.list_models()
+        first.clear()
+        
+        selector.add_model(ModelConfig(id="aa", name="AA", provider=ModelProvider.ANTHROPIC))
+        models = selector.list_models()
+        
+        assert models[0].id == "aa"
+        assert len(models) == len(BUILTIN_MODELS) + 1
+        
+        selector.remove_model("aa")
+        assert [m.id for m in selector.list_models()] == [
+            m.id for m in ModelSelector().list_models()
+        ]
+    
+    def test_list_models_filtered_from_cached_view(self):
+        """Test that filtered lists keep the sorted order and leave the cached view whole."""
+        selector = ModelSelector()
+        everything = selector.list_models()
+        
+        openai = selector.list_models(provider=ModelProvider.OPENAI)
+        openai.clear()
+        
+        assert selector.list_models(provider=ModelProvider.OPENAI) == [
+            m for m in everything if m.provider == ModelProvider.OPENAI
+        ]
+        assert selector.list_models() == everything
+    
     def test_list_models_by_provider(self):
         """Test listing models by provider."""
         selector = ModelSelector()
@@ -222,6 +330,32 @@ class TestModelSelector:
         assert result is True
         assert selector.get_model("temp-model") is None
     
+    def test_builtin_models_shared_until_modified(self):
+        """Test that selectors share the builtin table and copy it on write."""
+        selector = ModelSelector()
+        other = ModelSelector()
+        assert selector._models is BUILTIN_MODELS
+        
+        selector.remove_model("gpt-4o")
+        
+        assert selector.get_model("gpt-4o") is None
+        assert other.get_model("gpt-4o") is not None
+        assert "gpt-4o" in BUILTIN_MODELS
+    
+    def test_models_by_provider_tracks_changes(self):
+        """Test that the provider grouping is refreshed after add/remove."""
+        selector = ModelSelector()
+        assert ModelProvider.CUSTOM not in selector._models_by_provider()
+        
+        selector.add_model(ModelConfig(id="b", name="Beta", provider=ModelProvider.CUSTOM))
+        selector.add_model(ModelConfig(id="a", name="Alpha", provider=ModelProvider.CUSTOM))
+        custom = selector._models_by_provider()[ModelProvider.CUSTOM]
+        assert [m.name for m in custom] == ["Alpha", "Beta"]
+        
+        selector.remove_model("a")
+        custom = selector._models_by_provider()[ModelProvider.CUSTOM]
+        assert [m.name for m in custom] == ["Beta"]
+    
     def test_on_change_callback(self):
         """Test model change callback."""
         selector = ModelSelector()
@@ -233,6 +367,20 @@ class TestModelSelector:
         assert len(changed_models) == 1
         assert changed_models[0].id == "gpt-4o-mini"
     
+    def test_on_change_callback_registers_another(self):
+        """Test that a callback registering another doesn't run it in the same change."""
+        selector = ModelSelector()
+        calls = []
+        
+        def first(model):
+            calls.append("first")
+            selector.on_change(lambda m: calls.append("second"))
+        
+        selector.on_change(first)
+        selector.set_model("gpt-4o-mini")
+        
+        assert calls == ["first"]
+    
     def test_quick_select(self):
         """Test quick select shortcuts."""
         selector = ModelSelector()
@@ -253,6 +401,42 @@ class TestModelSelector:
         model = selector.quick_select("llama")
         assert model.id == "llama3.3"
     
+    def test_quick_select_case_and_ids(self):
+        """Test that shortcuts ignore case and model IDs are accepted as is."""
+        selector = ModelSelector()
+        
+        assert selector.quick_select("MINI").id == "gpt-4o-mini"
+        assert selector.quick_select("deepseek-coder-v2").id == "deepseek-coder-v2"
+    
+    def test_quick_select_removed_model(self):
+        """Test that a shortcut to a model the selector no longer has selects nothing."""
+        selector = ModelSelector()
+        selector.remove_model("gpt-4o-mini")
+        
+        assert selector.quick_select("mini") is None
+        assert selector.current.id != "gpt-4o-mini"
+    
+    def test_quick_select_prefix(self):
+        """Test quick select with a prefix of a shortcut."""
+        selector = ModelSelector()
+        
+        assert selector.quick_select("son").id == "claude-sonnet-4-20250514"
+        assert selector.quick_select("Gem").id == "gemini-2.0-flash"
+        assert selector.quick_select("gpt-4o-mini").id == "gpt-4o-mini"
+        # "o" matches shortcuts for several models
+        assert selector.quick_select("o") is None
+    
+    def test_quick_select_prefix_edges(self):
+        """Test exact matches over longer shortcuts, shared targets and empty input."""
+        selector = ModelSelector()
+        
+        # "o1" is a shortcut of its own even though "o1m" starts with it
+        assert selector.quick_select("o1").id == "o1"
+        # "opus" and "opus4" both point at the same model
+        assert selector.quick_select("op").id == "claude-opus-4-20250514"
+        assert selector.quick_select("") is None
+        assert selector.quick_select("zzz") is None
+    
     def test_quick_select_invalid(self):
         """Test quick select with invalid shortcut."""
         selector = ModelSelector()
@@ -272,6 +456,28 @@ class TestGlobalFunctions:
         
         assert selector1 is selector2
     
+    def test_get_model_selector_concurrent_first_call(self, monkeypatch):
+        """Test that racing first calls all get the same selector."""
+        import threading
+        import shadowfs.models as models
+        
+        monkeypatch.setattr(models, "_global_selector", None)
+        barrier = threading.Barrier(8)
+        results = []
+        
+        def worker():
+            barrier.wait()
+            results.append(get_model_selector())
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert len(results) == 8
+        assert all(r is results[0] for r in results)
+    
     def test_set_and_get_model(self):
         """Test global set and get model."""
         set_model("gpt-4o-mini")
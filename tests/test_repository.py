@@ -0,0 +1,499 @@
+"""Tests for Repository."""
+
+import threading
+import pytest
+from shadowfs.github_fs import GitHubFS
+from shadowfs.repository import RAW_MEDIA_TYPE
+
+
+API_URL = "https://api.example.com"
+REPO_URL = f"{API_URL}/repos/owner/repo/"
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+    
+    def __init__(self, status_code=200, body=None, headers=None, content=b""):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+        self.content = content
+    
+    def json(self):
+        return self._body
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Records requests and answers them from a route table."""
+    
+    def __init__(self, routes):
+        self.routes = routes
+        self.headers = {}
+        self.calls = []
+    
+    def request(self, method, url, headers=None, **kwargs):
+        endpoint = url[len(REPO_URL):]
+        self.calls.append((method, endpoint, headers))
+        return self.routes[(method, endpoint)](headers or {}, kwargs)
+    
+    def close(self):
+        pass
+
+
+def make_repo(tmp_path, routes, **fs_kwargs):
+    """Mount owner/repo on a GitHubFS whose HTTP session is faked."""
+    fs = GitHubFS(token="t", api_url=API_URL, cache_dir=str(tmp_path / "cache"), **fs_kwargs)
+    session = FakeSession(routes)
+    fs._session = session
+    return fs.mount("owner/repo", branch="main"), session
+
+
+def listing(*names):
+    """Build a contents API directory listing route with an ETag."""
+    body = [{"name": name, "path": name, "type": "file"} for name in names]
+    return lambda headers, kwargs: FakeResponse(body=body, headers={"ETag": f'"{len(names)}"'})
+
+
+class TestDiskCachedListings:
+    """Test cases for listings served through the disk cache."""
+    
+    def test_fresh_entry_served_without_request(self, tmp_path):
+        """Test that a fresh disk entry is reused by a new client."""
+        routes = {("GET", "contents/src"): listing("a.py")}
+        repo, session = make_repo(tmp_path, routes)
+        assert repo.listdir("src") == ["a.py"]
+        
+        repo, session = make_repo(tmp_path, routes)
+        assert repo.listdir("src") == ["a.py"]
+        assert session.calls == []
+    
+    def test_stale_entry_revalidated(self, tmp_path):
+        """Test that a stale disk entry is revalidated and reused on 304."""
+        def revalidate(headers, kwargs):
+            assert headers["If-None-Match"] == '"1"'
+            return FakeResponse(status_code=304)
+        
+        routes = {("GET", "contents/src"): listing("a.py")}
+        repo, _ = make_repo(tmp_path, routes, cache_ttl=0)
+        repo.listdir("src")
+        
+        routes[("GET", "contents/src")] = revalidate
+        repo, session = make_repo(tmp_path, routes, cache_ttl=0)
+        assert repo.listdir("src") == ["a.py"]
+        assert len(session.calls) == 1
+    
+    def test_scoped_to_token(self, tmp_path):
+        """Test that a listing cached under one token is not served to another."""
+        routes = {("GET", "contents/src"): listing("a.py")}
+        repo, _ = make_repo(tmp_path, routes)
+        repo.listdir("src")
+        
+        fs = GitHubFS(token="u", api_url=API_URL, cache_dir=str(tmp_path / "cache"))
+        fs._session = session = FakeSession(routes)
+        assert fs.mount("owner/repo", branch="main").listdir("src") == ["a.py"]
+        assert len(session.calls) == 1
+    
+    def test_commit_invalidates_parent_listings(self, tmp_path):
+        """Test that listings of a committed file's ancestors are refetched."""
+        sha = lambda headers, kwargs: FakeResponse(body={"sha": "s", "object": {"sha": "base"}})
+        routes = {
+            ("GET", "contents"): listing("src"),
+            ("GET", "contents/src"): listing("a.py"),
+            ("GET", "git/ref/heads/main"): sha,
+            ("POST", "git/blobs"): sha,
+            ("POST", "git/trees"): sha,
+            ("POST", "git/commits"): sha,
+            ("PATCH", "git/refs/heads/main"): sha,
+        }
+        repo, _ = make_repo(tmp_path, routes)
+        repo.listdir("/")
+        repo.listdir("src")
+        
+        repo.write("src/b.py", "print()")
+        repo.commit("Add b.py")
+        routes[("GET", "contents/src")] = listing("a.py", "b.py")
+        
+        assert repo.listdir("src") == ["a.py", "b.py"]
+        repo, session = make_repo(tmp_path, routes)
+        assert repo.listdir("src") == ["a.py", "b.py"]
+        repo.listdir("/")
+        assert [call[1] for call in session.calls] == ["contents"]
+
+
+
+class TestStagedSpill:
+    """Test cases for staged contents spilled to disk past max_staged_bytes."""
+    
+    def test_oldest_spilled_first(self, tmp_path):
+        """Test that the least recently written files leave memory first."""
+        repo, _ = make_repo(tmp_path, {})
+        repo.max_staged_bytes = 10
+        
+        repo.write("a.txt", "x" * 6)
+        repo.write("b.txt", "y" * 6)
+        repo.write("c.txt", "é" * 3)
+        
+        assert list(repo._spilled) == ["a.txt", "b.txt"]
+        assert list(repo._staged_changes) == ["c.txt"]
+        assert repo._staged_bytes == 6
+        assert repo._staged_content("a.txt") == "x" * 6
+        assert repo._staged_content("b.txt") == "y" * 6
+        assert repo._staged_content("c.txt") == "é" * 3
+    
+    def test_newest_kept_in_memory(self, tmp_path):
+        """Test that a single file over the budget is not spilled."""
+        repo, _ = make_repo(tmp_path, {})
+        repo.max_staged_bytes = 4
+        
+        repo.write("big.txt", "z" * 100)
+        
+        assert repo._spilled == {}
+        assert repo._spill_file is None
+    
+    def test_rewrite_spilled_file(self, tmp_path):
+        """Test that writing a spilled path again stages the new content."""
+        repo, _ = make_repo(tmp_path, {})
+        repo.max_staged_bytes = 10
+        repo.write("a.txt", "old" * 3)
+        repo.write("b.txt", "b" * 6)
+        
+        repo.write("a.txt", "new")
+        
+        assert "a.txt" not in repo._spilled
+        assert repo._staged_content("a.txt") == "new"
+    
+    def test_commit_uploads_spilled_files(self, tmp_path):
+        """Test that commit uploads every staged file and drops the spill file."""
+        blobs = []
+        trees = []
+        
+        def create_blob(headers, kwargs):
+            blobs.append(kwargs["json"]["content"])
+            return FakeResponse(body={"sha": f"blob{len(blobs)}"})
+        
+        def create_tree(headers, kwargs):
+            trees.append(kwargs["json"]["tree"])
+            return FakeResponse(body={"sha": "tree"})
+        
+        sha = lambda headers, kwargs: FakeResponse(body={"sha": "s", "object": {"sha": "base"}})
+        routes = {
+            ("GET", "git/ref/heads/main"): sha,
+            ("POST", "git/blobs"): create_blob,
+            ("POST", "git/trees"): create_tree,
+            ("POST", "git/commits"): sha,
+            ("PATCH", "git/refs/heads/main"): sha,
+        }
+        repo, _ = make_repo(tmp_path, routes)
+        repo.max_staged_bytes = 10
+        contents = {"a.txt": "x" * 6, "b.txt": "y" * 6, "c.txt": "z" * 6}
+        for path, content in contents.items():
+            repo.write(path, content)
+        assert repo._spill_file is not None
+        
+        repo.commit("Add files")
+        
+        assert sorted(blobs) == sorted(contents.values())
+        assert [item["path"] for item in trees[0]] == ["a.txt", "b.txt", "c.txt"]
+        assert repo._spill_file is None
+        assert repo._spilled == {}
+        assert repo._staged_bytes == 0
+    
+    
+    def test_concurrent_uploads_read_spilled_content(self, tmp_path):
+        """Test that blobs uploaded in parallel each read back their own spilled content."""
+        trees = []
+        
+        def create_blob(headers, kwargs):
+            return FakeResponse(body={"sha": kwargs["json"]["content"]})
+        
+        def create_tree(headers, kwargs):
+            trees.append(kwargs["json"]["tree"])
+            return FakeResponse(body={"sha": "tree"})
+        
+        sha = lambda headers, kwargs: FakeResponse(body={"sha": "s", "object": {"sha": "base"}})
+        routes = {
+            ("GET", "git/ref/heads/main"): sha,
+            ("POST", "git/blobs"): create_blob,
+            ("POST", "git/trees"): create_tree,
+            ("POST", "git/commits"): sha,
+            ("PATCH", "git/refs/heads/main"): sha,
+        }
+        repo, _ = make_repo(tmp_path, routes, max_workers=8)
+        repo.max_staged_bytes = 64
+        contents = {f"f{i}.txt": f"{i}:" + "x" * i for i in range(50)}
+        for path, content in contents.items():
+            repo.write(path, content)
+        assert len(repo._spilled) > 40
+        
+        repo.commit("Add files")
+        
+        assert {item["path"]: item["sha"] for item in trees[0]} == contents
+
+
+class TestPersistedCache:
+    """Test cases for cache entries carried between clients through cache_dir."""
+    
+    def commit_routes(self, content):
+        """Routes serving ``f.txt`` with content and accepting a commit."""
+        sha = lambda headers, kwargs: FakeResponse(body={"sha": "s", "object": {"sha": "base"}})
+        return {
+            ("GET", "contents/f.txt"): lambda headers, kwargs: FakeResponse(
+                content=content.encode(), headers={"ETag": f'"{content}"'}
+            ),
+            ("GET", "git/ref/heads/main"): sha,
+            ("POST", "git/blobs"): sha,
+            ("POST", "git/trees"): sha,
+            ("POST", "git/commits"): sha,
+            ("PATCH", "git/refs/heads/main"): sha,
+        }
+    
+    def test_reused_by_new_client(self, tmp_path):
+        """Test that a read saved on close is served to the next client."""
+        routes = self.commit_routes("old")
+        repo, _ = make_repo(tmp_path, routes)
+        repo.read("f.txt")
+        repo._fs.close()
+        
+        repo, session = make_repo(tmp_path, routes)
+        assert repo.read("f.txt") == "old"
+        assert session.calls == []
+    
+    def test_commit_invalidation_survives(self, tmp_path):
+        """Test that a commit in one client keeps its stale reads from the next."""
+        routes = self.commit_routes("old")
+        repo, _ = make_repo(tmp_path, routes)
+        repo.read("f.txt")
+        repo._fs.close()
+        
+        repo, _ = make_repo(tmp_path, routes)
+        assert repo.read("f.txt") == "old"
+        repo.write("f.txt", "new")
+        repo.commit("Update f.txt")
+        routes.update(self.commit_routes("new"))
+        repo._fs.close()
+        
+        repo, session = make_repo(tmp_path, routes)
+        assert repo.read("f.txt") == "new"
+        assert len(session.calls) == 1
+    
+    def test_commit_invalidation_reaches_open_client(self, tmp_path):
+        """Test that a client closed after another's commit doesn't save its stale read."""
+        routes = self.commit_routes("old")
+        reader, _ = make_repo(tmp_path, routes)
+        reader.read("f.txt")
+        
+        writer, _ = make_repo(tmp_path, routes)
+        writer.write("f.txt", "new")
+        writer.commit("Update f.txt")
+        routes.update(self.commit_routes("new"))
+        writer._fs.close()
+        reader._fs.close()
+        
+        repo, session = make_repo(tmp_path, routes)
+        assert repo.read("f.txt") == "new"
+        assert len(session.calls) == 1
+
+
+class TestRevalidation:
+    """Test cases for memory cache entries revalidated with their ETag."""
+    
+    def test_stale_entry_reused_on_304(self, tmp_path):
+        """Test that a stale read sends If-None-Match and reuses the body on 304."""
+        routes = {("GET", "contents/f.txt"): lambda headers, kwargs: FakeResponse(
+            content=b"body", headers={"ETag": '"v1"'}
+        )}
+        repo, session = make_repo(tmp_path, routes)
+        assert repo.read("f.txt") == "body"
+        key = repo._key("read", "f.txt")
+        value, etag, _ = repo._cache.get(key)
+        repo._cache.set(key, (value, etag, 0))
+        
+        def not_modified(headers, kwargs):
+            assert headers["If-None-Match"] == '"v1"'
+            return FakeResponse(status_code=304)
+        
+        routes[("GET", "contents/f.txt")] = not_modified
+        assert repo.read("f.txt") == "body"
+        assert len(session.calls) == 2
+        assert repo.read("f.txt") == "body"
+        assert len(session.calls) == 2
+    
+    def test_info_cached_without_body(self, tmp_path):
+        """Test that path info keeps only type, SHA and size."""
+        routes = {
+            ("GET", "contents/f.txt"): lambda headers, kwargs: FakeResponse(body={
+                "type": "file", "sha": "abc", "size": 4, "content": "Ym9keQ==",
+            }),
+            ("GET", "contents/src"): listing("a.py"),
+        }
+        repo, _ = make_repo(tmp_path, routes)
+        
+        assert repo.is_file("f.txt")
+        assert repo.is_dir("src")
+        assert not repo.is_dir("f.txt")
+        assert repo._cache.get(repo._key("info", "f.txt"))[0] == {
+            "type": "file", "sha": "abc", "size": 4,
+        }
+
+
+class TestGetTree:
+    """Test cases for recursive trees."""
+    
+    TREE = [
+        {"path": "README.md", "type": "blob", "sha": "r", "size": 3},
+        {"path": "src", "type": "tree", "sha": "s"},
+        {"path": "src/a.py", "type": "blob", "sha": "a", "size": 5},
+    ]
+    
+    def test_git_tree(self, tmp_path):
+        """Test that a recursive tree comes from one Git Trees call, revalidated by ETag."""
+        def git_tree(headers, kwargs):
+            assert kwargs["params"] == {"recursive": "1"}
+            return FakeResponse(body={"tree": self.TREE, "truncated": False}, headers={"ETag": '"t1"'})
+        
+        routes = {("GET", "git/trees/main"): git_tree}
+        repo, session = make_repo(tmp_path, routes)
+        
+        root = repo.get_tree(recursive=True)
+        
+        assert sorted(root.list_names()) == ["README.md", "src"]
+        src = root.get_child("src")
+        assert src.sha == "s"
+        assert src.get_child("a.py").size == 5
+        assert repo.get_tree("src", recursive=True).list_names() == ["a.py"]
+        assert len(session.calls) == 1
+        
+        key = repo._key("tree")
+        value, etag, _ = repo._cache.get(key)
+        assert etag == '"t1"'
+        repo._cache.set(key, (value, etag, 0))
+        routes[("GET", "git/trees/main")] = lambda headers, kwargs: FakeResponse(status_code=304)
+        assert sorted(repo.get_tree(recursive=True).list_names()) == ["README.md", "src"]
+        assert session.calls[-1][2] == {"If-None-Match": '"t1"'}
+    
+    def test_truncated_tree_listed_by_level(self, tmp_path):
+        """Test that a truncated Git Trees listing falls back to directory listings."""
+        def contents(*items):
+            body = [
+                {"name": path.rpartition("/")[2], "path": path, "type": kind, "size": 1, "sha": path}
+                for path, kind in items
+            ]
+            return lambda headers, kwargs: FakeResponse(body=body)
+        
+        routes = {
+            ("GET", "git/trees/main"): lambda headers, kwargs: FakeResponse(
+                body={"tree": self.TREE[:1], "truncated": True}
+            ),
+            ("GET", "contents"): contents(("README.md", "file"), ("src", "dir")),
+            ("GET", "contents/src"): contents(("src/a.py", "file"), ("src/lib", "dir")),
+            ("GET", "contents/src/lib"): contents(("src/lib/b.py", "file")),
+        }
+        repo, session = make_repo(tmp_path, routes)
+        
+        root = repo.get_tree(recursive=True)
+        
+        assert sorted(root.list_names()) == ["README.md", "src"]
+        lib = root.get_child("src").get_child("lib")
+        assert lib.list_names() == ["b.py"]
+        assert [call[1] for call in session.calls] == [
+            "git/trees/main", "contents", "contents/src", "contents/src/lib",
+        ]
+
+
+class TestPathNormalization:
+    """Test cases for leading and trailing slashes in paths."""
+    
+    def test_slashes_stripped(self, tmp_path):
+        """Test that slashed paths hit the same endpoints and cache keys."""
+        routes = {
+            ("GET", "contents/src/a.py"): lambda headers, kwargs: FakeResponse(content=b"x"),
+            ("GET", "contents/src"): listing("a.py"),
+            ("GET", "contents"): listing("src"),
+        }
+        repo, session = make_repo(tmp_path, routes)
+        
+        assert repo.read("/src/a.py") == "x"
+        assert repo.read("src/a.py/") == "x"
+        assert repo.listdir("/src/") == ["a.py"]
+        assert repo.listdir("src") == ["a.py"]
+        assert repo.listdir("/") == ["src"]
+        assert [call[1] for call in session.calls] == ["contents/src/a.py", "contents/src", "contents"]
+    
+    def test_write_stages_stripped_path(self, tmp_path):
+        """Test that writes are staged under the stripped path."""
+        repo, _ = make_repo(tmp_path, {})
+        
+        repo.write("/src/a.py", "one")
+        repo.write("src/a.py/", "two")
+        
+        assert list(repo._staged_changes) == ["src/a.py"]
+        assert repo._staged_content("src/a.py") == "two"
+
+
+class TestRawReads:
+    """Test cases for file bodies fetched with the raw media type."""
+    
+    def test_raw_media_type(self, tmp_path):
+        """Test that reads ask for raw bytes instead of base64 JSON."""
+        def raw(headers, kwargs):
+            assert headers["Accept"] == RAW_MEDIA_TYPE
+            return FakeResponse(content="é\n".encode("utf-8"))
+        
+        routes = {("GET", "contents/a.txt"): raw}
+        repo, _ = make_repo(tmp_path, routes)
+        
+        assert repo.read("a.txt") == "é\n"
+        assert repo.read_binary("a.txt") == "é\n".encode("utf-8")
+    
+    def test_directory_rejected(self, tmp_path):
+        """Test that a JSON listing answer means the path is a directory."""
+        def directory(headers, kwargs):
+            return FakeResponse(body=[], headers={"Content-Type": "application/json; charset=utf-8"})
+        
+        routes = {("GET", "contents/src"): directory}
+        repo, _ = make_repo(tmp_path, routes)
+        
+        with pytest.raises(IsADirectoryError):
+            repo.read("src")
+        with pytest.raises(IsADirectoryError):
+            repo.read_binary("src")
+
+
+class TestCommit:
+    """Test cases for committing staged files."""
+    
+    def test_blobs_uploaded_concurrently(self, tmp_path):
+        """Test that blob uploads overlap rather than run one after another."""
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def create_blob(headers, kwargs):
+            barrier.wait()  # Breaks unless three uploads are in flight at once
+            return FakeResponse(body={"sha": kwargs["json"]["content"]})
+        
+        trees = []
+        
+        def create_tree(headers, kwargs):
+            trees.append(kwargs["json"]["tree"])
+            return FakeResponse(body={"sha": "tree"})
+        
+        sha = lambda headers, kwargs: FakeResponse(body={"sha": "s", "object": {"sha": "base"}})
+        routes = {
+            ("GET", "git/ref/heads/main"): sha,
+            ("POST", "git/blobs"): create_blob,
+            ("POST", "git/trees"): create_tree,
+            ("POST", "git/commits"): sha,
+            ("PATCH", "git/refs/heads/main"): sha,
+        }
+        repo, _ = make_repo(tmp_path, routes, max_workers=4)
+        for name in ("a", "b", "c"):
+            repo.write(f"{name}.txt", name)
+        
+        repo.commit("Add files")
+        
+        assert [(item["path"], item["sha"]) for item in trees[0]] == [
+            ("a.txt", "a"), ("b.txt", "b"), ("c.txt", "c"),
+        ]
@@ -103,6 +103,19 @@ class TestSession:
         assert history[0].model == "model3"
         assert history[2].model == "model1"
     
+    def test_get_history_limit(self, tmp_path):
+        """Test that get_history returns only the newest calls when limited."""
+        session = Session(workspace_path=str(tmp_path))
+        
+        for i in range(5):
+            with session.llm_call(f"model{i}", "Prompt"):
+                pass
+        
+        history = session.get_history(limit=2)
+        
+        assert [call.model for call in history] == ["model4", "model3"]
+        assert len(session.get_history(limit=10)) == 5
+    
     def test_restore_before_call(self, tmp_path):
         """Test restoring to state before a call."""
         session = Session(workspace_path=str(tmp_path))